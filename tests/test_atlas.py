@@ -0,0 +1,151 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources icon atlases
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import json
+
+from Qt.QtCore import QSize, QRect
+from Qt.QtGui import QColor, QImage
+from Qt.QtWidgets import QApplication
+
+from tpDcc.libs.unittests.core import settings, unittestcase
+
+from tpDcc.libs.resources.core import atlas, image
+
+ICONS = {'red.png': (QColor(255, 0, 0), 16, 16), 'green.png': (QColor(0, 255, 0), 32, 32),
+         'blue.png': (QColor(0, 0, 255, 127), 24, 8), 'white.png': (QColor(255, 255, 255), 8, 40)}
+
+
+class IconAtlasTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    @classmethod
+    def setUpClass(cls):
+        super(IconAtlasTests, cls).setUpClass()
+        cls._app = QApplication.instance() or QApplication([])
+
+    @classmethod
+    def tearDownClass(cls):
+        atlas.clear_atlas_cache()
+        cls.delete_temp_files()
+        super(IconAtlasTests, cls).tearDownClass()
+
+    def _icons_folder(self, folder_name, theme_name='default'):
+        # Folders are not registered as temporary files, they are removed with the whole temporary directory
+        folder = os.path.join(settings.UnitTestSettings().temp_dir, folder_name, theme_name)
+        os.makedirs(folder)
+        for name, (color, width, height) in ICONS.items():
+            source = QImage(width, height, QImage.Format_ARGB32)
+            source.fill(color)
+            self.assertTrue(source.save(os.path.join(folder, name), 'PNG'))
+        return folder
+
+    def _set_modification_time(self, file_path, file_time):
+        os.utime(file_path, (file_time, file_time))
+
+    def test_pack(self):
+        sizes = [(16, 16), (32, 32), (24, 8), (8, 40), (30, 30)]
+        placements, page_sizes = atlas._pack(sizes, 48, 1)
+        self.assertGreater(len(page_sizes), 1)
+        rects = dict()
+        for (page, x, y), (width, height) in zip(placements, sizes):
+            rect = QRect(x, y, width, height)
+            self.assertLessEqual(rect.right() + 1, page_sizes[page][0])
+            self.assertLessEqual(rect.bottom() + 1, page_sizes[page][1])
+            for other_rect in rects.get(page, list()):
+                self.assertFalse(rect.intersects(other_rect))
+            rects.setdefault(page, list()).append(rect)
+        self.assertEqual(atlas._pack(list(), 48, 1), (list(), list()))
+
+    def test_atlas_file_path(self):
+        self.assertEqual(
+            atlas.atlas_file_path(os.path.join('icons', 'default')),
+            os.path.join('icons', 'default.{}'.format(atlas.ATLAS_EXTENSION)))
+
+    def test_build_atlas(self):
+        folder = self._icons_folder('build_atlas')
+        atlas_file = atlas.build_atlas(folder)
+        self.assertEqual(atlas_file, atlas.atlas_file_path(folder))
+        icon_atlas = atlas.IconAtlas(atlas_file, source_folder=folder)
+        self.assertEqual(sorted(icon_atlas.names()), sorted(ICONS.keys()))
+        for name, (color, width, height) in ICONS.items():
+            self.assertTrue(icon_atlas.has_icon(name))
+            self.assertEqual(icon_atlas.rect(name).size(), QSize(width, height))
+            pixmap = icon_atlas.pixmap(name)
+            self.assertIs(icon_atlas.pixmap(name), pixmap)
+            self.assertEqual(
+                pixmap.toImage().convertToFormat(image.PREFERRED_FORMAT),
+                image.read_image(os.path.join(folder, name)))
+        self.assertFalse(icon_atlas.has_icon('missing.png'))
+        self.assertIsNone(icon_atlas.rect('missing.png'))
+        self.assertIsNone(icon_atlas.pixmap('missing.png'))
+
+    def test_build_atlas_pages(self):
+        folder = self._icons_folder('build_atlas_pages')
+        atlas_file = atlas.build_atlas(folder, max_size=40)
+        with open(atlas_file, 'r') as fh:
+            atlas_data = json.load(fh)
+        self.assertGreater(len(atlas_data['pages']), 1)
+
+        # Icons bigger than the pages are not packed
+        icon_atlas = atlas.IconAtlas(atlas_file)
+        self.assertEqual(sorted(icon_atlas.names()), ['blue.png', 'green.png', 'red.png'])
+        self.assertEqual(icon_atlas.pixmap('red.png').size(), QSize(16, 16))
+
+    def test_build_missing_folder(self):
+        self.assertIsNone(atlas.build_atlas(os.path.join(settings.UnitTestSettings().temp_dir, 'missing')))
+
+    def test_invalid_atlas(self):
+        atlas_file = self.get_temp_filename('invalid.{}'.format(atlas.ATLAS_EXTENSION))
+        with open(atlas_file, 'w') as fh:
+            json.dump({'version': atlas.ATLAS_VERSION - 1, 'pages': list(), 'icons': {'red.png': [0, 0, 0, 1, 1]}}, fh)
+        self.assertEqual(atlas.IconAtlas(atlas_file).names(), list())
+        self.assertEqual(atlas.IconAtlas(self.get_temp_filename('missing.atlas')).names(), list())
+
+    def test_modified_icons(self):
+        folder = self._icons_folder('modified_icons')
+        atlas_file = atlas.build_atlas(folder)
+        with open(atlas_file, 'r') as fh:
+            build_time = json.load(fh)['build_time']
+        for name in ICONS:
+            self._set_modification_time(os.path.join(folder, name), build_time - 10)
+        self._set_modification_time(os.path.join(folder, 'red.png'), build_time + 10)
+        os.remove(os.path.join(folder, 'green.png'))
+
+        icon_atlas = atlas.IconAtlas(atlas_file, source_folder=folder)
+        self.assertEqual(icon_atlas.modified_names(), set(['red.png', 'green.png']))
+        self.assertFalse(icon_atlas.is_up_to_date('red.png'))
+        self.assertTrue(icon_atlas.is_up_to_date('blue.png'))
+        self.assertFalse(icon_atlas.is_up_to_date('missing.png'))
+
+        # Sources are not checked if the folder of the source icons is not known
+        self.assertEqual(atlas.IconAtlas(atlas_file).modified_names(), set())
+
+    def test_atlas_pixmap(self):
+        folder = self._icons_folder('atlas_pixmap')
+        atlas_file = atlas.build_atlas(folder)
+        with open(atlas_file, 'r') as fh:
+            build_time = json.load(fh)['build_time']
+        for name in ICONS:
+            self._set_modification_time(os.path.join(folder, name), build_time - 10)
+        self._set_modification_time(os.path.join(folder, 'red.png'), build_time + 10)
+
+        atlas.clear_atlas_cache()
+        icon_atlas = atlas.get_atlas(folder)
+        self.assertIs(atlas.get_atlas(folder), icon_atlas)
+        self.assertEqual(atlas.atlas_pixmap(os.path.join(folder, 'blue.png')).size(), QSize(24, 8))
+        # Icons modified after the atlas was built are loaded from their source file
+        self.assertIsNone(atlas.atlas_pixmap(os.path.join(folder, 'red.png')))
+        self.assertIsNone(atlas.atlas_pixmap(os.path.join(folder, 'blue.svg')))
+        self.assertIsNone(atlas.atlas_pixmap(None))
+        self.assertIsNone(atlas.get_atlas(os.path.join(settings.UnitTestSettings().temp_dir, 'missing')))
+
+    def test_bundled_atlases(self):
+        library_folder = os.path.dirname(os.path.dirname(os.path.abspath(atlas.__file__)))
+        self.assertTrue(atlas._is_bundled(os.path.join(library_folder, 'icons', 'default.atlas')))
+        self.assertFalse(atlas._is_bundled(self.get_temp_filename('default.atlas')))
@@ -0,0 +1,120 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources color conversion functions
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import unittest
+
+from Qt.QtGui import QColor
+
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import colormath
+
+# Hues sampled by the tests, including sector boundaries and values out of the [0, 1) range
+HUES = [index / 60.0 for index in range(-3, 64)]
+# Maximum difference allowed between the channels of the packed colors and the ones computed by QColor
+QCOLOR_TOLERANCE = 1
+
+
+def _max_difference(packed_a, packed_b):
+    """
+    Returns the maximum difference between the channels of the given packed colors
+    :param packed_a: int
+    :param packed_b: int
+    :return: int
+    """
+
+    return max(abs(a - b) for a, b in zip(colormath.unpack(packed_a), colormath.unpack(packed_b)))
+
+
+class ColorMathTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_pack_color(self):
+        for components in ((0.0, 0.0, 0.0, 1.0), (1.0, 0.5, 0.25, 0.5), (0.3, 0.59, 0.11, 0.0), (0.999, 0.001, 1, 1)):
+            self.assertLessEqual(
+                _max_difference(colormath.pack_color(*components), QColor.fromRgbF(*components).rgba()),
+                QCOLOR_TOLERANCE)
+        self.assertEqual(colormath.unpack(colormath.pack_color(1.0, 0.0, 1.0, 0.0)), (255, 0, 255, 0))
+        self.assertEqual(colormath.unpack(0x80ff8800), (255, 136, 0, 128))
+
+    def test_scalar_conversions(self):
+        self.assertEqual(colormath.lch_to_rgb(0.0, 1.0, 0.3), (1.0, 0.0, 0.0))
+        self.assertEqual(colormath.hsl_to_rgb(1 / 3.0, 1.0, 0.5), (0.0, 1.0, 0.0))
+        self.assertEqual(colormath.hsl_to_rgb(0.5, 0.0, 0.25), (0.25, 0.25, 0.25))
+        # Hues bigger than 1 are black before lightness is applied
+        self.assertEqual(colormath.hsl_to_rgb(1.5, 1.0, 0.5), (0.0, 0.0, 0.0))
+
+
+@unittest.skipIf(not colormath.NUMPY_AVAILABLE, 'NumPy is not available')
+class ColorMathArraysTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_lch_arrays(self):
+        for chroma, luma in ((1.0, 1.0), (0.5, 0.7), (0.2, 0.1)):
+            reds, greens, blues = colormath.lch_to_rgb_arrays(HUES, chroma, luma)
+            for i, hue in enumerate(HUES):
+                self.assert_list_almost_equal(
+                    (reds[i], greens[i], blues[i]), colormath.lch_to_rgb(hue, chroma, luma), places=12)
+
+    def test_hsl_arrays(self):
+        for saturation, lightness in ((1.0, 0.5), (0.5, 0.7), (0.2, 0.1)):
+            reds, greens, blues = colormath.hsl_to_rgb_arrays(HUES, saturation, lightness)
+            for i, hue in enumerate(HUES):
+                self.assert_list_almost_equal(
+                    (reds[i], greens[i], blues[i]), colormath.hsl_to_rgb(hue, saturation, lightness), places=12)
+
+    def test_hsv_arrays(self):
+        hues = [index / 360.0 for index in range(360)]
+        for saturation, value in ((1.0, 1.0), (0.5, 0.7)):
+            packed = colormath.pack(*colormath.hsv_to_rgb_arrays(hues, saturation, value))
+            for hue, packed_color in zip(hues, packed):
+                self.assertLessEqual(
+                    _max_difference(packed_color, QColor.fromHsvF(hue, saturation, value).rgba()), QCOLOR_TOLERANCE,
+                    'HSV color {} differs from QColor'.format((hue, saturation, value)))
+
+    def test_pack(self):
+        components = [(0.0, 0.0, 0.0), (1.0, 0.5, 0.25), (0.3, 0.59, 0.11), (0.999, 0.001, 1.0)]
+        packed = colormath.pack(*zip(*components), alphas=0.5)
+        self.assertEqual(list(packed), [colormath.pack_color(*(values + (0.5,))) for values in components])
+
+
+class RainbowTableTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_rainbow_table(self):
+        colormath.clear_rainbow_tables()
+        table = colormath.rainbow_table(colormath.HSV_RAINBOW, 36)
+        self.assertIs(colormath.rainbow_table(colormath.HSV_RAINBOW, 36), table)
+        self.assertIsNot(colormath.rainbow_table(colormath.LCH_RAINBOW, 36), table)
+        self.assertEqual(len(table), 36)
+        self.assertEqual((table.kind, table.resolution), (colormath.HSV_RAINBOW, 36))
+        colormath.clear_rainbow_tables()
+        self.assertIsNot(colormath.rainbow_table(colormath.HSV_RAINBOW, 36), table)
+
+    def test_ramp(self):
+        table = colormath.rainbow_table(colormath.LCH_RAINBOW, 12)
+        ramp = list(table.ramp())
+        self.assertEqual(len(ramp), 12)
+        for index, packed in enumerate(ramp):
+            self.assertEqual(packed, colormath.pack_color(*colormath.lch_to_rgb(index / 12.0, 1.0, 1.0)))
+
+    def test_lookup(self):
+        table = colormath.rainbow_table(colormath.HSV_RAINBOW, 6)
+        ramp = list(table.ramp())
+        self.assertEqual(colormath.unpack(ramp[0]), (255, 0, 0, 255))
+        self.assertEqual(table.lookup(0.0), ramp[0])
+        self.assertEqual(table.lookup(1 / 6.0), ramp[1])
+        self.assertEqual(table.lookup(0.24), ramp[1])
+        # Hues are wrapped
+        self.assertEqual(table.lookup(0.99), ramp[0])
+        self.assertEqual(table.lookup(1.5), ramp[3])
+        self.assertEqual(table.lookup(-1 / 6.0), ramp[5])
+        hues = [0.0, 0.24, 0.99, 1.5, -1 / 6.0]
+        self.assertEqual([int(packed) for packed in table.lookup_array(hues)], [table.lookup(hue) for hue in hues])
+
+    def test_invalid_tables(self):
+        self.assertRaises(ValueError, colormath.RainbowTable, 'rgb')
+        self.assertRaises(ValueError, colormath.RainbowTable, colormath.LCH_RAINBOW, 0)
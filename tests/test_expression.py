@@ -0,0 +1,69 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources DPI expressions
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import expression
+
+
+def _replace_dpi_expressions(line, dpi):
+    """
+    Returns the given line with all its DPI expressions replaced with their integer value
+    :param line: str
+    :param dpi: float
+    :return: str
+    """
+
+    for start, end, dpi_expression in reversed(expression.find_dpi_expressions(line)):
+        line = line[:start] + str(int(dpi_expression.evaluate(dpi))) + line[end:]
+
+    return line
+
+
+class ExpressionTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_parse(self):
+        self.assertEqual(expression.parse('4*DPI').evaluate(dpi=2), 8)
+        self.assertEqual(expression.parse('(2 + 4) * DPI / 4').evaluate(dpi=2), 3)
+        self.assertEqual(expression.parse('10 - 2*DPI').evaluate(dpi=2), 6)
+        self.assertEqual(expression.parse('-2*DPI').evaluate(dpi=2), -4)
+        self.assertEqual(expression.parse('(@padding -2) * DPI').evaluate(dpi=2, variables={'padding': 6}), 8)
+        self.assertEqual(expression.parse('(@padding + 2)*DPI').variables, frozenset(['padding']))
+
+    def test_parse_invalid_expression(self):
+        for text in ('4*', '(4*DPI', '4 DPI', '0 -2*DPI'):
+            self.assertRaises(ValueError, expression.parse, text)
+
+    def test_evaluate_errors(self):
+        self.assertRaises(ValueError, expression.parse('@padding*DPI').evaluate)
+        self.assertRaises(ValueError, expression.parse('DPI/0').evaluate)
+        self.assertEqual(
+            expression.evaluate_all([expression.parse('2*DPI'), expression.parse('DPI/0')], dpi=2), [4, None])
+
+    def test_find_dpi_expressions(self):
+        self.assertEqual(_replace_dpi_expressions('font: 12*DPIpx;', 2), 'font: 24px;')
+        self.assertEqual(
+            _replace_dpi_expressions('border: 1*DPIpx solid @border_color;', 2), 'border: 2px solid @border_color;')
+        found = expression.find_dpi_expressions('width: (@size + 2)*DPI;')
+        self.assertEqual([(start, end, found_expression.text) for start, end, found_expression in found],
+                         [(7, 22, '(@size + 2)*DPI')])
+        self.assertEqual(expression.find_dpi_expressions('color: red;'), list())
+
+    def test_subtraction(self):
+        self.assertEqual(_replace_dpi_expressions('left: 10 - 2*DPI;', 2), 'left: 6;')
+        self.assertEqual(_replace_dpi_expressions('left: 10-2*DPI;', 2), 'left: 6;')
+        self.assertEqual(_replace_dpi_expressions('left: (10 -2)*DPI;', 2), 'left: 16;')
+
+    def test_negative_values(self):
+        self.assertEqual(_replace_dpi_expressions('margin: 0 -2*DPI;', 2), 'margin: 0 -4;')
+        self.assertEqual(_replace_dpi_expressions('left: 10 -2*DPI;', 2), 'left: 10 -4;')
+        self.assertEqual(_replace_dpi_expressions('margin: 4*DPI -2*DPI;', 2), 'margin: 8 -4;')
+        self.assertEqual(_replace_dpi_expressions('margin:-2*DPI;', 2), 'margin:-4;')
+        self.assertEqual(_replace_dpi_expressions('margin: 3*DPI +1*DPI;', 2), 'margin: 6 +2;')
+        self.assertEqual(_replace_dpi_expressions('image: icon-2*DPI;', 2), 'image: icon-4;')
@@ -0,0 +1,140 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources image backends
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import unittest
+
+from Qt.QtCore import Qt, QSize, QRect
+from Qt.QtGui import QImage
+
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import image, kernels
+
+SOURCE_COLORS = ((0, 0, 0), (255, 255, 255), (80, 160, 220), (250, 173, 20), (13, 99, 201))
+TINT_COLORS = ((255, 255, 255, 100), (255, 0, 0, 255), (30, 200, 90, 127), (0, 0, 0, 0), (250, 173, 20, 1))
+
+# Maximum difference allowed between the channels computed by QPainter and by NumPy kernels
+COLORIZE_TOLERANCE = 1
+GRAYSCALE_TOLERANCE = 1
+
+
+def _source_image():
+    """
+    Returns an image with a row for each one of the source colors that contains all the possible alpha values
+    :return: QImage
+    """
+
+    # Pixels are written through a NumPy view because QImage.setPixel leaks references to None in some PySide
+    # versions, making the interpreter crash at exit
+    source = QImage(256, len(SOURCE_COLORS), QImage.Format_ARGB32)
+    array = kernels.image_array(source)
+    for y, source_color in enumerate(SOURCE_COLORS):
+        array[y, :, kernels.RED] = source_color[0]
+        array[y, :, kernels.GREEN] = source_color[1]
+        array[y, :, kernels.BLUE] = source_color[2]
+        array[y, :, kernels.ALPHA] = range(256)
+
+    return source.convertToFormat(image.PREFERRED_FORMAT)
+
+
+def _max_difference(image_a, image_b):
+    """
+    Returns the maximum difference between the channels of the given images
+    :param image_a: QImage
+    :param image_b: QImage
+    :return: int
+    """
+
+    array_a = kernels.image_array(image_a, read_only=True).astype(int)
+    array_b = kernels.image_array(image_b, read_only=True).astype(int)
+
+    return abs(array_a - array_b).max()
+
+
+class ImageTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.delete_temp_files()
+        super(ImageTests, cls).tearDownClass()
+
+    def _image_file(self, width=100, height=50):
+        image_path = self.get_temp_filename('image.png')
+        source = QImage(width, height, QImage.Format_ARGB32)
+        source.fill(Qt.red)
+        self.assertTrue(source.save(image_path, 'PNG'))
+        return image_path
+
+    def test_size_bucket(self):
+        self.assertEqual(image.size_bucket(1), QSize(16, 16))
+        self.assertEqual(image.size_bucket(16), QSize(16, 16))
+        self.assertEqual(image.size_bucket(17), QSize(32, 32))
+        self.assertEqual(image.size_bucket(23.6), QSize(32, 32))
+        self.assertEqual(image.size_bucket(QSize(20, 70)), QSize(32, 128))
+        self.assertEqual(image.size_bucket(QSize(256, 256)), QSize(256, 256))
+
+    def test_read_image(self):
+        decoded = image.read_image(self._image_file())
+        self.assertEqual(decoded.size(), QSize(100, 50))
+        self.assertEqual(decoded.format(), image.PREFERRED_FORMAT)
+
+    def test_read_image_with_size(self):
+        image_path = self._image_file()
+        self.assertEqual(image.read_image(image_path, size=QSize(32, 32)).size(), QSize(32, 16))
+        self.assertEqual(image.read_image(image_path, size=QSize(60, 10)).size(), QSize(20, 10))
+        # Images are never upscaled
+        self.assertEqual(image.read_image(image_path, size=QSize(400, 400)).size(), QSize(100, 50))
+
+    def test_read_image_with_clip_rect(self):
+        image_path = self._image_file()
+        decoded = image.read_image(image_path, clip_rect=QRect(10, 10, 40, 20))
+        self.assertEqual(decoded.size(), QSize(40, 20))
+        self.assertEqual(decoded.format(), image.PREFERRED_FORMAT)
+        decoded = image.read_image(image_path, size=QSize(20, 20), clip_rect=QRect(10, 10, 40, 20))
+        self.assertEqual(decoded.size(), QSize(20, 10))
+
+    def test_read_missing_image(self):
+        self.assertTrue(image.read_image(self.get_temp_filename('missing.png')).isNull())
+
+
+@unittest.skipIf(not kernels.NUMPY_AVAILABLE, 'NumPy is not available')
+class ImageBackendsTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_tint_image(self):
+        for tint_color in TINT_COLORS:
+            painter_image = image.tint_image(_source_image(), tint_color, backend=image.QPAINTER_BACKEND)
+            numpy_image = image.tint_image(_source_image(), tint_color, backend=image.NUMPY_BACKEND)
+            self.assertEqual(painter_image.format(), numpy_image.format())
+            self.assertEqual(
+                _max_difference(painter_image, numpy_image), 0,
+                'Tint {} differs between image backends'.format(tint_color))
+
+    def test_colorize_image(self):
+        for new_color in TINT_COLORS:
+            painter_image = image.colorize_image(_source_image(), new_color, backend=image.QPAINTER_BACKEND)
+            numpy_image = image.colorize_image(_source_image(), new_color, backend=image.NUMPY_BACKEND)
+            self.assertEqual(painter_image.format(), numpy_image.format())
+            self.assertLessEqual(
+                _max_difference(painter_image, numpy_image), COLORIZE_TOLERANCE,
+                'Colorize {} differs between image backends'.format(new_color))
+
+    def test_grayscale_image(self):
+        painter_image = image.grayscale_image(_source_image(), backend=image.QPAINTER_BACKEND)
+        numpy_image = image.grayscale_image(_source_image(), backend=image.NUMPY_BACKEND)
+        self.assertEqual(painter_image.format(), numpy_image.format())
+        self.assertLessEqual(_max_difference(painter_image, numpy_image), GRAYSCALE_TOLERANCE)
+
+    def test_source_is_not_modified(self):
+        source = _source_image()
+        expected = source.copy()
+        for backend in (image.QPAINTER_BACKEND, image.NUMPY_BACKEND):
+            image.tint_image(source, TINT_COLORS[0], backend=backend)
+            image.colorize_image(source, TINT_COLORS[1], backend=backend)
+            image.grayscale_image(source, backend=backend)
+            self.assertEqual(source, expected)
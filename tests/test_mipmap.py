@@ -0,0 +1,137 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources mipmap chains
+"""
+
+from __future__ import print_function, division, absolute_import
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from Qt.QtCore import Qt, QSize
+from Qt.QtGui import QImage, QPixmap
+from Qt.QtWidgets import QApplication
+
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import image, kernels, mipmap
+
+# Maximum difference allowed between the channels of images scaled through mip levels and scaled directly
+SCALE_TOLERANCE = 2
+
+
+def _source_image(width=256, height=128):
+    """
+    Returns an opaque image with horizontal and vertical gradients
+    :param width: int
+    :param height: int
+    :return: QImage
+    """
+
+    # Pixels are written through a NumPy view because QImage.setPixel leaks references to None in some PySide
+    # versions, making the interpreter crash at exit
+    source = QImage(width, height, QImage.Format_ARGB32)
+    array = kernels.image_array(source)
+    for x in range(width):
+        array[:, x, kernels.RED] = x * 255 // (width - 1)
+    for y in range(height):
+        array[y, :, kernels.GREEN] = y * 255 // (height - 1)
+    array[..., kernels.BLUE] = 128
+    array[..., kernels.ALPHA] = 255
+
+    return source.convertToFormat(image.PREFERRED_FORMAT)
+
+
+def _max_difference(image_a, image_b):
+    """
+    Returns the maximum difference between the channels of the given images
+    :param image_a: QImage
+    :param image_b: QImage
+    :return: int
+    """
+
+    array_a = kernels.image_array(image_a, read_only=True).astype(int)
+    array_b = kernels.image_array(image_b, read_only=True).astype(int)
+
+    return abs(array_a - array_b).max()
+
+
+class MipmapTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    @classmethod
+    def setUpClass(cls):
+        super(MipmapTests, cls).setUpClass()
+        cls._app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        mipmap.clear_mipmap_cache()
+
+    def test_lazy_levels(self):
+        chain = mipmap.MipmapChain(_source_image())
+        self.assertEqual(chain.levels(), list())
+        self.assertEqual(chain.image(32).size(), QSize(32, 16))
+        self.assertEqual(chain.levels(), [QSize(32, 16)])
+        self.assertIs(chain.image(QSize(32, 32)), chain.image(32))
+        # Only the mip levels needed to derive the requested size are generated
+        self.assertEqual(
+            [mip.size() for mip in chain._mips], [QSize(256, 128), QSize(128, 64), QSize(64, 32), QSize(32, 16)])
+        chain.image(48)
+        self.assertEqual(len(chain._mips), 4)
+
+    def test_aspect_ratio(self):
+        chain = mipmap.MipmapChain(_source_image())
+        self.assertEqual(chain.image(QSize(64, 8)).size(), QSize(16, 8))
+        self.assertEqual(chain.image(QSize(100, 100)).size(), QSize(100, 50))
+        self.assertEqual(chain.image(QSize(512, 512)).size(), QSize(512, 256))
+        self.assertEqual(chain.image(256).size(), QSize(256, 128))
+        self.assertIs(chain.image(QSize(256, 256)), chain.source)
+
+    def test_scaled_image(self):
+        source = _source_image()
+        chain = mipmap.MipmapChain(QPixmap.fromImage(source))
+        self.assertEqual(chain.source.format(), image.PREFERRED_FORMAT)
+        for size in (128, 100, 64, 48, 16):
+            expected = source.scaled(QSize(size, size), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled = chain.image(size)
+            self.assertEqual(scaled.size(), expected.size())
+            self.assertLessEqual(
+                _max_difference(scaled, expected), SCALE_TOLERANCE,
+                'Mip level {} differs from smooth scaling'.format(size))
+
+    def test_pixmap(self):
+        chain = mipmap.MipmapChain(_source_image())
+        pixmap = chain.pixmap(64)
+        self.assertEqual(pixmap.size(), QSize(64, 32))
+        self.assertIs(chain.pixmap(64), pixmap)
+
+    def test_chains_are_cached_when_reused(self):
+        source = QPixmap.fromImage(_source_image())
+        first_chain = mipmap.mipmap_chain(source)
+        # Sources that are scaled only once are not cached
+        second_chain = mipmap.mipmap_chain(source)
+        self.assertIsNot(second_chain, first_chain)
+        self.assertIs(mipmap.mipmap_chain(source), second_chain)
+
+        mipmap.clear_mipmap_cache()
+        self.assertIsNot(mipmap.mipmap_chain(source), second_chain)
+
+    def test_cache_is_bounded(self):
+        sources = [QPixmap.fromImage(_source_image(16, 16)) for _ in range(3)]
+        with mock.patch.object(mipmap, 'MAX_CHAINS', 2):
+            chains = list()
+            for source in sources:
+                mipmap.mipmap_chain(source)
+                chains.append(mipmap.mipmap_chain(source))
+            self.assertIsNot(mipmap.mipmap_chain(sources[0]), chains[0])
+            self.assertIs(mipmap.mipmap_chain(sources[2]), chains[2])
+
+    def test_scaled_pixmap(self):
+        source = QPixmap.fromImage(_source_image())
+        self.assertEqual(mipmap.scaled_pixmap(source, QSize(32, 64)).size(), QSize(32, 16))
+        self.assertEqual(mipmap.scaled_pixmap(source, 32.4).size(), QSize(32, 16))
+        null_pixmap = QPixmap()
+        self.assertIs(mipmap.scaled_pixmap(null_pixmap, 32), null_pixmap)
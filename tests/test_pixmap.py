@@ -0,0 +1,170 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources pixmap pipelines
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from Qt.QtCore import Qt, QSize
+from Qt.QtGui import QImage, QPixmap
+from Qt.QtWidgets import QApplication
+
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import image, kernels, pixmap
+
+# Maximum difference allowed between the channels computed by a pipeline and by applying each operation in order
+PIPELINE_TOLERANCE = 2
+
+
+def _source_image(size=64):
+    """
+    Returns a square image with horizontal color and vertical alpha gradients
+    :param size: int
+    :return: QImage
+    """
+
+    # Pixels are written through a NumPy view because QImage.setPixel leaks references to None in some PySide
+    # versions, making the interpreter crash at exit
+    source = QImage(size, size, QImage.Format_ARGB32)
+    array = kernels.image_array(source)
+    for x in range(size):
+        array[:, x, kernels.RED] = x * 255 // (size - 1)
+        array[:, x, kernels.BLUE] = 255 - x * 255 // (size - 1)
+    array[..., kernels.GREEN] = 100
+    for y in range(size):
+        array[y, :, kernels.ALPHA] = y * 255 // (size - 1)
+
+    return source.convertToFormat(image.PREFERRED_FORMAT)
+
+
+def _max_difference(image_a, image_b):
+    """
+    Returns the maximum difference between the channels of the given images
+    :param image_a: QImage
+    :param image_b: QImage
+    :return: int
+    """
+
+    array_a = kernels.image_array(image_a, read_only=True).astype(int)
+    array_b = kernels.image_array(image_b, read_only=True).astype(int)
+
+    return abs(array_a - array_b).max()
+
+
+class FuseOperationsTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_colorizations_are_merged(self):
+        self.assertEqual(
+            pixmap._fuse_operations(
+                [(pixmap.COLOR_OPERATION, (255, 0, 0, 255)), (pixmap.COLOR_OPERATION, (0, 0, 255, 127))],
+                QSize(64, 64)),
+            [(pixmap.COLOR_OPERATION, (0, 0, 255, 127))])
+        gray = pixmap._gray(255, 0, 0)
+        self.assertEqual(
+            pixmap._fuse_operations(
+                [(pixmap.COLOR_OPERATION, (255, 0, 0, 200)), (pixmap.GRAYSCALE_OPERATION,)], QSize(64, 64)),
+            [(pixmap.COLOR_OPERATION, (gray, gray, gray, 200))])
+        self.assertEqual(
+            pixmap._fuse_operations(
+                [(pixmap.GRAYSCALE_OPERATION,), (pixmap.GRAYSCALE_OPERATION,)], QSize(64, 64)),
+            [(pixmap.GRAYSCALE_OPERATION,)])
+
+    def test_downscales_are_moved(self):
+        color_operation = (pixmap.COLOR_OPERATION, (255, 0, 0, 255))
+        self.assertEqual(
+            pixmap._fuse_operations([color_operation, (pixmap.SCALE_OPERATION, 32, 32)], QSize(64, 32)),
+            [(pixmap.SCALE_OPERATION, 32, 16), color_operation])
+        # Consecutive scales are merged
+        self.assertEqual(
+            pixmap._fuse_operations(
+                [(pixmap.SCALE_OPERATION, 32, 32), color_operation, (pixmap.SCALE_OPERATION, 16, 16)], QSize(64, 64)),
+            [(pixmap.SCALE_OPERATION, 16, 16), color_operation])
+        # Upscales are not moved
+        self.assertEqual(
+            pixmap._fuse_operations([color_operation, (pixmap.SCALE_OPERATION, 128, 128)], QSize(64, 64)),
+            [color_operation, (pixmap.SCALE_OPERATION, 128, 128)])
+
+    def test_downscales_are_not_moved_before_other_operations(self):
+        for operation in (
+                (pixmap.TINT_OPERATION, (255, 0, 0, 100), 0), (pixmap.GRAYSCALE_OPERATION,),
+                (pixmap.OVERLAY_OPERATION, 0, None, True)):
+            self.assertEqual(
+                pixmap._fuse_operations([operation, (pixmap.SCALE_OPERATION, 32, 32)], QSize(64, 64)),
+                [operation, (pixmap.SCALE_OPERATION, 32, 32)])
+
+
+class PixmapPipelineTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    @classmethod
+    def setUpClass(cls):
+        super(PixmapPipelineTests, cls).setUpClass()
+        cls._app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        pixmap.clear_pipeline_cache()
+
+    def test_pipeline_matches_sequential_operations(self):
+        source = _source_image()
+        recipes = (
+            (('color', (255, 0, 0, 255)), ('scale', 32)),
+            (('color', (30, 200, 90, 127)), ('color', (250, 173, 20, 255)), ('grayscale',)),
+            (('tint', (255, 255, 255, 100)), ('scale', 16)),
+            (('grayscale',), ('scale', 48), ('color', (13, 99, 201, 255))),
+            (('scale', 32), ('tint', (0, 0, 255, 255)), ('grayscale',), ('scale', 16)))
+        for recipe in recipes:
+            pipeline = pixmap.PixmapPipeline(source)
+            expected = source
+            for operation in recipe:
+                getattr(pipeline, operation[0])(*operation[1:])
+                if operation[0] == 'color':
+                    expected = image.colorize_image(expected, operation[1])
+                elif operation[0] == 'tint':
+                    expected = image.tint_image(expected, operation[1])
+                elif operation[0] == 'grayscale':
+                    expected = image.grayscale_image(expected)
+                else:
+                    expected = expected.scaled(
+                        QSize(operation[1], operation[1]), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            result = pipeline.image()
+            self.assertEqual(result.size(), expected.size())
+            self.assertLessEqual(
+                _max_difference(result, image.normalize_image(expected)), PIPELINE_TOLERANCE,
+                'Pipeline {} differs from applying its operations in order'.format(recipe))
+
+    def test_overlay(self):
+        source = QImage(32, 32, image.PREFERRED_FORMAT)
+        source.fill(Qt.transparent)
+        over_image = QImage(8, 8, image.PREFERRED_FORMAT)
+        over_image.fill(Qt.white)
+        result = pixmap.PixmapPipeline(source).overlay(over_image, overlay_color=(255, 0, 0, 255)).image()
+        array = kernels.image_array(result, read_only=True)
+        self.assertEqual(int(array[..., kernels.ALPHA].sum()), 255 * 8 * 8)
+        self.assertEqual(list(array[16, 16]), list(array[12, 12]))
+        self.assertEqual(int(array[12, 12, kernels.RED]), 255)
+        self.assertEqual(int(array[12, 12, kernels.GREEN]), 0)
+        self.assertEqual(int(array[11, 11, kernels.ALPHA]), 0)
+
+    def test_results_are_memoized(self):
+        source = QPixmap.fromImage(_source_image())
+        pipeline = pixmap.PixmapPipeline(source).color('#FF0000').scale(32)
+        self.assertEqual(pipeline.key(), pixmap.PixmapPipeline(source).color('#FF0000').scale(32).key())
+        self.assertNotEqual(pipeline.key(), pixmap.PixmapPipeline(source).color('#00FF00').scale(32).key())
+        result = pipeline.image()
+        self.assertIs(pixmap.PixmapPipeline(source).color((255, 0, 0)).scale(QSize(32, 32)).image(), result)
+
+        result_pixmap = pipeline.pixmap()
+        self.assertIsInstance(result_pixmap, pixmap.Pixmap)
+        self.assertEqual(result_pixmap.size(), QSize(32, 32))
+        self.assertEqual(pipeline.pixmap().cacheKey(), result_pixmap.cacheKey())
+
+        pixmap.clear_pipeline_cache()
+        self.assertIsNot(pipeline.image(), result)
+
+    def test_source_is_not_modified(self):
+        source = _source_image()
+        expected = source.copy()
+        pixmap.PixmapPipeline(source).color((255, 0, 0, 255)).tint().grayscale().image()
+        self.assertEqual(source, expected)
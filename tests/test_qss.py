@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources stylesheet optimizer
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import qss
+
+
+class QssOptimizerTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_property_family(self):
+        self.assertEqual(qss.property_family('border'), 'border')
+        self.assertEqual(qss.property_family('border-top-color'), 'border')
+        self.assertEqual(qss.property_family('background-color'), 'background')
+        self.assertEqual(qss.property_family('padding-left'), 'padding')
+        self.assertEqual(qss.property_family('min-width'), 'min-width')
+        self.assertEqual(qss.property_family('color'), 'color')
+
+    def test_merge_rules(self):
+        self.assertEqual(
+            qss.optimize('QPushButton{color:red} QLabel{margin:1px} QPushButton{background:black}'),
+            'QLabel{margin:1px}QPushButton{color:red;background:black}')
+        # Rules are not merged across a rule that declares one of the merged properties
+        self.assertEqual(
+            qss.optimize('QPushButton{color:red} QLabel{color:blue} QPushButton{background:black}'),
+            'QPushButton{color:red}QLabel{color:blue}QPushButton{background:black}')
+
+    def test_shorthand_conflicts_are_not_merged(self):
+        self.assertEqual(
+            qss.optimize(
+                'QPushButton{border-color:red} QAbstractButton{border:1px solid blue} QPushButton{color:white}'),
+            'QPushButton{border-color:red}QAbstractButton{border:1px solid blue}QPushButton{color:white}')
+        self.assertEqual(
+            qss.optimize(
+                'QPushButton{border:1px solid red} QAbstractButton{border-color:blue} QPushButton{color:white}'),
+            'QPushButton{border:1px solid red}QAbstractButton{border-color:blue}QPushButton{color:white}')
+        self.assertEqual(
+            qss.optimize('QLabel{background-color:red} QFrame{background:blue} QLabel{color:white}'),
+            'QLabel{background-color:red}QFrame{background:blue}QLabel{color:white}')
+        self.assertEqual(
+            qss.optimize('QLabel{padding-left:2px} QFrame{padding:4px} QLabel{margin:1px}'),
+            'QLabel{padding-left:2px}QFrame{padding:4px}QLabel{margin:1px}')
+
+    def test_unrelated_properties_are_merged(self):
+        self.assertEqual(
+            qss.optimize('QLabel{background-color:red} QFrame{margin:1px} QLabel{color:white}'),
+            'QFrame{margin:1px}QLabel{background-color:red;color:white}')
+
+    def test_overridden_declarations(self):
+        self.assertEqual(qss.optimize('QLabel{color:red;color:blue}'), 'QLabel{color:blue}')
+        self.assertEqual(qss.optimize('QLabel{color:red} QLabel{color:blue}'), 'QLabel{color:blue}')
+        self.assertEqual(
+            qss.optimize('QLabel{color:red !important} QLabel{color:blue}'),
+            'QLabel{color:red !important}QLabel{color:blue}')
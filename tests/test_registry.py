@@ -0,0 +1,160 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources themed icons registry
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import gc
+import os
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from Qt.QtCore import QObject, Signal
+from Qt.QtGui import QImage
+from Qt.QtWidgets import QApplication, QPushButton
+
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import image, kernels, registry
+
+RESOURCES_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(registry.__file__)))
+
+
+class _Theme(QObject, object):
+    """
+    Theme that only contains the options used to resolve icon color roles
+    """
+
+    updated = Signal()
+
+    def __init__(self, **options):
+        super(_Theme, self).__init__()
+
+        self.options = options
+
+    def get_theme_option(self, option_name, default_value=None):
+        return self.options.get(option_name, default_value)
+
+
+def _icon_colors(icon):
+    """
+    Returns the colors of all the opaque pixels of the given icon
+    :param icon: QIcon
+    :return: set(tuple(int, int, int))
+    """
+
+    icon_image = icon.pixmap(32, 32).toImage().convertToFormat(QImage.Format_ARGB32)
+    array = kernels.image_array(icon_image, read_only=True)
+    opaque = array[array[..., kernels.ALPHA] == 255]
+
+    return set((int(pixel[kernels.RED]), int(pixel[kernels.GREEN]), int(pixel[kernels.BLUE])) for pixel in opaque)
+
+
+class IconRegistryTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    @classmethod
+    def setUpClass(cls):
+        super(IconRegistryTests, cls).setUpClass()
+        cls._app = QApplication.instance() or QApplication([])
+
+    def _registry(self):
+        return registry.IconRegistry(RESOURCES_FOLDER)
+
+    def test_icon(self):
+        icon_registry = self._registry()
+        new_icon = icon_registry.icon('equivalent', color='#00ff00')
+        self.assertFalse(new_icon.isNull())
+        self.assertEqual(_icon_colors(new_icon), set([(0, 255, 0)]))
+        # Icons that are not set through the registry are not registered
+        self.assertEqual(len(icon_registry), 0)
+
+    def test_set_icon(self):
+        icon_registry = self._registry()
+        button = QPushButton()
+        new_icon = icon_registry.set_icon(button, 'equivalent', color='#0000ff')
+        self.assertFalse(button.icon().isNull())
+        self.assertEqual(button.icon().cacheKey(), new_icon.cacheKey())
+        self.assertEqual(len(icon_registry), 1)
+        self.assertEqual(
+            icon_registry.targets(),
+            [(button, 'setIcon', registry.IconDescription('equivalent', 'icons', 'png', None, None, '#0000ff'))])
+
+    def test_retheme(self):
+        icon_registry = self._registry()
+        updates = list()
+        icon_registry.updated.connect(lambda: updates.append(True))
+        theme = _Theme(icon_color='#ff0000')
+        buttons = [QPushButton() for _ in range(3)]
+        for button in buttons:
+            icon_registry.set_icon(button, 'equivalent', color_role='icon_color')
+        self.assertEqual(icon_registry.retheme(theme=theme), len(buttons))
+        self.assertEqual(len(updates), 1)
+        for button in buttons:
+            self.assertEqual(_icon_colors(button.icon()), set([(255, 0, 0)]))
+
+        theme.options['icon_color'] = '#00ff00'
+        icon_registry.retheme()
+        for button in buttons:
+            self.assertEqual(_icon_colors(button.icon()), set([(0, 255, 0)]))
+
+    def test_retheme_in_pool(self):
+        icon_registry = self._registry()
+        button = QPushButton()
+        icon_registry.set_icon(button, 'equivalent', color_role='icon_color')
+        # A color that is not used by other tests, so the icon is not cached yet and it is decoded in the pool
+        with mock.patch.object(image, 'read_image', wraps=image.read_image) as read_image:
+            self.assertEqual(icon_registry.retheme(theme=_Theme(icon_color='#123456'), workers=2), 1)
+        self.assertEqual(read_image.call_count, 1)
+        self.assertEqual(_icon_colors(button.icon()), set([(18, 52, 86)]))
+
+    def test_follow(self):
+        icon_registry = self._registry()
+        theme = _Theme(icon_color='#ff0000')
+        icon_registry.follow(theme)
+        button = QPushButton()
+        icon_registry.set_icon(button, 'equivalent', color_role='icon_color')
+        self.assertEqual(_icon_colors(button.icon()), set([(255, 0, 0)]))
+
+        theme.options['icon_color'] = '#0000ff'
+        theme.updated.emit()
+        self.assertEqual(_icon_colors(button.icon()), set([(0, 0, 255)]))
+
+        icon_registry.follow(None)
+        theme.options['icon_color'] = '#00ff00'
+        theme.updated.emit()
+        self.assertEqual(_icon_colors(button.icon()), set([(0, 0, 255)]))
+
+    def test_setters(self):
+        icon_registry = self._registry()
+        button = QPushButton()
+        icon_registry.set_icon(button, 'equivalent', color='#ff0000')
+        icon_registry.set_icon(button, 'equivalent', color='#0000ff', setter='setWindowIcon')
+        self.assertEqual(len(icon_registry), 2)
+        icon_registry.retheme()
+        self.assertEqual(_icon_colors(button.icon()), set([(255, 0, 0)]))
+        self.assertEqual(_icon_colors(button.windowIcon()), set([(0, 0, 255)]))
+
+        icon_registry.unregister(button, setter='setWindowIcon')
+        self.assertEqual(icon_registry.targets()[0][1], 'setIcon')
+        icon_registry.unregister(button)
+        self.assertEqual(len(icon_registry), 0)
+
+    def test_deleted_targets(self):
+        icon_registry = self._registry()
+        button = QPushButton()
+        icon_registry.set_icon(button, 'equivalent')
+        other_button = QPushButton()
+        icon_registry.set_icon(other_button, 'equivalent')
+        del button
+        gc.collect()
+        self.assertEqual(len(icon_registry), 1)
+        self.assertEqual(icon_registry.retheme(), 1)
+
+        icon_registry.clear()
+        self.assertEqual(icon_registry.retheme(), 0)
@@ -0,0 +1,118 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources RGBA color values
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import pickle
+
+from Qt.QtGui import QColor
+
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import rgba
+
+
+class ParseTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def setUp(self):
+        rgba.clear_parse_cache()
+
+    def test_parse_hex(self):
+        self.assertEqual(rgba.parse('#f80'), (255, 136, 0, 255))
+        self.assertEqual(rgba.parse('FF8800'), (255, 136, 0, 255))
+        self.assertEqual(rgba.parse(' #ff8800 '), (255, 136, 0, 255))
+        # 8 digits colors follow Qt #AARRGGBB format
+        self.assertEqual(rgba.parse('#80ff8800'), (255, 136, 0, 128))
+        self.assertEqual(rgba.parse_hex('#ff880080', alpha_first=False), (255, 136, 0, 128))
+        self.assertRaises(ValueError, rgba.parse_hex, '#ff88')
+
+    def test_parse_function(self):
+        self.assertEqual(rgba.parse('rgb(255, 136, 0)'), (255, 136, 0, 255))
+        self.assertEqual(rgba.parse('rgba(255,136,0,128)'), (255, 136, 0, 128))
+        self.assertEqual(rgba.parse('rgb(255, 136, 0, 128)'), (255, 136, 0, 128))
+        self.assertEqual(rgba.parse_function('rgb(255, 136, 0)'), (255, 136, 0))
+
+    def test_parse_invalid(self):
+        for text in ('red', '#ff88', 'rgb(255, 136)', 'hsv(10, 20, 30)', ''):
+            self.assertIsNone(rgba.parse(text))
+        self.assertTrue(rgba.is_name('red'))
+        self.assertFalse(rgba.is_name('#ff0000'))
+        self.assertTrue(rgba.is_hex('ff0000'))
+        self.assertFalse(rgba.is_hex('#ff00'))
+
+    def test_parse_css(self):
+        self.assertEqual(rgba.parse_css('#f80'), (255, 136, 0, 255))
+        self.assertEqual(rgba.parse_css('rgb(255, 136, 0)'), (255, 136, 0, 255))
+        # Qt stylesheets use #RRGGBBAA format
+        self.assertEqual(rgba.parse_css('#ff880080'), (255, 136, 0, 128))
+        self.assertEqual(rgba.parse_css('rgba(255, 136, 0, 128)'), (255, 136, 0, 128))
+        self.assertIsNone(rgba.parse_css('#ff880080', alpha=False))
+        self.assertIsNone(rgba.parse_css('rgba(255, 136, 0, 128)', alpha=False))
+        self.assertEqual(rgba.parse_css('rgb(255, 136, 0)', alpha=False), (255, 136, 0, 255))
+        self.assertIsNone(rgba.parse_css('rgba(255, 136, 0)'))
+        self.assertIsNone(rgba.parse_css('ff8800'))
+        self.assertIsNone(rgba.parse_css('red'))
+
+    def test_parse_cache(self):
+        rgba.parse('#ff8800')
+        self.assertIn(('parse', '#ff8800'), rgba._PARSE_CACHE)
+        self.assertEqual(rgba.parse('#ff8800'), (255, 136, 0, 255))
+        rgba.clear_parse_cache()
+        self.assertEqual(rgba._PARSE_CACHE, dict())
+
+    def test_to_hex(self):
+        self.assertEqual(rgba.to_hex((255, 136, 0)), '#ff8800')
+        self.assertEqual(rgba.to_hex((255, 136, 0, 128)), '#80ff8800')
+
+
+class RGBATests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_components(self):
+        color = rgba.RGBA(255, 136, 0, 128)
+        self.assertEqual((color.red, color.green, color.blue, color.alpha), (255, 136, 0, 128))
+        self.assertEqual(color.to_tuple(), (255, 136, 0, 128))
+        self.assertEqual(tuple(color), (255, 136, 0, 128))
+        self.assertEqual(len(color), 4)
+        self.assertEqual(color[1], 136)
+        self.assertEqual(color.packed(), 0x80ff8800)
+        self.assertEqual(rgba.RGBA().to_tuple(), (0, 0, 0, 255))
+        self.assertRaises(ValueError, rgba.RGBA, 256, 0, 0)
+        self.assertRaises(ValueError, rgba.RGBA, 0, 0, 0, -1)
+
+    def test_immutable(self):
+        color = rgba.RGBA(255, 136, 0)
+        self.assertRaises(AttributeError, setattr, color, 'red', 0)
+        self.assertRaises(AttributeError, setattr, color, '_value', 0)
+        self.assertEqual(color.with_alpha(10).to_tuple(), (255, 136, 0, 10))
+        self.assertEqual(color.alpha, 255)
+
+    def test_equality(self):
+        self.assertEqual(rgba.RGBA(255, 136, 0), rgba.RGBA(255, 136, 0, 255))
+        self.assertNotEqual(rgba.RGBA(255, 136, 0), rgba.RGBA(255, 136, 0, 254))
+        self.assertNotEqual(rgba.RGBA(255, 136, 0), (255, 136, 0, 255))
+        self.assertEqual(len(set([rgba.RGBA(255, 136, 0), rgba.RGBA(255, 136, 0), rgba.RGBA(0, 0, 0)])), 2)
+        self.assertEqual(pickle.loads(pickle.dumps(rgba.RGBA(255, 136, 0, 128))), rgba.RGBA(255, 136, 0, 128))
+
+    def test_strings(self):
+        self.assertEqual(rgba.RGBA(255, 136, 0).name(), '#ff8800')
+        self.assertEqual(rgba.RGBA(255, 136, 0, 128).name(), '#80ff8800')
+        self.assertEqual(str(rgba.RGBA(255, 136, 0)), '#ff8800')
+        self.assertEqual(rgba.RGBA(255, 136, 0, 128).to_string(), 'rgba(255, 136, 0, 128)')
+        self.assertEqual(repr(rgba.RGBA(255, 136, 0, 128)), 'RGBA(255, 136, 0, 128)')
+        for text in ('#ff8800', '#80ff8800', 'rgba(255, 136, 0, 128)'):
+            self.assertEqual(rgba.RGBA.from_string(text), rgba.RGBA(*rgba.parse(text)))
+        self.assertEqual(rgba.RGBA.from_string(rgba.RGBA(1, 2, 3, 4).name()), rgba.RGBA(1, 2, 3, 4))
+        self.assertRaises(ValueError, rgba.RGBA.from_string, 'red')
+
+    def test_qcolor(self):
+        color = rgba.RGBA(255, 136, 0, 128)
+        self.assertEqual(rgba.RGBA.from_packed(color.packed()), color)
+        qcolor = color.to_qcolor()
+        self.assertEqual(qcolor.getRgb(), (255, 136, 0, 128))
+        self.assertEqual(qcolor.rgba(), color.packed())
+        self.assertEqual(rgba.RGBA.from_qcolor(qcolor), color)
+        self.assertEqual(rgba.RGBA.from_qcolor(QColor(color.name())), color)
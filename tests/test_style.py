@@ -0,0 +1,275 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources stylesheet templates and renderers
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import re
+import glob
+import time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from Qt.QtWidgets import QApplication
+
+from tpDcc.managers import resources
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import utils, style
+
+RESOURCES_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(style.__file__)))
+THEME_DPIS = (1, 1.5, 2)
+
+STYLESHEET = '''QPushButton {
+    color: @text_color;
+    padding: 2*DPI 4*DPI;
+    margin: 0 -2*DPI;
+}
+QLabel {
+    font-size: @font_size*DPIpx;
+    border: 1*DPIpx solid @border_color;
+}
+QLineEdit {
+    min-height: @default_size@unit;
+}
+QFrame {
+    background-color: @background_color;
+}'''
+RENDERED_STYLESHEET = '''QPushButton {
+    color: white;
+    padding: 4 8;
+    margin: 0 -4;
+}
+QLabel {
+    font-size: 24px;
+    border: 2px solid red;
+}
+QLineEdit {
+    min-height: 24px;
+}
+QFrame {
+    background-color: black;
+}'''
+OPTIONS = {
+    'text_color': 'white', 'font_size': 12, 'border_color': 'red', 'default_size': 24, 'unit': 'px',
+    'background_color': 'black'}
+
+
+def _baseline_format(data, options, dpi, theme_name):
+    """
+    Returns given stylesheet formatted as StyleSheet.format did before stylesheets were compiled into templates:
+    options are replaced from the longest to the shortest name and then the first N*DPI expression of each line is
+    evaluated. Option values are converted with StyleSheet.format_option, which contains the original conversion
+    :param data: str
+    :param options: dict
+    :param dpi: float
+    :param theme_name: str
+    :return: str
+    """
+
+    for key in sorted(options.keys(), key=len, reverse=True):
+        data = data.replace('@{}'.format(key), style.StyleSheet.format_option(key, options[key], theme_name=theme_name))
+
+    re_dpi = re.compile('[0-9]+[*]DPI')
+    new_data = list()
+    for line in data.split('\n'):
+        dpi_ = re_dpi.search(line)
+        if dpi_:
+            line = line.replace(dpi_.group(), str(int(int(dpi_.group()[:-len('*DPI')]) * dpi)))
+        new_data.append(line)
+
+    return '\n'.join(new_data)
+
+
+class StyleSheetTemplateTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_render(self):
+        template = style.StyleSheetTemplate(STYLESHEET)
+        self.assertEqual(template.render(OPTIONS, dpi=2), RENDERED_STYLESHEET)
+
+    def test_render_matches_baseline_format(self):
+        # Baseline format only evaluated the first DPI expression of each line
+        data = STYLESHEET.replace('padding: 2*DPI 4*DPI;', 'padding: 2*DPI;')
+        template = style.StyleSheetTemplate(data)
+        for dpi in THEME_DPIS:
+            self.assertEqual(template.render(OPTIONS, dpi=dpi), _baseline_format(data, OPTIONS, dpi, 'default'))
+
+    def test_options(self):
+        template = style.StyleSheetTemplate(STYLESHEET)
+        self.assertEqual(template.options(), set(
+            ['text_color', 'font_size', 'border_color', 'default_size', 'unit', 'background_color']))
+        self.assertTrue(template.uses_dpi())
+        self.assertFalse(style.StyleSheetTemplate('QLabel { color: @text_color; }').uses_dpi())
+
+    def test_missing_options(self):
+        template = style.StyleSheetTemplate('QLabel { color: @text_color; width: @width*DPI; }')
+        self.assertEqual(template.render(dict(), dpi=2), 'QLabel { color: @text_color; width: @width*DPI; }')
+
+    def test_compile_cache(self):
+        style.StyleSheetTemplate.clear_cache()
+        template = style.StyleSheetTemplate.compile(STYLESHEET)
+        self.assertIs(style.StyleSheetTemplate.compile(STYLESHEET), template)
+        style.StyleSheetTemplate.clear_cache()
+        self.assertIsNot(style.StyleSheetTemplate.compile(STYLESHEET), template)
+
+    def test_format(self):
+        self.assertEqual(style.StyleSheet.format(STYLESHEET, options=OPTIONS, dpi=2), RENDERED_STYLESHEET)
+
+
+class StyleSheetRendererTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    def test_render(self):
+        renderer = style.StyleSheetRenderer(STYLESHEET)
+        self.assertEqual(renderer.render(OPTIONS, dpi=2), style.StyleSheetTemplate(STYLESHEET).render(OPTIONS, dpi=2))
+
+    def test_incremental_render(self):
+        renderer = style.StyleSheetRenderer(STYLESHEET)
+        renderer.render(OPTIONS, dpi=1)
+        for changes, dpi in (
+                ({'text_color': 'blue'}, 1), ({'border_color': 'green', 'font_size': 14}, 1), (dict(), 2),
+                ({'unit': 'pt'}, 2), ({'background_color': 'gray'}, 1.5)):
+            options = dict(OPTIONS, **changes)
+            stylesheet, subjects = renderer.update(options, dpi=dpi)
+            self.assertEqual(stylesheet, style.StyleSheetRenderer(STYLESHEET).render(options, dpi=dpi))
+
+    def test_changed_subjects(self):
+        renderer = style.StyleSheetRenderer(STYLESHEET)
+        renderer.render(OPTIONS, dpi=1)
+        self.assertEqual(renderer.update(dict(OPTIONS, text_color='blue'), dpi=1)[1], set(['QPushButton']))
+        self.assertEqual(renderer.update(dict(OPTIONS, text_color='blue', unit='pt'), dpi=1)[1], set(['QLineEdit']))
+        self.assertEqual(renderer.update(dict(OPTIONS, text_color='blue', unit='pt'), dpi=2)[1], set(
+            ['QPushButton', 'QLabel']))
+        self.assertEqual(renderer.update(dict(OPTIONS, text_color='blue', unit='pt'), dpi=2)[1], set())
+
+    def test_affected_rules(self):
+        renderer = style.StyleSheetRenderer(STYLESHEET)
+        self.assertEqual(renderer.affected_subjects(['border_color']), set(['QLabel']))
+        # Options are also prefixes of longer tokens
+        self.assertEqual(renderer.affected_subjects(['default_size']), set(['QLineEdit']))
+
+    def test_stylesheet_for(self):
+        renderer = style.StyleSheetRenderer(STYLESHEET)
+        self.assertRaises(RuntimeError, renderer.stylesheet_for, ['QLabel'])
+        renderer.render(OPTIONS, dpi=1)
+        stylesheet = renderer.stylesheet_for(['QLabel', 'QFrame', 'QWidget'])
+        self.assertIn('QLabel', stylesheet)
+        self.assertIn('QFrame', stylesheet)
+        self.assertNotIn('QPushButton', stylesheet)
+
+    def test_previous_renderer(self):
+        previous = style.StyleSheetRenderer(STYLESHEET)
+        previous.render(OPTIONS, dpi=2)
+        new_data = STYLESHEET.replace('color: @text_color;', 'color: @border_color;')
+        renderer = style.StyleSheetRenderer(new_data, previous=previous)
+        stylesheet, subjects = renderer.update(OPTIONS, dpi=2)
+        self.assertEqual(stylesheet, style.StyleSheetRenderer(new_data).render(OPTIONS, dpi=2))
+        self.assertEqual(subjects, set(['QPushButton']))
+
+    def test_optimized_render(self):
+        data = STYLESHEET + '\nQPushButton { color: @border_color; }'
+        renderer = style.StyleSheetRenderer(data, optimize=True)
+        self.assertTrue(renderer.optimized)
+        stylesheet = renderer.render(OPTIONS, dpi=1)
+        self.assertEqual(stylesheet.count('QPushButton'), 1)
+        self.assertNotIn('color:white', stylesheet)
+
+
+class StyleSheetFilesTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    @classmethod
+    def tearDownClass(cls):
+        style.StyleSheet.clear_include_cache()
+        cls.delete_temp_files()
+        super(StyleSheetFilesTests, cls).tearDownClass()
+
+    def _write(self, file_path, data):
+        with open(file_path, 'w') as fh:
+            fh.write(data)
+        # Make sure modification time changes even in file systems with low time resolution
+        file_time = time.time() + len(data)
+        os.utime(file_path, (file_time, file_time))
+
+    def test_expand(self):
+        main_path = self.get_temp_filename('main.css')
+        include_path = os.path.join(os.path.dirname(main_path), 'included.css')
+        self.files_created.append(include_path)
+        self._write(include_path, 'QLabel { color: red; }')
+        self._write(main_path, '#include included.css\nQFrame { color: blue; }')
+        self.assertEqual(
+            style.StyleSheet.expand(main_path),
+            '\n/*Included from: {}*/\nQLabel {{ color: red; }}\nQFrame {{ color: blue; }}'.format(include_path))
+        self.assertEqual(
+            style.StyleSheet.include_graph(main_path), [os.path.abspath(main_path), os.path.abspath(include_path)])
+
+        self._write(include_path, 'QLabel { color: green; }')
+        self.assertIn('QLabel { color: green; }', style.StyleSheet.expand(main_path))
+
+    def test_expand_missing_file(self):
+        self.assertEqual(style.StyleSheet.expand(self.get_temp_filename('missing.css')), '')
+
+
+class ThemeStyleSheetTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    @classmethod
+    def setUpClass(cls):
+        super(ThemeStyleSheetTests, cls).setUpClass()
+        cls._app = QApplication.instance() or QApplication([])
+        resources.register_resource(RESOURCES_FOLDER, key='tpDcc-libs-resources')
+        # Sizes are scaled by the DPI of the screen, so a fixed multiplier is used to get the same stylesheets in
+        # every machine
+        cls._dpi_multiplier_patch = mock.patch.object(utils, 'dpi_multiplier', return_value=1.0)
+        cls._dpi_multiplier_patch.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._dpi_multiplier_patch.stop()
+        super(ThemeStyleSheetTests, cls).tearDownClass()
+
+    def _themes(self):
+        from tpDcc.libs.resources.core import theme
+
+        theme_paths = sorted(glob.glob(os.path.join(RESOURCES_FOLDER, 'themes', '*.{}'.format(theme.Theme.EXTENSION))))
+        self.assertTrue(theme_paths)
+
+        return [theme.Theme(theme_path) for theme_path in theme_paths]
+
+    def test_template_matches_baseline_format(self):
+        for theme in self._themes():
+            data = style.StyleSheet.expand(theme.stylesheet_file())
+            self.assertTrue(data)
+            options = theme.options()
+            for dpi in THEME_DPIS:
+                self.assertEqual(
+                    style.StyleSheetTemplate.compile(data).render(options=options, dpi=dpi, theme_name=theme.name()),
+                    _baseline_format(data, options, dpi, theme.name()),
+                    'Theme "{}" stylesheet differs from baseline at DPI {}'.format(theme.name(), dpi))
+
+    def test_theme_options(self):
+        from tpDcc.libs.resources.core import theme
+
+        theme_path = os.path.join(RESOURCES_FOLDER, 'themes', 'default.{}'.format(theme.Theme.EXTENSION))
+        options = theme.Theme(theme_path).options()
+        # Signals are not options, so options of different instances of the same theme are equal
+        self.assertNotIn('updated', options)
+        self.assertEqual(theme.Theme(theme_path).options(), options)
+
+    def test_incremental_render_matches_full_render(self):
+        themes = self._themes()
+        data = style.StyleSheet.expand(themes[0].stylesheet_file())
+        renderer = style.StyleSheetRenderer(data)
+        for theme in themes:
+            options = theme.options()
+            for dpi in THEME_DPIS:
+                stylesheet = renderer.update(options=options, dpi=dpi, theme_name=themes[0].name())[0]
+                self.assertEqual(
+                    stylesheet,
+                    style.StyleSheetTemplate.compile(data).render(
+                        options=options, dpi=dpi, theme_name=themes[0].name()),
+                    'Incremental render of theme "{}" differs from full render at DPI {}'.format(theme.name(), dpi))
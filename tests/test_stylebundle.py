@@ -0,0 +1,140 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources ahead of time stylesheet bundles
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from Qt.QtWidgets import QApplication
+
+from tpDcc.managers import resources
+from tpDcc.libs.unittests.core import unittestcase
+
+from tpDcc.libs.resources.core import utils, style, stylecache, stylebundle, theme
+
+RESOURCES_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(style.__file__)))
+BUNDLE_DPIS = (1, 2)
+
+
+class StyleSheetBundleTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    @classmethod
+    def setUpClass(cls):
+        super(StyleSheetBundleTests, cls).setUpClass()
+        cls._app = QApplication.instance() or QApplication([])
+        resources.register_resource(RESOURCES_FOLDER, key='tpDcc-libs-resources')
+        # Sizes are scaled by the DPI of the screen, so a fixed multiplier is used to get the same stylesheets in
+        # every machine
+        cls._dpi_multiplier_patch = mock.patch.object(utils, 'dpi_multiplier', return_value=1.0)
+        cls._dpi_multiplier_patch.start()
+        # Include tree hashes are kept in memory, so tests do not write into the user cache folder
+        cls._cache_patch = mock.patch.object(stylecache, '_CACHE', [stylecache.StyleSheetCache()])
+        cls._cache_patch.start()
+        cls._bundle_path = cls.get_temp_filename(stylebundle.BUNDLE_FILE_NAME)
+        stylebundle.build_bundle(output_path=cls._bundle_path, dpi_buckets=BUNDLE_DPIS)
+
+    @classmethod
+    def tearDownClass(cls):
+        stylebundle.clear_bundle()
+        cls._cache_patch.stop()
+        cls._dpi_multiplier_patch.stop()
+        cls.delete_temp_files()
+        super(StyleSheetBundleTests, cls).tearDownClass()
+
+    def _theme(self):
+        return theme.Theme(os.path.join(RESOURCES_FOLDER, 'themes', 'default.{}'.format(theme.Theme.EXTENSION)))
+
+    def _style_path(self, bundle_theme):
+        return os.path.join(
+            RESOURCES_FOLDER, 'styles', '{}.{}'.format(bundle_theme.style(), style.StyleSheet.EXTENSION))
+
+    def test_tokenize(self):
+        file_path = os.path.join(stylebundle.resources_folder(), 'icons', 'close.png')
+        tokenized = stylebundle.tokenize('image: url({});'.format(file_path))
+        self.assertEqual(tokenized, 'image: url({});'.format(
+            file_path.replace(stylebundle.resources_folder(), stylebundle.RESOURCES_TOKEN)))
+        self.assertEqual(stylebundle.detokenize(tokenized), 'image: url({});'.format(
+            file_path.replace(os.sep, '/')))
+        self.assertEqual(stylebundle.detokenize('color: red;'), 'color: red;')
+
+    def test_entry_key(self):
+        self.assertEqual(stylebundle.entry_key('Default', 'default', 1), 'Default|default|1')
+        self.assertEqual(stylebundle.entry_key('Default', 'default', 1.5), 'Default|default|1.5')
+        self.assertEqual(
+            stylebundle.entry_key('Default', 'default', 2.0), stylebundle.entry_key('Default', 'default', 2))
+
+    def test_options_hash(self):
+        options = {'text_color': 'red', 'icon': os.path.join(stylebundle.resources_folder(), 'icons', 'close.png')}
+        self.assertEqual(stylebundle.options_hash(options), stylebundle.options_hash(dict(options)))
+        self.assertNotEqual(
+            stylebundle.options_hash(options), stylebundle.options_hash(dict(options, text_color='blue')))
+        self.assertEqual(
+            stylebundle.options_hash({'icon': os.path.join(stylebundle.resources_folder(), 'close.png')}),
+            stylebundle.options_hash({'icon': os.path.join(stylebundle.RESOURCES_TOKEN, 'close.png')}))
+
+    def test_bundled_stylesheets_match_renderer(self):
+        bundle = stylebundle.StyleSheetBundle(self._bundle_path)
+        self.assertTrue(bundle.is_valid())
+        bundle_theme = self._theme()
+        style_path = self._style_path(bundle_theme)
+        options = bundle_theme.options(style_path=style_path)
+        renderer = style.StyleSheetRenderer(
+            style.StyleSheet.expand(style_path), optimize=theme.Theme.OPTIMIZE_STYLESHEET)
+        for dpi in BUNDLE_DPIS:
+            self.assertEqual(
+                bundle.get(style_path, bundle_theme.name(), options, dpi=dpi,
+                           optimize=theme.Theme.OPTIMIZE_STYLESHEET),
+                renderer.render(options=options, dpi=dpi, theme_name=bundle_theme.name()))
+
+    def test_stylesheets_not_bundled(self):
+        bundle = stylebundle.StyleSheetBundle(self._bundle_path)
+        bundle_theme = self._theme()
+        style_path = self._style_path(bundle_theme)
+        options = bundle_theme.options(style_path=style_path)
+        optimize = theme.Theme.OPTIMIZE_STYLESHEET
+        self.assertIsNotNone(bundle.get(style_path, bundle_theme.name(), options, optimize=optimize))
+        self.assertIsNone(bundle.get(style_path, bundle_theme.name(), options, dpi=1.5, optimize=optimize))
+        self.assertIsNone(bundle.get(style_path, bundle_theme.name(), options, optimize=not optimize))
+        self.assertIsNone(bundle.get(style_path, bundle_theme.name(), options, dpi_multiplier=2, optimize=optimize))
+        self.assertIsNone(bundle.get(None, bundle_theme.name(), options, optimize=optimize))
+        self.assertIsNone(bundle.get(style_path, 'Missing', options, optimize=optimize))
+
+        # Stylesheets rendered with custom options are never returned
+        custom_options = dict(options, custom_option='red')
+        self.assertIsNone(bundle.get(style_path, bundle_theme.name(), custom_options, optimize=optimize))
+
+    def test_resource_roots_changed(self):
+        bundle = stylebundle.StyleSheetBundle(self._bundle_path)
+        bundle_theme = self._theme()
+        style_path = self._style_path(bundle_theme)
+        options = bundle_theme.options(style_path=style_path)
+        resources_paths = resources.get_resources_paths()
+        with mock.patch.object(
+                resources, 'get_resources_paths', return_value=resources_paths + [self.get_temp_filename('extra')]):
+            self.assertIsNone(
+                bundle.get(style_path, bundle_theme.name(), options, optimize=theme.Theme.OPTIMIZE_STYLESHEET))
+
+    def test_invalid_bundles(self):
+        with mock.patch.object(stylecache, 'library_version', return_value='0.0.0'):
+            self.assertFalse(stylebundle.StyleSheetBundle(self._bundle_path).is_valid())
+        self.assertFalse(stylebundle.StyleSheetBundle(self.get_temp_filename('missing.bundle')).is_valid())
+
+    def test_get_bundle(self):
+        with mock.patch.dict(os.environ, {stylebundle.BUNDLE_PATH_ENV: self._bundle_path}):
+            stylebundle.clear_bundle()
+            bundle = stylebundle.get_bundle()
+            self.assertEqual(bundle.file, self._bundle_path)
+            self.assertIs(stylebundle.get_bundle(), bundle)
+        with mock.patch.dict(os.environ, {stylebundle.BUNDLE_PATH_ENV: self.get_temp_filename('missing.bundle')}):
+            stylebundle.clear_bundle()
+            self.assertIsNone(stylebundle.get_bundle())
+        stylebundle.clear_bundle()
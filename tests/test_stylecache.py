@@ -0,0 +1,132 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-resources rendered stylesheets cache
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from tpDcc.libs.unittests.core import settings, unittestcase
+
+from tpDcc.libs.resources.core import style, stylecache
+
+
+class StyleSheetCacheTests(unittestcase.UnitTestCase(as_class=True), object):
+
+    @classmethod
+    def tearDownClass(cls):
+        style.StyleSheet.clear_include_cache()
+        cls.delete_temp_files()
+        super(StyleSheetCacheTests, cls).tearDownClass()
+
+    def _write(self, file_path, data):
+        with open(file_path, 'w') as fh:
+            fh.write(data)
+        # Make sure modification time changes even in file systems with low time resolution
+        file_time = time.time() + len(data)
+        os.utime(file_path, (file_time, file_time))
+
+    def _style_file(self, data='QLabel { color: @text_color; }'):
+        style_path = self.get_temp_filename('style.css')
+        self._write(style_path, data)
+        return style_path
+
+    def _temp_folder(self, folder_name):
+        # Folders are not registered as temporary files, they are removed with the whole temporary directory
+        return os.path.join(settings.UnitTestSettings().temp_dir, folder_name)
+
+    def _stylesheet_files(self, folder):
+        return [file_name for file_name in os.listdir(folder) if file_name.endswith(stylecache.STYLESHEET_EXTENSION)]
+
+    def test_key(self):
+        cache = stylecache.StyleSheetCache()
+        style_path = self._style_file()
+        key = cache.key(style_path, options={'text_color': 'red'}, dpi=1, theme_name='Default')
+        self.assertTrue(key)
+        self.assertEqual(key, cache.key(style_path, options={'text_color': 'red'}, dpi=1, theme_name='Default'))
+        self.assertNotEqual(key, cache.key(style_path, options={'text_color': 'blue'}, dpi=1, theme_name='Default'))
+        self.assertNotEqual(key, cache.key(style_path, options={'text_color': 'red'}, dpi=2, theme_name='Default'))
+        self.assertNotEqual(key, cache.key(style_path, options={'text_color': 'red'}, dpi=1, theme_name='Dark'))
+        self.assertIsNone(cache.key(self.get_temp_filename('missing.css')))
+
+    def test_tree_hash(self):
+        cache = stylecache.StyleSheetCache()
+        style_path = self._style_file()
+        include_path = os.path.join(os.path.dirname(style_path), 'included.css')
+        self.files_created.append(include_path)
+        self._write(include_path, 'QFrame { color: red; }')
+        self._write(style_path, '#include included.css')
+        tree_hash = cache.tree_hash(style_path)
+        self.assertEqual(cache.tree_hash(style_path), tree_hash)
+
+        # Changes in included files change the hash of the tree
+        self._write(include_path, 'QFrame { color: blue; }')
+        self.assertNotEqual(cache.tree_hash(style_path), tree_hash)
+
+    def test_memory_cache(self):
+        cache = stylecache.StyleSheetCache()
+        key = cache.key(self._style_file())
+        self.assertIsNone(cache.get(key))
+        cache.set(key, 'QLabel { color: red; }')
+        self.assertEqual(cache.get(key), 'QLabel { color: red; }')
+        self.assertIsNone(cache.get(None))
+        cache.clear()
+        self.assertIsNone(cache.get(key))
+
+    def test_disk_cache(self):
+        folder = self._temp_folder('disk_cache')
+        cache = stylecache.StyleSheetCache(folder)
+        style_path = self._style_file()
+        key = cache.key(style_path)
+        cache.set(key, 'QLabel { color: red; }')
+        self.assertTrue(os.path.isfile(os.path.join(folder, stylecache.TREES_FILE_NAME)))
+
+        # A new cache finds both the include tree hash and the stylesheet on disk
+        new_cache = stylecache.StyleSheetCache(folder)
+        self.assertEqual(new_cache.key(style_path), key)
+        self.assertEqual(new_cache.get(key), 'QLabel { color: red; }')
+
+        cache.clear(disk=True)
+        self.assertEqual(self._stylesheet_files(folder), list())
+        self.assertIsNone(stylecache.StyleSheetCache(folder).get(key))
+
+    def test_not_persisted(self):
+        folder = self._temp_folder('memory_cache')
+        cache = stylecache.StyleSheetCache(folder)
+        key = cache.key(self._style_file())
+        cache.set(key, 'QLabel { color: red; }', persist=False)
+        self.assertEqual(cache.get(key), 'QLabel { color: red; }')
+        self.assertIsNone(stylecache.StyleSheetCache(folder).get(key))
+
+    def test_disk_cache_is_bounded(self):
+        folder = self._temp_folder('bounded_cache')
+        cache = stylecache.StyleSheetCache(folder)
+        style_path = self._style_file()
+        with mock.patch.object(stylecache, 'MAX_DISK_CACHE', 2):
+            keys = list()
+            for i in range(4):
+                key = cache.key(style_path, dpi=i + 1)
+                cache.set(key, 'QLabel {{ width: {}px; }}'.format(i))
+                # Least recently used files are found by their modification time
+                file_time = time.time() - 100 + i
+                stylesheet_path = os.path.join(folder, '{}.{}'.format(key, stylecache.STYLESHEET_EXTENSION))
+                os.utime(stylesheet_path, (file_time, file_time))
+                keys.append(key)
+        self.assertEqual(
+            sorted(self._stylesheet_files(folder)),
+            sorted('{}.{}'.format(key, stylecache.STYLESHEET_EXTENSION) for key in keys[-2:]))
+
+    def test_default_cache_folder(self):
+        with mock.patch.dict(os.environ, {stylecache.CACHE_FOLDER_ENV: 'stylesheets_folder'}):
+            self.assertEqual(stylecache.default_cache_folder(), 'stylesheets_folder')
+        with mock.patch.dict(os.environ, {stylecache.CACHE_FOLDER_ENV: ''}):
+            self.assertIsNone(stylecache.default_cache_folder())
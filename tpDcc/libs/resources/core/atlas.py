@@ -0,0 +1,422 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to pack icon themes into atlas images and to load icons from them
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import math
+import time
+import json
+import logging
+
+from Qt.QtCore import Qt, QRect
+from Qt.QtGui import QImage, QPixmap, QPainter
+
+from tpDcc.libs.resources.core import utils, image as qt_image
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
+
+ATLAS_VERSION = 3
+ATLAS_EXTENSION = 'atlas'
+ATLAS_PAGE_FORMAT = '{}_atlas_{}.png'
+ATLAS_SOURCE_EXTENSIONS = ('png',)
+MAX_ATLAS_SIZE = 2048
+ATLAS_PADDING = 1
+
+_ATLAS_CACHE = dict()
+
+
+class IconAtlas(object):
+    """
+    Runtime loader for an atlas generated with build_atlas function. Each atlas page is decoded only once and
+    icons are returned as sub-rect copies of those pages.
+    If the folder of the source icons is given, icons whose source file was modified after the atlas was built are
+    not returned, so they are loaded from their source file. Atlases shipped with the library are never checked
+    """
+
+    def __init__(self, atlas_file, source_folder=None):
+        super(IconAtlas, self).__init__()
+
+        self._file = atlas_file
+        self._source_folder = source_folder
+        self._build_time = None
+        self._pages_paths = list()
+        self._entries = dict()
+        self._pages = dict()
+        self._pixmaps = dict()
+        self._modified = None
+
+        self._load(atlas_file)
+
+    @property
+    def file(self):
+        """
+        Returns path where atlas offset table file is located
+        :return: str
+        """
+
+        return self._file
+
+    def _load(self, atlas_file):
+        """
+        Internal function that loads offset table from given atlas file
+        :param atlas_file: str
+        """
+
+        try:
+            with open(atlas_file, 'r') as fh:
+                atlas_data = json.load(fh)
+        except Exception:
+            LOGGER.warning('Impossible to load icon atlas file: "{}"!'.format(atlas_file))
+            return
+
+        if atlas_data.get('version', None) != ATLAS_VERSION:
+            LOGGER.warning('Icon atlas file "{}" was generated with a different version. Skipping it!'.format(
+                atlas_file))
+            return
+
+        atlas_dir = os.path.dirname(atlas_file)
+        self._pages_paths = [os.path.join(atlas_dir, page_name) for page_name in atlas_data.get('pages', list())]
+        self._entries = atlas_data.get('icons', dict())
+        self._build_time = atlas_data.get('build_time', None)
+
+    def names(self):
+        """
+        Returns all icon file names stored within this atlas
+        :return: list(str)
+        """
+
+        return list(self._entries.keys())
+
+    def has_icon(self, name):
+        """
+        Returns whether or not given icon file name is stored within this atlas
+        :param name: str
+        :return: bool
+        """
+
+        return name in self._entries
+
+    def rect(self, name):
+        """
+        Returns the rect the given icon occupies within its atlas page
+        :param name: str
+        :return: QRect or None
+        """
+
+        entry = self._entries.get(name, None)
+        if not entry:
+            return None
+
+        return QRect(entry[1], entry[2], entry[3], entry[4])
+
+    def is_up_to_date(self, name):
+        """
+        Returns whether or not the source file of the given icon was not modified after the atlas was built
+        :param name: str, icon file name
+        :return: bool
+        """
+
+        return name in self._entries and name not in self.modified_names()
+
+    def modified_names(self):
+        """
+        Returns the names of the icons whose source file was removed or modified after the atlas was built. Source
+        files are only checked once (the first time this function is called) and they are never checked for
+        atlases shipped with the library, because file modification times change when the library is installed
+        :return: set(str)
+        """
+
+        if self._modified is not None:
+            return self._modified
+
+        self._modified = set()
+        if not self._source_folder or _is_bundled(self._file):
+            return self._modified
+
+        for name in self._entries:
+            file_stat = utils.file_stat(os.path.join(self._source_folder, name))
+            if file_stat is None or self._build_time is None or file_stat[0] > self._build_time:
+                self._modified.add(name)
+
+        return self._modified
+
+    def pixmap(self, name):
+        """
+        Returns pixmap of the given icon file name
+        :param name: str
+        :return: QPixmap or None
+        """
+
+        pixmap = self._pixmaps.get(name, None)
+        if pixmap is not None:
+            return pixmap
+
+        entry = self._entries.get(name, None)
+        if not entry:
+            return None
+
+        page = self._page(entry[0])
+        if page is None or page.isNull():
+            return None
+
+        pixmap = page.copy(entry[1], entry[2], entry[3], entry[4])
+        self._pixmaps[name] = pixmap
+
+        return pixmap
+
+    def clear(self):
+        """
+        Releases all decoded pages and pixmaps of this atlas
+        """
+
+        self._pages.clear()
+        self._pixmaps.clear()
+        self._modified = None
+
+    def _page(self, index):
+        """
+        Internal function that returns decoded page with given index. Pages are decoded the first time they are
+        requested
+        :param index: int
+        :return: QPixmap or None
+        """
+
+        page = self._pages.get(index, None)
+        if page is not None:
+            return page
+
+        if index >= len(self._pages_paths):
+            return None
+
+        page = QPixmap.fromImage(qt_image.read_image(self._pages_paths[index]))
+        self._pages[index] = page
+
+        return page
+
+
+def atlas_file_path(folder):
+    """
+    Returns path of the atlas offset table file for the given icons folder
+    :param folder: str, icons theme folder (for example, icons/default)
+    :return: str
+    """
+
+    folder = os.path.normpath(folder)
+
+    return os.path.join(os.path.dirname(folder), '{}.{}'.format(os.path.basename(folder), ATLAS_EXTENSION))
+
+
+def get_atlas(folder):
+    """
+    Returns the icon atlas of the given icons folder. Atlases are loaded only once.
+    :param folder: str, icons theme folder (for example, icons/default)
+    :return: IconAtlas or None
+    """
+
+    folder = os.path.normpath(folder)
+    if folder in _ATLAS_CACHE:
+        return _ATLAS_CACHE[folder]
+
+    atlas = None
+    atlas_file = atlas_file_path(folder)
+    if os.path.isfile(atlas_file):
+        atlas = IconAtlas(atlas_file, source_folder=folder)
+    _ATLAS_CACHE[folder] = atlas
+
+    return atlas
+
+
+def atlas_pixmap(path):
+    """
+    Returns the pixmap of the given image path from its folder atlas, if available
+    :param path: str, path of the image file
+    :return: QPixmap or None
+    """
+
+    if not path:
+        return None
+
+    extension = os.path.splitext(path)[-1][1:].lower()
+    if extension not in ATLAS_SOURCE_EXTENSIONS:
+        return None
+
+    atlas = get_atlas(os.path.dirname(path))
+    if not atlas:
+        return None
+
+    # Icons modified after the atlas was built are loaded from their source file
+    name = os.path.basename(path)
+    if not atlas.is_up_to_date(name):
+        return None
+
+    return atlas.pixmap(name)
+
+
+def clear_atlas_cache():
+    """
+    Clears all the loaded atlases
+    """
+
+    for atlas in _ATLAS_CACHE.values():
+        if atlas:
+            atlas.clear()
+    _ATLAS_CACHE.clear()
+
+
+def build_atlas(folder, output_folder=None, max_size=MAX_ATLAS_SIZE, padding=ATLAS_PADDING):
+    """
+    Packs all the icons of the given folder into one or more atlas images and writes an offset table file next to
+    them
+    :param folder: str, icons theme folder (for example, icons/default)
+    :param output_folder: str, folder where atlas files are stored. If not given, parent folder of the theme is used
+    :param max_size: int, maximum width and height of each atlas page
+    :param padding: int, empty pixels left between packed icons
+    :return: str, path of the generated atlas offset table file
+    """
+
+    if not folder or not os.path.isdir(folder):
+        LOGGER.warning('Impossible to build icon atlas because folder "{}" does not exists!'.format(folder))
+        return None
+
+    folder = os.path.normpath(folder)
+    theme_name = os.path.basename(folder)
+    output_folder = output_folder or os.path.dirname(folder)
+    if not os.path.isdir(output_folder):
+        os.makedirs(output_folder)
+
+    # Source files modified while the atlas is built are considered modified after it
+    build_time = time.time()
+    names = list()
+    images = list()
+    for file_name in sorted(os.listdir(folder)):
+        extension = os.path.splitext(file_name)[-1][1:].lower()
+        if extension not in ATLAS_SOURCE_EXTENSIONS:
+            continue
+        image = qt_image.read_image(os.path.join(folder, file_name))
+        if image.isNull():
+            continue
+        if image.width() + padding > max_size or image.height() + padding > max_size:
+            LOGGER.debug('Icon "{}" is too big to be packed into an atlas. Skipping it ...'.format(file_name))
+            continue
+        names.append(file_name)
+        images.append(image)
+
+    placements, page_sizes = _pack([(image.width(), image.height()) for image in images], max_size, padding)
+
+    pages = list()
+    painters = list()
+    for page_width, page_height in page_sizes:
+        page = QImage(max(page_width, 1), max(page_height, 1), qt_image.PREFERRED_FORMAT)
+        page.fill(Qt.transparent)
+        pages.append(page)
+        painters.append(QPainter(page))
+
+    icons = dict()
+    for name, image, placement in zip(names, images, placements):
+        page_index, x, y = placement
+        painters[page_index].drawImage(x, y, image)
+        icons[name] = [page_index, x, y, image.width(), image.height()]
+    for painter in painters:
+        painter.end()
+
+    pages_names = list()
+    for i, page in enumerate(pages):
+        page_name = ATLAS_PAGE_FORMAT.format(theme_name, i)
+        page.save(os.path.join(output_folder, page_name), 'PNG')
+        pages_names.append(page_name)
+
+    atlas_file = os.path.join(output_folder, '{}.{}'.format(theme_name, ATLAS_EXTENSION))
+    with open(atlas_file, 'w') as fh:
+        json.dump(
+            {'version': ATLAS_VERSION, 'build_time': build_time, 'pages': pages_names, 'icons': icons}, fh,
+            separators=(',', ':'))
+
+    _ATLAS_CACHE.pop(folder, None)
+    LOGGER.debug('Packed {} icons of "{}" into {} atlas page(s)'.format(len(icons), folder, len(pages)))
+
+    return atlas_file
+
+
+def build_atlases(icons_folder, max_size=MAX_ATLAS_SIZE, padding=ATLAS_PADDING):
+    """
+    Builds an atlas for each one of the icon themes located in the given folder
+    :param icons_folder: str, folder that contains icon theme folders
+    :param max_size: int, maximum width and height of each atlas page
+    :param padding: int, empty pixels left between packed icons
+    :return: list(str), list of generated atlas offset table files
+    """
+
+    atlas_files = list()
+    if not icons_folder or not os.path.isdir(icons_folder):
+        return atlas_files
+
+    for theme_name in sorted(os.listdir(icons_folder)):
+        theme_folder = os.path.join(icons_folder, theme_name)
+        if not os.path.isdir(theme_folder):
+            continue
+        atlas_file = build_atlas(theme_folder, max_size=max_size, padding=padding)
+        if atlas_file:
+            atlas_files.append(atlas_file)
+
+    return atlas_files
+
+
+def _pack(sizes, max_size, padding):
+    """
+    Internal function that packs given sizes into shelves of pages
+    :param sizes: list(tuple(int, int))
+    :param max_size: int
+    :param padding: int
+    :return: tuple(list(tuple(int, int, int)), list(tuple(int, int))), placement (page, x, y) of each size
+        and the size of each page
+    """
+
+    placements = [None] * len(sizes)
+    if not sizes:
+        return placements, list()
+
+    # Use a roughly square page to keep atlases compact, never narrower than the widest icon
+    total_area = sum((width + padding) * (height + padding) for width, height in sizes)
+    widest = max(width for width, _ in sizes) + padding
+    page_width = min(max_size, max(widest, int(math.ceil(math.sqrt(total_area)))))
+
+    page_sizes = list()
+    page = x = y = shelf_height = used_width = used_height = 0
+    order = sorted(range(len(sizes)), key=lambda i: (sizes[i][1], sizes[i][0]), reverse=True)
+    for i in order:
+        width = sizes[i][0] + padding
+        height = sizes[i][1] + padding
+        if x + width > page_width:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        if y + height > max_size:
+            page_sizes.append((used_width, used_height))
+            page += 1
+            x = y = shelf_height = used_width = used_height = 0
+        placements[i] = (page, x, y)
+        x += width
+        shelf_height = max(shelf_height, height)
+        used_width = max(used_width, x)
+        used_height = max(used_height, y + shelf_height)
+    page_sizes.append((used_width, used_height))
+
+    return placements, page_sizes
+
+
+def _is_bundled(atlas_file):
+    """
+    Internal function that returns whether or not the given atlas file is shipped with the library
+    :param atlas_file: str
+    :return: bool
+    """
+
+    library_folder = os.path.normcase(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    atlas_file = os.path.normcase(os.path.abspath(atlas_file))
+
+    return atlas_file.startswith(library_folder + os.sep)
@@ -8,48 +8,180 @@ Module that defines a base class to cache resources
 from __future__ import print_function, division, absolute_import
 
 import os
+from collections import OrderedDict
 
 from Qt.QtCore import Qt, QByteArray
 from Qt.QtGui import QPixmap, QIcon, QPainter
 from Qt.QtSvg import QSvgRenderer
 
+from tpDcc.libs.resources.core import atlas, image
+
+VARIANTS_CACHE_SIZE = 256
+LINKS_CACHE_SIZE = 1024
+
 
 class CacheResource(object):
 
     _render = QSvgRenderer()
 
-    def __init__(self, cls):
+    def __init__(self, cls, use_atlas=False):
         super(CacheResource, self).__init__()
 
         self._cls = cls
+        self._use_atlas = use_atlas
         self._resources_path_cache = dict()
         self._resources_keys_cache = dict()
         self._resources_names_cache = dict()
         self._resources_names_keys_mapping = dict()
+        self._resources_sources_mapping = dict()
+        self._resources_links_cache = LRUCache(LINKS_CACHE_SIZE)
+        self._resources_variants_cache = LRUCache(VARIANTS_CACHE_SIZE)
+
+    def __call__(self, path, color=None, skip_cache=False, size=None, clip_rect=None, source_image=None):
+        """
+        Returns the cached resource of the given path. If it is not cached yet, it is created and cached
+        :param path: str
+        :param color: str or None, color of the resource
+        :param skip_cache: bool, whether or not a new resource should not be cached
+        :param size: QSize or int or None, size of the resource. It is rounded up to its size bucket
+        :param clip_rect: QRect or None, rect of the source image the resource is created from
+        :param source_image: QImage or None, image of the path already decoded (for example, in a worker thread) with
+            the given size and clip rect. If given, it is used instead of decoding the path again
+        :return: variant or None
+        """
 
-    def __call__(self, path, color=None, skip_cache=False):
-        if not path or not os.path.isfile(path):
+        if not path:
             return None
 
-        key = '{}{}'.format(path.lower(), color or '')
+        if size is not None:
+            size = image.size_bucket(size)
+
+        key = self._key(path, color=color, size=size, clip_rect=clip_rect)
         resource = self._resources_path_cache.get(key, None)
         if not resource:
-            if path.endswith('svg'):
+            # Atlas cells are stored at their source size, so they are only used when no size or rect is requested
+            use_atlas = self._use_atlas and size is None and clip_rect is None
+            atlas_pixmap = atlas.atlas_pixmap(path) if use_atlas else None
+            if atlas_pixmap is None and not os.path.isfile(path):
+                return None
+            if atlas_pixmap is not None:
+                resource = self._cls(atlas_pixmap)
+                if color:
+                    resource.set_color(color)
+            elif path.endswith('svg'):
                 resource = self._render_svg(path, color)
+            elif source_image is not None or issubclass(self._cls, QPixmap) or (
+                    (size is not None or clip_rect is not None) and issubclass(self._cls, QIcon)):
+                # Images are decoded and normalized to the preferred format only once, before they are cached
+                if source_image is None:
+                    source_image = image.read_image(path, size=size, clip_rect=clip_rect)
+                resource = self._cls(QPixmap.fromImage(image.normalize_image(source_image)))
+                if color:
+                    resource.set_color(color)
             else:
                 resource = self._cls(path)
                 if color:
                     resource.set_color(color)
 
             if not skip_cache:
-                self._resources_path_cache.update({key: resource})
-                self._resources_names_cache.update({os.path.basename(path): resource})
-                if hasattr(resource, 'cacheKey'):
-                    self._resources_keys_cache.update({resource.cacheKey(): resource})
-                    self._resources_names_keys_mapping.update({resource.cacheKey(): os.path.basename(path)})
+                self.add(path, resource, color=color, size=size, clip_rect=clip_rect)
 
         return resource
 
+    def contains(self, path, color=None, size=None, clip_rect=None):
+        """
+        Returns whether or not the resource of the given path and color is already cached
+        :param path: str
+        :param color: str or None
+        :param size: QSize or None, size bucket of the resource
+        :param clip_rect: QRect or None
+        :return: bool
+        """
+
+        return self._key(path, color=color, size=size, clip_rect=clip_rect) in self._resources_path_cache
+
+    def add(self, path, resource, color=None, size=None, clip_rect=None):
+        """
+        Stores given resource in the cache as the resource of the given path and color
+        :param path: str
+        :param resource: variant
+        :param color: str or None
+        :param size: QSize or None, size bucket of the resource
+        :param clip_rect: QRect or None
+        """
+
+        key = self._key(path, color=color, size=size, clip_rect=clip_rect)
+        self._resources_path_cache.update({key: resource})
+        if size is None and clip_rect is None:
+            self._resources_names_cache.update({os.path.basename(path): resource})
+        if hasattr(resource, 'cacheKey'):
+            self._resources_keys_cache.update({resource.cacheKey(): resource})
+            self._resources_names_keys_mapping.update({resource.cacheKey(): os.path.basename(path)})
+            self._resources_sources_mapping.update({resource.cacheKey(): key})
+
+    def source_key(self, resource):
+        """
+        Returns the key that identifies the source the given resource was created from. Resources that are not
+        cached are identified by their cache key
+        :param resource: QPixmap or QIcon
+        :return: str or int
+        """
+
+        cache_key = resource.cacheKey()
+        source_key = self._resources_sources_mapping.get(cache_key, None)
+        if source_key is None:
+            source_key = self._resources_links_cache.get(cache_key, cache_key)
+
+        return source_key
+
+    def link(self, resource, source_key):
+        """
+        Links given resource with the given source key. Must be called after modifying a resource in place, because
+        its cache key changes after any modification. Only the most recently used links are kept
+        :param resource: QPixmap or QIcon
+        :param source_key: str or int
+        """
+
+        self._resources_links_cache.set(resource.cacheKey(), source_key)
+
+    def variant(self, resource, variant_name, size, generator):
+        """
+        Returns a variant (for example, disabled or grayscale) of the given resource with the given size.
+        Variants are generated only once per source and size and shared by every resource that refers to the
+        same source. Only the most recently used variants are kept, so variants of transient resources are released
+        :param resource: QPixmap or QIcon
+        :param variant_name: str, name of the variant
+        :param size: QSize
+        :param generator: callable, function that receives the resource and the size and returns the variant
+        :return: QPixmap
+        """
+
+        key = (self.source_key(resource), variant_name, size.width(), size.height())
+        variant = self._resources_variants_cache.get(key, None)
+        if variant is None:
+            variant = generator(resource, size)
+            self._resources_variants_cache.set(key, variant)
+
+        return variant
+
+    def _key(self, path, color=None, size=None, clip_rect=None):
+        """
+        Internal function that returns the cache key of the resource of the given path
+        :param path: str
+        :param color: str or None
+        :param size: QSize or None
+        :param clip_rect: QRect or None
+        :return: str
+        """
+
+        key = '{}{}'.format(path.lower(), color or '')
+        if size is not None:
+            key += '@{}x{}'.format(size.width(), size.height())
+        if clip_rect is not None:
+            key += '#{},{},{},{}'.format(clip_rect.x(), clip_rect.y(), clip_rect.width(), clip_rect.height())
+
+        return key
+
     def _render_svg(self, svg_path, replace_color=None):
         if issubclass(self._cls, QIcon) and not replace_color:
             return QIcon(svg_path)
@@ -68,3 +200,56 @@ class CacheResource(object):
                     return pix
                 else:
                     return self._cls(pix)
+
+
+class LRUCache(object):
+    """
+    Bounded cache that discards least recently used items when it is full
+    """
+
+    def __init__(self, max_size=256):
+        super(LRUCache, self).__init__()
+
+        self._max_size = max_size
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        """
+        Returns cached value of the given key
+        :param key: hashable
+        :param default: variant, value returned if the key is not cached
+        :return: variant
+        """
+
+        try:
+            value = self._items.pop(key)
+        except KeyError:
+            return default
+        self._items[key] = value
+
+        return value
+
+    def set(self, key, value):
+        """
+        Caches given value with the given key
+        :param key: hashable
+        :param value: variant
+        """
+
+        self._items.pop(key, None)
+        while self._max_size and len(self._items) >= self._max_size:
+            self._items.popitem(last=False)
+        self._items[key] = value
+
+    def clear(self):
+        """
+        Removes all cached values
+        """
+
+        self._items.clear()
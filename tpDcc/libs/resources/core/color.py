@@ -7,19 +7,18 @@ Module that defines that extends QColor functionality
 
 from __future__ import print_function, division, absolute_import
 
-import math
 import random
 
-from Qt.QtCore import Qt, QRegExp, qFuzzyCompare
+from Qt.QtCore import qFuzzyCompare
 from Qt.QtGui import QColor
 
 from tpDcc.libs.python import python
-
-_NUMERALS = '0123456789abcdefABCDEF'
-_HEXDEC = {v: int(v, 16) for v in (x + y for x in _NUMERALS for y in _NUMERALS)}
+from tpDcc.libs.resources.core import rgba, palette, colormath
 
 _LOWERCASE, _UPPERCASE = 'x', 'X'
 
+# Not used by this module anymore (color strings are parsed by rgba module precompiled patterns). Kept only
+# for backwards compatibility with external code that imports them
 REGEX_QCOLOR = r"^(?:(?:#[A-Fa-f0-9]{3})|(?:#[A-Fa-f0-9]{6})|(?:[a-zA-Z]+))$"
 REGEX_FN_RGB = r"(^rgb\s*\(\s*([0-9]+)\s*,\s*([0-9]+)\s*,\s*([0-9]+)\s*\)$)"
 REGEX_HEX_RGBA = r"^#[A-Fa-f0-9]{8}$"
@@ -28,13 +27,26 @@ REGEX_FN_RGBA = r"(^rgba?\s*\(\s*([0-9]+)\s*,\s*([0-9]+)\s*,\s*([0-9]+)\s*,\s*([
 
 class Color(QColor, object):
     def __eq__(self, other):
-        if other == self:
-            return True
-        elif isinstance(other, Color):
-            return self.to_string() == other.to_string()
+        if isinstance(other, rgba.RGBA):
+            return self.rgba() == other.packed()
+        elif isinstance(other, QColor):
+            return self.getRgb() == other.getRgb()
         else:
             return False
 
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    @classmethod
+    def from_rgba(cls, value):
+        """
+        Returns a new color from the given Qt independent RGBA color value
+        :param value: rgba.RGBA
+        :return: Color
+        """
+
+        return cls(*value.to_tuple())
+
     @classmethod
     def from_color(cls, color):
         """
@@ -55,22 +67,15 @@ class Color(QColor, object):
         :return: (int, int, int, int)
         """
 
-        a = 255
-        if string_is_hex(text_color):
-            r, g, b = cls.rgb_from_hex(text_color)
-        else:
-            try:
-                if text_color.startswith('rgba'):
-                    r, g, b, a = text_color.replace('rgba(', '').replace(')', '').split(',')
-                else:
-                    r, g, b, a = text_color.replace('rgb(', '').replace(')', '').split(',')
-            except ValueError:
-                if text_color.startswith('rgba'):
-                    r, g, b = text_color.replace('rgba(', '').replace(')', '').split(',')
-                else:
-                    r, g, b = text_color.replace('rgb(', '').replace(')', '').split(',')
-
-        return cls(int(r), int(g), int(b), int(a))
+        components = rgba.parse(text_color)
+        if components is None:
+            # Color names (such as red) are resolved by Qt
+            named_color = QColor(text_color.strip()) if rgba.is_name(text_color.strip()) else QColor()
+            if not named_color.isValid():
+                raise ValueError('Impossible to parse color from string: "{}"'.format(text_color))
+            return cls(named_color)
+
+        return cls(*components)
 
     @classmethod
     def rgb_from_hex(cls, triplet):
@@ -79,14 +84,7 @@ class Color(QColor, object):
         :param triplet: r,g,b Hexadecimal Color tuple
         """
 
-        if triplet.startswith('#'):
-            triplet = triplet[1:]
-
-        if len(triplet) == 3:
-            r, g, b = triplet[0] * 2, triplet[1] * 2, triplet[2] * 2
-            return tuple([float(int(v, 16)) for v in (r, g, b)])
-
-        return _HEXDEC[triplet[0:2]], _HEXDEC[triplet[2:4]], _HEXDEC[triplet[4:6]]
+        return rgba.parse_hex(triplet)[:3]
 
     @classmethod
     def hex_from_rgb(cls, rgb, lettercase=_LOWERCASE):
@@ -140,10 +138,7 @@ class Color(QColor, object):
         Converts a Hexadecimal color to QColor
         """
 
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
-        return QColor(r, g, b)
+        return QColor(*rgba.parse_hex(hex_color)[:3])
 
     @classmethod
     def get_complementary_color(cls, color):
@@ -203,6 +198,14 @@ class Color(QColor, object):
 
         return 'rgba(%d, %d, %d, %d)' % self.getRgb()
 
+    def to_rgba(self):
+        """
+        Returns the Qt independent, immutable and hashable value of this color
+        :return: rgba.RGBA
+        """
+
+        return rgba.RGBA(*self.getRgb())
+
     def is_dark(self):
         """
         Return True if the color is considered dark (RGB < 125(mid grey)) or False otherwise
@@ -265,15 +268,7 @@ def string_is_hex(color_str):
     :return: bool
     """
 
-    if color_str.startswith('#'):
-        color_str = color_str[1:]
-    hex_regex1 = QRegExp('^[0-9A-F]{3}$', Qt.CaseInsensitive)
-    hex_regex2 = QRegExp('^[0-9A-F]{6}$', Qt.CaseInsensitive)
-    hex_regex3 = QRegExp('^[0-9A-F]{8}$', Qt.CaseInsensitive)
-    if hex_regex1.exactMatch(color_str) or hex_regex2.exactMatch(color_str) or hex_regex3.exactMatch(color_str):
-        return True
-
-    return False
+    return rgba.is_hex(color_str)
 
 
 def convert_2_hex(color):
@@ -286,24 +281,12 @@ def convert_2_hex(color):
     if python.is_string(color):
         if string_is_hex(color):
             return color
-        else:
-            if color.startswith('rgba'):
-                color = [int(value.strip()) for value in color.split('rgba(')[-1].split(')')[0].split(',')]
-            elif color.startswith('rgb'):
-                color = [int(value.strip()) for value in color.split('rgb(')[-1].split(')')[0].split(',')]
-
-    hex = '#'
-    for var in color:
-        var = format(var, 'x')
-        if len(var) == 1:
-            hex += '0' + str(var)
-        else:
-            hex += str(var)
+        components = rgba.parse_function(color)
+        if components is None:
+            raise ValueError('Impossible to convert color "{}" to hexadecimal'.format(color))
+        color = components
 
-    if len(hex) == 9:
-        hex = '#{}{}'.format(hex[-2:], hex[1:-2])
-
-    return hex
+    return rgba.to_hex(color)
 
 
 def generate_color(primary_color, index):
@@ -315,55 +298,40 @@ def generate_color(primary_color, index):
     :return: out color Color
     """
 
-    hue_step = 2
-    saturation_step = 16
-    saturation_step2 = 5
-    brightness_step1 = 5
-    brightness_step2 = 15
-    light_color_count = 5
-    dark_color_count = 4
-
-    def _get_hue(color, i, is_light):
-        h_comp = color.hue()
-        if 60 <= h_comp <= 240:
-            hue = h_comp - hue_step * i if is_light else h_comp + hue_step * i
-        else:
-            hue = h_comp + hue_step * i if is_light else h_comp - hue_step * i
-        if hue < 0:
-            hue += 359
-        elif hue >= 359:
-            hue -= 359
-        return hue / 359.0
-
-    def _get_saturation(color, i, is_light):
-        s_comp = color.saturationF() * 100
-        if is_light:
-            saturation = s_comp - saturation_step * i
-        elif i == dark_color_count:
-            saturation = s_comp + saturation_step
-        else:
-            saturation = s_comp + saturation_step2 * i
-        saturation = min(100.0, saturation)
-        if is_light and i == light_color_count and saturation > 10:
-            saturation = 10
-        saturation = max(6.0, saturation)
-        return round(saturation * 10) / 1000.0
-
-    def _get_value(color, i, is_light):
-        v_comp = color.valueF()
-        if is_light:
-            return min((v_comp * 100 + brightness_step1 * i) / 100, 1.0)
-        return max((v_comp * 100 - brightness_step2 * i) / 100, 0.0)
-
-    light = index <= 6
-    hsv_color = Color(primary_color) if python.is_string(primary_color) else primary_color
-    index = light_color_count + 1 - index if light else index - light_color_count - 1
-
-    return Color.fromHsvF(
-        _get_hue(hsv_color, index, light),
-        _get_saturation(hsv_color, index, light),
-        _get_value(hsv_color, index, light)
-    ).name()
+    rgb = _rgb_components(primary_color)
+    if 1 <= index <= palette.PALETTE_STEPS:
+        return palette.generate_palette(rgb)[index - 1]
+
+    return palette.step_color(QColor(*rgb), index)
+
+
+def generate_palettes(primary_colors):
+    """
+    Generates the 10 steps palette (from 1, light, to 10, dark) of each one of the given colors in a single call
+    :param primary_colors: list(str or QColor or rgba.RGBA or tuple), base colors
+    :return: list(tuple(str)), palette of each one of the given base colors
+    """
+
+    return palette.generate_palettes([_rgb_components(primary_color) for primary_color in primary_colors])
+
+
+def _rgb_components(value):
+    """
+    Internal function that returns the RGB components of the given color value
+    :param value: str or QColor or rgba.RGBA or tuple(int, int, int)
+    :return: tuple(int, int, int)
+    """
+
+    if python.is_string(value):
+        components = rgba.parse(value)
+        if components is not None:
+            return components[:3]
+        value = QColor(value)
+    if isinstance(value, QColor):
+        return value.red(), value.green(), value.blue()
+
+    # Tuples and RGBA color values
+    return tuple(value[:3])
 
 
 def string_from_color(color, alpha):
@@ -374,31 +342,14 @@ def string_from_color(color, alpha):
 
 
 def color_from_string(string, alpha):
+    components = rgba.parse_css(string, alpha)
+    if components is not None:
+        return QColor(*components)
+
     xs = string.strip()
-    regex = QRegExp(REGEX_QCOLOR)
-    match = regex.exactMatch(xs)
-    if match:
+    if rgba.is_name(xs):
         return QColor(xs)
 
-    regex = QRegExp(REGEX_FN_RGB)
-    match = regex.exactMatch(xs)
-    if match:
-        captured_texts = regex.capturedTexts()
-        return QColor(int(captured_texts[-3]), int(captured_texts[-2]), int(captured_texts[-1]))
-
-    if alpha:
-        regex = QRegExp(REGEX_HEX_RGBA)
-        match = regex.exactMatch(xs)
-        if match:
-            return QColor(_HEXDEC[xs[1:3]], _HEXDEC[xs[3:5]], _HEXDEC[xs[5:7]], _HEXDEC[xs[7:9]])
-
-        regex = QRegExp(REGEX_FN_RGBA)
-        match = regex.exactMatch(xs)
-        if match:
-            captured_texts = regex.capturedTexts()
-            return QColor(
-                int(captured_texts[-4]), int(captured_texts[-3]), int(captured_texts[-2]), int(captured_texts[-1]))
-
     return QColor()
 
 
@@ -414,30 +365,7 @@ def color_luma_float(color):
 
 
 def color_from_lch(hue, chroma, luma, alpha=1):
-    h1 = hue * 6
-    x = chroma * (1 - abs(math.fmod(h1, 2) - 1))
-    col = QColor()
-    if 0 <= h1 < 1:
-        col = QColor.fromRgbF(chroma, x, 0)
-    elif h1 < 2:
-        col = QColor.fromRgbF(x, chroma, 0)
-    elif h1 < 3:
-        col = QColor.fromRgbF(0, chroma, x)
-    elif h1 < 4:
-        col = QColor.fromRgbF(0, x, chroma)
-    elif h1 < 5:
-        col = QColor.fromRgbF(x, 0, chroma)
-    elif h1 < 6:
-        col = QColor.fromRgbF(chroma, 0, x)
-
-    m = luma - color_luma_float(col)
-
-    return QColor.fromRgbF(
-        clamp(col.redF() + m, 0.0, 1.0),
-        clamp(col.greenF() + m, 0.0, 1.0),
-        clamp(col.blueF() + m, 0.0, 1.0),
-        alpha
-    )
+    return QColor.fromRgbF(*(colormath.lch_to_rgb(hue, chroma, luma) + (alpha,)))
 
 
 def rainbow_lch(hue):
@@ -463,28 +391,4 @@ def color_hsl_saturation_float(color):
 
 
 def color_from_hsl(hue, sat, lig, alpha):
-    chroma = (1 - abs(2 * lig - 1)) * sat
-    h1 = hue * 6
-    x = chroma * (1 - abs(math.fmod(h1, 2) - 1))
-    col = QColor()
-    if 0 <= h1 < 1:
-        col = QColor.fromRgbF(chroma, x, 0)
-    elif h1 < 2:
-        col = QColor.fromRgbF(x, chroma, 0)
-    elif h1 < 3:
-        col = QColor.fromRgbF(0, chroma, x)
-    elif h1 < 4:
-        col = QColor.fromRgbF(0, x, chroma)
-    elif h1 < 5:
-        col = QColor.fromRgbF(x, 0, chroma)
-    elif h1 < 6:
-        col = QColor.fromRgbF(chroma, 0, x)
-
-    m = lig - chroma / 2
-
-    return QColor.fromRgbF(
-        clamp(col.redF() + m, 0.0, 1.0),
-        clamp(col.greenF() + m, 0.0, 1.0),
-        clamp(col.blueF() + m, 0.0, 1.0),
-        alpha
-    )
+    return QColor.fromRgbF(*(colormath.hsl_to_rgb(hue, sat, lig) + (alpha,)))
@@ -0,0 +1,390 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains Qt independent color conversion functions that work with whole arrays of values and precomputed
+rainbow lookup tables. Colors are returned as packed 0xAARRGGBB integers (the same format used by QColor.rgba()).
+NumPy is an optional dependency of this module: without it, arrays are plain lists and conversions are done one by
+one.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import math
+
+LCH_RAINBOW = 'lch'
+HSV_RAINBOW = 'hsv'
+DEFAULT_RESOLUTION = 360
+
+NUMPY_AVAILABLE = True
+try:
+    import numpy
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+_USHRT_MAX = 65535
+_RAINBOW_TABLES = dict()
+
+
+class RainbowTable(object):
+    """
+    Precomputed table of packed rainbow colors sampled at a fixed hue resolution
+    """
+
+    def __init__(self, kind=LCH_RAINBOW, resolution=DEFAULT_RESOLUTION):
+        super(RainbowTable, self).__init__()
+
+        if kind not in (LCH_RAINBOW, HSV_RAINBOW):
+            raise ValueError('Rainbow kind "{}" is not supported!'.format(kind))
+        if resolution <= 0:
+            raise ValueError('Rainbow table resolution must be greater than 0: {}'.format(resolution))
+
+        self._kind = kind
+        self._resolution = int(resolution)
+        hues = _array([index / self._resolution for index in range(self._resolution)])
+        if kind == LCH_RAINBOW:
+            self._table = pack(*lch_to_rgb_arrays(hues, 1.0, 1.0))
+        else:
+            self._table = pack(*hsv_to_rgb_arrays(hues, 1.0, 1.0))
+
+    def __len__(self):
+        return self._resolution
+
+    @property
+    def kind(self):
+        return self._kind
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    def ramp(self):
+        """
+        Returns all the packed colors of the table, sorted by hue
+        :return: numpy.ndarray or list(int)
+        """
+
+        return self._table
+
+    def lookup(self, hue):
+        """
+        Returns the packed color of the table nearest to the given hue
+        :param hue: float, between 0.0 and 1.0. Values out of that range are wrapped
+        :return: int
+        """
+
+        return int(self._table[int(math.floor((hue % 1.0) * self._resolution + 0.5)) % self._resolution])
+
+    def lookup_array(self, hues):
+        """
+        Returns the packed colors of the table nearest to each one of the given hues
+        :param hues: numpy.ndarray or list(float)
+        :return: numpy.ndarray or list(int)
+        """
+
+        if not NUMPY_AVAILABLE:
+            return [self.lookup(hue) for hue in hues]
+
+        indices = numpy.floor((numpy.asarray(hues, dtype=numpy.float64) % 1.0) * self._resolution + 0.5)
+
+        return self._table[indices.astype(numpy.int64) % self._resolution]
+
+
+def rainbow_table(kind=LCH_RAINBOW, resolution=DEFAULT_RESOLUTION):
+    """
+    Returns the rainbow lookup table of the given kind and resolution. Tables are computed only once
+    :param kind: str, LCH_RAINBOW or HSV_RAINBOW
+    :param resolution: int, number of hues sampled by the table
+    :return: RainbowTable
+    """
+
+    key = (kind, int(resolution))
+    table = _RAINBOW_TABLES.get(key, None)
+    if table is None:
+        table = RainbowTable(kind, resolution)
+        _RAINBOW_TABLES[key] = table
+
+    return table
+
+
+def clear_rainbow_tables():
+    """
+    Clears all the cached rainbow lookup tables
+    """
+
+    _RAINBOW_TABLES.clear()
+
+
+def lch_to_rgb(hue, chroma, luma):
+    """
+    Converts given LCH color into RGB
+    :param hue: float, between 0.0 and 1.0
+    :param chroma: float, between 0.0 and 1.0
+    :param luma: float, between 0.0 and 1.0
+    :return: tuple(float, float, float), RGB components between 0.0 and 1.0
+    """
+
+    red, green, blue = _hue_components(hue, chroma)
+    m = luma - (0.30 * red + 0.59 * green + 0.11 * blue)
+
+    return _clamp(red + m), _clamp(green + m), _clamp(blue + m)
+
+
+def hsl_to_rgb(hue, saturation, lightness):
+    """
+    Converts given HSL color into RGB
+    :param hue: float, between 0.0 and 1.0
+    :param saturation: float, between 0.0 and 1.0
+    :param lightness: float, between 0.0 and 1.0
+    :return: tuple(float, float, float), RGB components between 0.0 and 1.0
+    """
+
+    chroma = (1 - abs(2 * lightness - 1)) * saturation
+    red, green, blue = _hue_components(hue, chroma)
+    m = lightness - chroma / 2
+
+    return _clamp(red + m), _clamp(green + m), _clamp(blue + m)
+
+
+def lch_to_rgb_arrays(hues, chromas, lumas):
+    """
+    Converts given arrays of LCH values into RGB in a single vectorized operation
+    :param hues: numpy.ndarray or list(float) or float
+    :param chromas: numpy.ndarray or list(float) or float
+    :param lumas: numpy.ndarray or list(float) or float
+    :return: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray), red, green and blue arrays between 0.0 and 1.0
+    """
+
+    if not NUMPY_AVAILABLE:
+        return _scalar_arrays(lch_to_rgb, hues, chromas, lumas)
+
+    hues, chromas, lumas = numpy.broadcast_arrays(*[numpy.asarray(value, dtype=numpy.float64) for value in (
+        hues, chromas, lumas)])
+    red, green, blue = _hue_components_arrays(hues, chromas)
+    m = lumas - (0.30 * red + 0.59 * green + 0.11 * blue)
+
+    return numpy.clip(red + m, 0.0, 1.0), numpy.clip(green + m, 0.0, 1.0), numpy.clip(blue + m, 0.0, 1.0)
+
+
+def hsl_to_rgb_arrays(hues, saturations, lightnesses):
+    """
+    Converts given arrays of HSL values into RGB in a single vectorized operation
+    :param hues: numpy.ndarray or list(float) or float
+    :param saturations: numpy.ndarray or list(float) or float
+    :param lightnesses: numpy.ndarray or list(float) or float
+    :return: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray), red, green and blue arrays between 0.0 and 1.0
+    """
+
+    if not NUMPY_AVAILABLE:
+        return _scalar_arrays(hsl_to_rgb, hues, saturations, lightnesses)
+
+    hues, saturations, lightnesses = numpy.broadcast_arrays(*[numpy.asarray(value, dtype=numpy.float64) for value in (
+        hues, saturations, lightnesses)])
+    chromas = (1 - numpy.abs(2 * lightnesses - 1)) * saturations
+    red, green, blue = _hue_components_arrays(hues, chromas)
+    m = lightnesses - chromas / 2
+
+    return numpy.clip(red + m, 0.0, 1.0), numpy.clip(green + m, 0.0, 1.0), numpy.clip(blue + m, 0.0, 1.0)
+
+
+def hsv_to_rgb_arrays(hues, saturations, values):
+    """
+    Converts given arrays of HSV values into RGB in a single vectorized operation. Hues are quantized approximately
+    as QColor.fromHsvF does, so some colors can differ by one unit from the ones computed by QColor
+    :param hues: numpy.ndarray or list(float) or float
+    :param saturations: numpy.ndarray or list(float) or float
+    :param values: numpy.ndarray or list(float) or float
+    :return: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray), red, green and blue arrays between 0.0 and 1.0
+    """
+
+    if not NUMPY_AVAILABLE:
+        return _scalar_arrays(_hsv_to_rgb, hues, saturations, values)
+
+    hues, saturations, values = numpy.broadcast_arrays(*[numpy.asarray(value, dtype=numpy.float64) for value in (
+        hues, saturations, values)])
+    hues = numpy.floor(hues * 36000 + 0.5)
+    h = numpy.where(hues >= 36000, 0, hues / 6000.0)
+    sector = h.astype(numpy.int64)
+    f = h - sector
+    p = values * (1.0 - saturations)
+    q = values * (1.0 - (saturations * f))
+    t = values * (1.0 - (saturations * (1.0 - f)))
+
+    return (numpy.choose(sector, (values, q, p, p, t, values)), numpy.choose(sector, (t, values, values, q, p, p)),
+            numpy.choose(sector, (p, p, t, values, values, q)))
+
+
+def pack(reds, greens, blues, alphas=1.0):
+    """
+    Packs given arrays of RGBA components (between 0.0 and 1.0) into 0xAARRGGBB integers. Components are quantized
+    approximately as QColor.fromRgbF does
+    :param reds: numpy.ndarray or list(float)
+    :param greens: numpy.ndarray or list(float)
+    :param blues: numpy.ndarray or list(float)
+    :param alphas: numpy.ndarray or list(float) or float
+    :return: numpy.ndarray or list(int), uint32 packed colors
+    """
+
+    if not NUMPY_AVAILABLE:
+        if not isinstance(alphas, (list, tuple)):
+            alphas = [alphas] * len(reds)
+        return [pack_color(*components) for components in zip(reds, greens, blues, alphas)]
+
+    components = [_quantize_arrays(component) for component in numpy.broadcast_arrays(
+        *[numpy.asarray(value, dtype=numpy.float64) for value in (reds, greens, blues, alphas)])]
+
+    return (components[3] << 24) | (components[0] << 16) | (components[1] << 8) | components[2]
+
+
+def pack_color(red, green, blue, alpha=1.0):
+    """
+    Packs given RGBA components (between 0.0 and 1.0) into a 0xAARRGGBB integer
+    :param red: float
+    :param green: float
+    :param blue: float
+    :param alpha: float
+    :return: int
+    """
+
+    red, green, blue, alpha = [_quantize(component) for component in (red, green, blue, alpha)]
+
+    return (alpha << 24) | (red << 16) | (green << 8) | blue
+
+
+def unpack(packed):
+    """
+    Returns the RGBA components of the given packed color
+    :param packed: int
+    :return: tuple(int, int, int, int)
+    """
+
+    packed = int(packed)
+
+    return (packed >> 16) & 0xff, (packed >> 8) & 0xff, packed & 0xff, (packed >> 24) & 0xff
+
+
+def _hue_components(hue, chroma):
+    """
+    Internal function that returns the RGB components of the given hue and chroma before lightness is applied.
+    Sectors are chosen as color_from_lch and color_from_hsl functions always did
+    :param hue: float
+    :param chroma: float
+    :return: tuple(float, float, float)
+    """
+
+    h1 = hue * 6
+    x = chroma * (1 - abs(math.fmod(h1, 2) - 1))
+    if 0 <= h1 < 1:
+        return chroma, x, 0
+    elif h1 < 2:
+        return x, chroma, 0
+    elif h1 < 3:
+        return 0, chroma, x
+    elif h1 < 4:
+        return 0, x, chroma
+    elif h1 < 5:
+        return x, 0, chroma
+    elif h1 < 6:
+        return chroma, 0, x
+
+    return 0, 0, 0
+
+
+def _hue_components_arrays(hues, chromas):
+    """
+    Internal function that returns the RGB components of the given hues and chromas before lightness is applied
+    :param hues: numpy.ndarray
+    :param chromas: numpy.ndarray
+    :return: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+
+    h1 = hues * 6
+    x = chromas * (1 - numpy.abs(numpy.fmod(h1, 2) - 1))
+    zeros = numpy.zeros_like(h1)
+
+    # Negative hues fall into the second sector and hues bigger than 1 are black, as in the scalar version
+    sector = numpy.where(h1 < 0, 1, numpy.floor(numpy.where(h1 < 6, h1, 6))).astype(numpy.int64)
+    red = numpy.choose(sector, (chromas, x, zeros, zeros, x, chromas, zeros))
+    green = numpy.choose(sector, (x, chromas, chromas, x, zeros, zeros, zeros))
+    blue = numpy.choose(sector, (zeros, zeros, x, chromas, chromas, x, zeros))
+
+    return red, green, blue
+
+
+def _hsv_to_rgb(hue, saturation, value):
+    """
+    Internal function that converts given HSV color into RGB
+    :param hue: float
+    :param saturation: float
+    :param value: float
+    :return: tuple(float, float, float)
+    """
+
+    hue = math.floor(hue * 36000 + 0.5)
+    h = 0 if hue >= 36000 else hue / 6000.0
+    i = int(h)
+    f = h - i
+    p = value * (1.0 - saturation)
+    q = value * (1.0 - (saturation * f))
+    t = value * (1.0 - (saturation * (1.0 - f)))
+
+    return ((value, t, p), (q, value, p), (p, value, t), (p, q, value), (t, p, value), (value, p, q))[i]
+
+
+def _scalar_arrays(function, *arrays):
+    """
+    Internal function that applies given scalar conversion function to each item of the given arrays
+    :param function: callable
+    :param arrays: list(list(float) or float)
+    :return: tuple(list(float), list(float), list(float))
+    """
+
+    size = max([len(array) for array in arrays if isinstance(array, (list, tuple))] or [1])
+    arrays = [array if isinstance(array, (list, tuple)) else [array] * size for array in arrays]
+    results = [function(*values) for values in zip(*arrays)]
+
+    return tuple(list(component) for component in zip(*results)) if results else (list(), list(), list())
+
+
+def _array(values):
+    """
+    Internal function that returns given values as an array
+    :param values: list(float)
+    :return: numpy.ndarray or list(float)
+    """
+
+    return numpy.asarray(values, dtype=numpy.float64) if NUMPY_AVAILABLE else list(values)
+
+
+def _clamp(value):
+    """
+    Internal function that clamps given value between 0.0 and 1.0
+    :param value: float
+    :return: float
+    """
+
+    return max(min(value, 1.0), 0.0)
+
+
+def _quantize(component):
+    """
+    Internal function that converts given float component into an 8 bits one as QColor.fromRgbF does
+    :param component: float
+    :return: int
+    """
+
+    value = int(component * _USHRT_MAX + 0.5)
+
+    return (value - (value >> 8) + 0x80) >> 8
+
+
+def _quantize_arrays(components):
+    """
+    Internal function that converts given float components into 8 bits ones as QColor.fromRgbF does
+    :param components: numpy.ndarray
+    :return: numpy.ndarray, uint32 array
+    """
+
+    values = numpy.floor(components * _USHRT_MAX + 0.5).astype(numpy.uint32)
+
+    return (values - (values >> 8) + 0x80) >> 8
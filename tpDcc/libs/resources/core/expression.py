@@ -0,0 +1,338 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the parser of the DPI arithmetic expressions used in stylesheets (for example, 4*DPI or
+(@padding + 2) * DPI / 2). Expressions are parsed once into a small arithmetic tree and evaluated without eval.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import re
+import operator
+
+DPI_NAME = 'DPI'
+MAX_EXPRESSION_CACHE = 4096
+
+NUMBER_TOKEN = 'number'
+DPI_TOKEN = 'dpi'
+VARIABLE_TOKEN = 'variable'
+OPERATOR_TOKEN = 'operator'
+OPEN_TOKEN = 'open'
+CLOSE_TOKEN = 'close'
+BARRIER_TOKEN = 'barrier'
+
+_TOKEN_REGEX = re.compile(
+    r'(?P<number>(?<![A-Za-z0-9_#.@])[0-9]+(?:\.[0-9]+)?)'
+    r'|(?P<dpi>(?<![A-Za-z0-9_@])DPI)'
+    r'|(?P<variable>@[A-Za-z0-9_]+)'
+    r'|(?P<operator>[-+*/])'
+    r'|(?P<open>\()'
+    r'|(?P<close>\))'
+    r'|(?P<space>\s+)')
+_OPERATORS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+_EXPRESSIONS_CACHE = dict()
+
+
+class Expression(object):
+    """
+    Arithmetic expression parsed into a tree of nodes. Nodes are tuples: ('number', float), ('dpi',),
+    ('variable', name) or (operator, left_node, right_node)
+    """
+
+    def __init__(self, text, node):
+        super(Expression, self).__init__()
+
+        self._text = text
+        self._node = node
+        self._variables = frozenset(self._iter_variables(node))
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self._text)
+
+    @property
+    def text(self):
+        return self._text
+
+    @property
+    def variables(self):
+        return self._variables
+
+    def evaluate(self, dpi=1, variables=None):
+        """
+        Evaluates the expression
+        :param dpi: float, value of DPI
+        :param variables: dict(str, float), values of the variables used by the expression
+        :return: float
+        :raises ValueError: if a variable has no value or the expression divides by zero
+        """
+
+        return self._evaluate(self._node, dpi, variables or dict())
+
+    def _evaluate(self, node, dpi, variables):
+        """
+        Internal function that evaluates given node recursively
+        :param node: tuple
+        :param dpi: float
+        :param variables: dict(str, float)
+        :return: float
+        """
+
+        node_type = node[0]
+        if node_type == NUMBER_TOKEN:
+            return node[1]
+        elif node_type == DPI_TOKEN:
+            return dpi
+        elif node_type == VARIABLE_TOKEN:
+            if node[1] not in variables:
+                raise ValueError('Variable "{}" has no value in expression "{}"'.format(node[1], self._text))
+            return variables[node[1]]
+
+        left = self._evaluate(node[1], dpi, variables)
+        right = self._evaluate(node[2], dpi, variables)
+        try:
+            return _OPERATORS[node_type](left, right)
+        except ZeroDivisionError:
+            raise ValueError('Division by zero in expression "{}"'.format(self._text))
+
+    def _iter_variables(self, node):
+        """
+        Internal function that yields the names of all the variables used by the given node
+        :param node: tuple
+        """
+
+        if node[0] == VARIABLE_TOKEN:
+            yield node[1]
+        elif node[0] in _OPERATORS:
+            for child in node[1:]:
+                for name in self._iter_variables(child):
+                    yield name
+
+
+def parse(text):
+    """
+    Parses given arithmetic expression. Parsed expressions are memoized by text
+    :param text: str
+    :return: Expression
+    :raises ValueError: if the text is not a valid expression
+    """
+
+    expression = _EXPRESSIONS_CACHE.get(text, None)
+    if expression is not None:
+        return expression
+
+    tokens = tokenize(text)
+    result = _parse_expression(tokens, 0)
+    if result is None or result[1] != len(tokens):
+        raise ValueError('Invalid expression: "{}"'.format(text))
+
+    return _store(text, result[0])
+
+
+def tokenize(text):
+    """
+    Splits given text into expression tokens. Characters that cannot be part of an expression become barrier tokens
+    :param text: str
+    :return: list(tuple(str, str, int, int)), type, text, start and end of each token. Spaces are skipped
+    """
+
+    tokens = list()
+    position = 0
+    for match in _TOKEN_REGEX.finditer(text):
+        if match.start() != position:
+            tokens.append((BARRIER_TOKEN, text[position:match.start()], position, match.start()))
+        position = match.end()
+        if match.lastgroup != 'space':
+            tokens.append((match.lastgroup, match.group(), match.start(), match.end()))
+    if position != len(text):
+        tokens.append((BARRIER_TOKEN, text[position:], position, len(text)))
+
+    return tokens
+
+
+def find_dpi_expressions(line):
+    """
+    Returns all the expressions that use DPI found in the given line. Each expression is the longest valid
+    arithmetic expression around the DPI name (for example, 12*DPI in "font: 12*DPIpx;"). As in CSS, a sign that
+    follows a space and precedes a value starts a new value, so "margin: 0 -2*DPI" contains the expression -2*DPI
+    :param line: str
+    :return: list(tuple(int, int, Expression)), start, end and parsed expression of each DPI expression
+    """
+
+    if DPI_NAME not in line:
+        return list()
+
+    found = list()
+    tokens = tokenize(line)
+    index = 0
+    while index < len(tokens):
+        result = _parse_expression(tokens, index)
+        if result is None:
+            index += 1
+            continue
+        node, end_index = result
+        if _uses_dpi(node):
+            start, end = tokens[index][2], tokens[end_index - 1][3]
+            text = line[start:end]
+            expression = _EXPRESSIONS_CACHE.get(text, None) or _store(text, node)
+            found.append((start, end, expression))
+        index = max(end_index, index + 1)
+
+    return found
+
+
+def evaluate_all(expressions, dpi=1, variables=None):
+    """
+    Evaluates all the given expressions for the given DPI
+    :param expressions: list(Expression)
+    :param dpi: float
+    :param variables: dict(str, float), values of the variables used by the expressions
+    :return: list(float or None), value of each expression or None if the expression cannot be evaluated
+    """
+
+    values = list()
+    for expression in expressions:
+        try:
+            values.append(expression.evaluate(dpi, variables))
+        except ValueError:
+            values.append(None)
+
+    return values
+
+
+def clear_expression_cache():
+    """
+    Clears all the memoized expressions
+    """
+
+    _EXPRESSIONS_CACHE.clear()
+
+
+def _parse_expression(tokens, index, nested=False):
+    """
+    Internal function that parses the longest sum expression that starts at the given token
+    :param tokens: list(tuple(str, str, int, int))
+    :param index: int
+    :param nested: bool, whether or not the expression is between parentheses. Outside parentheses, a sign separated
+        by spaces from the previous value but not from the next one starts a new value instead of a sum
+    :return: tuple(tuple, int) or None, parsed node and index of the first token after it
+    """
+
+    result = _parse_term(tokens, index)
+    if result is None:
+        return None
+    node, index = result
+    while index < len(tokens) and tokens[index][1] in ('+', '-'):
+        if not nested and _is_sign(tokens, index):
+            break
+        right = _parse_term(tokens, index + 1)
+        if right is None:
+            break
+        node, index = (tokens[index][1], node, right[0]), right[1]
+
+    return node, index
+
+
+def _parse_term(tokens, index):
+    """
+    Internal function that parses the longest product expression that starts at the given token
+    :param tokens: list(tuple(str, str, int, int))
+    :param index: int
+    :return: tuple(tuple, int) or None, parsed node and index of the first token after it
+    """
+
+    result = _parse_factor(tokens, index)
+    if result is None:
+        return None
+    node, index = result
+    while index < len(tokens) and tokens[index][1] in ('*', '/'):
+        right = _parse_factor(tokens, index + 1)
+        if right is None:
+            break
+        node, index = (tokens[index][1], node, right[0]), right[1]
+
+    return node, index
+
+
+def _parse_factor(tokens, index):
+    """
+    Internal function that parses a number, DPI, a variable, a negated factor or an expression between parentheses
+    :param tokens: list(tuple(str, str, int, int))
+    :param index: int
+    :return: tuple(tuple, int) or None, parsed node and index of the first token after it
+    """
+
+    if index >= len(tokens):
+        return None
+
+    token_type, token_text = tokens[index][:2]
+    if token_type == NUMBER_TOKEN:
+        return (NUMBER_TOKEN, float(token_text)), index + 1
+    elif token_type == DPI_TOKEN:
+        return (DPI_TOKEN,), index + 1
+    elif token_type == VARIABLE_TOKEN:
+        return (VARIABLE_TOKEN, token_text[1:]), index + 1
+    elif token_text == '-' and _is_sign(tokens, index):
+        # Plus signs are not parsed, so they are kept in front of the value the expression is replaced with
+        result = _parse_factor(tokens, index + 1)
+        if result is None:
+            return None
+        return ('-', (NUMBER_TOKEN, 0.0), result[0]), result[1]
+    elif token_type == OPEN_TOKEN:
+        result = _parse_expression(tokens, index + 1, nested=True)
+        if result is None or result[1] >= len(tokens) or tokens[result[1]][0] != CLOSE_TOKEN:
+            return None
+        return result[0], result[1] + 1
+
+    return None
+
+
+def _is_sign(tokens, index):
+    """
+    Internal function that returns whether or not the given + or - token can be the sign of the value that follows
+    it: it must be glued to the next token and it cannot be glued to a previous value or word (as in 10-2 or icon-2)
+    :param tokens: list(tuple(str, str, int, int))
+    :param index: int
+    :return: bool
+    """
+
+    if index + 1 >= len(tokens) or tokens[index + 1][2] != tokens[index][3]:
+        return False
+    if not index or tokens[index - 1][3] != tokens[index][2]:
+        return True
+
+    previous_type, previous_text = tokens[index - 1][:2]
+    if previous_type in (OPERATOR_TOKEN, OPEN_TOKEN):
+        return True
+
+    return previous_type == BARRIER_TOKEN and not (previous_text[-1].isalnum() or previous_text[-1] in '_#.@')
+
+
+def _uses_dpi(node):
+    """
+    Internal function that returns whether or not given node uses DPI
+    :param node: tuple
+    :return: bool
+    """
+
+    if node[0] == DPI_TOKEN:
+        return True
+    elif node[0] in _OPERATORS:
+        return _uses_dpi(node[1]) or _uses_dpi(node[2])
+
+    return False
+
+
+def _store(text, node):
+    """
+    Internal function that memoizes the expression of the given text. Cache is cleared when it is full
+    :param text: str
+    :param node: tuple
+    :return: Expression
+    """
+
+    if len(_EXPRESSIONS_CACHE) >= MAX_EXPRESSION_CACHE:
+        _EXPRESSIONS_CACHE.clear()
+    expression = _EXPRESSIONS_CACHE[text] = Expression(text, node)
+
+    return expression
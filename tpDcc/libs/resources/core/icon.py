@@ -9,11 +9,15 @@ from __future__ import print_function, division, absolute_import
 
 import copy
 
-from Qt.QtCore import Qt, QSize
+from Qt.QtCore import QSize
+from Qt.QtWidgets import QApplication, QStyleOption
 from Qt.QtGui import QIcon, QColor, QPainter, QPen
 
 from tpDcc.libs.python import python
-from tpDcc.libs.resources.core import utils, color, cache, pixmap as px
+from tpDcc.libs.resources.core import utils, color, cache, mipmap, pixmap as px
+
+DISABLED_VARIANT = 'disabled'
+GRAYSCALE_VARIANT = 'grayscale'
 
 
 class Icon(QIcon, object):
@@ -145,6 +149,26 @@ class Icon(QIcon, object):
         icon = Icon(pixmap)
         self.swap(icon)
 
+    def disabled_pixmap(self, size=None):
+        """
+        Returns the disabled version of this icon with the given size. Disabled pixmaps are generated only once per
+        source and size
+        :param size: QSize, size of the pixmap. If not given, first available size of the icon is used
+        :return: QPixmap or None
+        """
+
+        return icon_variant(self, DISABLED_VARIANT, size=size)
+
+    def grayscale_pixmap(self, size=None):
+        """
+        Returns the grayscale version of this icon with the given size. Grayscale pixmaps are generated only once per
+        source and size
+        :param size: QSize, size of the pixmap. If not given, first available size of the icon is used
+        :return: QPixmap or None
+        """
+
+        return icon_variant(self, GRAYSCALE_VARIANT, size=size)
+
     def set_badge(self, x, y, w, h, color=None):
         """
         Set badge for the icon
@@ -175,7 +199,7 @@ class Icon(QIcon, object):
         :param QSize size: size to scale to
         """
 
-        icon = resize_icon(self)
+        icon = resize_icon(self, size)
         if not icon:
             return
 
@@ -214,12 +238,11 @@ def resize_icon(icon, size):
     :param QSize size: size to scale to
     """
 
-    if len(icon.availableSizes() == 0):
+    if len(icon.availableSizes()) == 0:
         return
 
     orig_size = icon.availableSizes()[0]
-    pixmap = icon.pixmap(orig_size)
-    pixmap = pixmap.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    pixmap = mipmap.scaled_pixmap(icon.pixmap(orig_size), size)
 
     return Icon(pixmap)
 
@@ -239,12 +262,14 @@ def colorize_icon(icon, size=None, color=(255, 255, 255), overlay_icon=None, ove
     size = utils.dpi_scale(size)
 
     orig_size = icon.availableSizes()[0]
-    pixmap = px.colorize_pixmap(icon.pixmap(orig_size), color)
-    if overlay_icon is not None:
-        overlay_pixmap = overlay_icon.pixmap(orig_size)
-        px.overlay_pixmap(pixmap, overlay_pixmap, overlay_color)
+    source_pixmap = icon.pixmap(orig_size)
 
-    pixmap = pixmap.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    # Source is scaled first using its mipmap chain, so colorizing and overlaying work on the final size
+    pixmap = _colorized_layer(mipmap.scaled_pixmap(source_pixmap, size), color)
+    if overlay_icon is not None:
+        factor = pixmap.width() / max(source_pixmap.width(), 1)
+        overlay_pixmap = _colorized_layer(_scaled_layer(overlay_icon.pixmap(orig_size), factor), overlay_color)
+        px.overlay_pixmap(pixmap, overlay_pixmap, None)
 
     return Icon(pixmap)
 
@@ -289,20 +314,18 @@ def colorize_layered_icon(icons, size, colors=None, icon_scaling=None, tint_colo
     orig_size = icon_largest.availableSizes()[0] if icon_largest.availableSizes() else 1.0
     col = colors.pop(0)
     scale = icon_scaling.pop(0)
-    if col is not None:
-        pixmap = px.colorize_pixmap(icon_largest.pixmap(orig_size * scale), col)
-    else:
-        pixmap = icon_largest.pixmap(orig_size * scale)
+    source_pixmap = icon_largest.pixmap(orig_size * scale)
 
+    # Layers are scaled first using their mipmap chains, so colorizing, overlaying and tinting work on the final size
+    pixmap = _colorized_layer(mipmap.scaled_pixmap(source_pixmap, QSize(size, size)), col)
+    factor = pixmap.width() / max(source_pixmap.width(), 1)
     for i in range(len(icons)):
-        overlay_pixmap = icons[i].pixmap(orig_size * icon_scaling[i])
-        px.overlay_pixmap(pixmap, overlay_pixmap, colors[i])
+        overlay_pixmap = _scaled_layer(icons[i].pixmap(orig_size * icon_scaling[i]), factor)
+        px.overlay_pixmap(pixmap, _colorized_layer(overlay_pixmap, colors[i]), None)
 
     if tint_color is not None:
         px.tint_pixmap(pixmap, tint_color, composition_mode=tint_composition)
 
-    pixmap = pixmap.scaled(QSize(size, size), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
     icon = Icon(pixmap)
     if grayscale:
         pixmap = px.grayscale_pixmap(pixmap)
@@ -312,6 +335,36 @@ def colorize_layered_icon(icons, size, colors=None, icon_scaling=None, tint_colo
     return icon
 
 
+def _scaled_layer(pixmap, factor):
+    """
+    Internal function that returns given layer pixmap scaled by the given factor using its mipmap chain
+    :param pixmap: QPixmap
+    :param factor: float
+    :return: QPixmap
+    """
+
+    if pixmap.isNull() or factor == 1:
+        return pixmap
+
+    return mipmap.scaled_pixmap(pixmap, pixmap.size() * factor)
+
+
+def _colorized_layer(pixmap, layer_color):
+    """
+    Internal function that returns a colorized copy of the given layer pixmap. Colorizing is done using pixmap alpha,
+    so antialiasing of scaled layers is preserved
+    :param pixmap: QPixmap
+    :param layer_color: str or tuple or QColor or None
+    :return: px.Pixmap
+    """
+
+    layer = px.Pixmap(pixmap)
+    if layer_color is not None:
+        layer.set_color(layer_color)
+
+    return layer
+
+
 def grayscale_icon(icon):
     """
     Returns a grayscale version of the given icon or the original one if it cannot be converted
@@ -320,11 +373,91 @@ def grayscale_icon(icon):
     :return:
     """
 
+    source_key = IconCache.source_key(icon)
     for size in icon.availableSizes():
-        icon.addPixmap(icon.pixmap(size, QIcon.Disabled))
+        icon.addPixmap(icon_variant(icon, DISABLED_VARIANT, size=size))
+    IconCache.link(icon, source_key)
+
+    return icon
+
+
+def cache_disabled_pixmaps(icon):
+    """
+    Stores the cached disabled variants of the given icon as its disabled mode pixmaps. This way, widgets that toggle
+    their enabled state reuse those variants instead of generating them each time
+    :param icon: QIcon
+    :return: QIcon
+    """
+
+    source_key = IconCache.source_key(icon)
+    for state in (QIcon.Off, QIcon.On):
+        for size in icon.availableSizes(QIcon.Normal, state):
+            icon.addPixmap(icon_variant(icon, DISABLED_VARIANT, size=size, state=state), QIcon.Disabled, state)
+    IconCache.link(icon, source_key)
 
     return icon
 
 
+def icon_variant(icon, variant_name, size=None, state=QIcon.Off):
+    """
+    Returns the variant pixmap of the given icon. Variants are stored in the icon cache next to their source icon
+    :param icon: QIcon
+    :param variant_name: str, DISABLED_VARIANT or GRAYSCALE_VARIANT
+    :param size: QSize, size of the pixmap. If not given, first available size of the icon is used
+    :param state: QIcon.State
+    :return: QPixmap or None
+    """
+
+    if icon.isNull():
+        return None
+
+    if size is None:
+        available_sizes = icon.availableSizes()
+        if not available_sizes:
+            return None
+        size = available_sizes[0]
+
+    if variant_name == DISABLED_VARIANT:
+        generator = _disabled_pixmap_generator(state)
+    elif variant_name == GRAYSCALE_VARIANT:
+        generator = _grayscale_pixmap_generator(state)
+    else:
+        raise ValueError('Icon variant "{}" is not supported!'.format(variant_name))
+
+    state_variant_name = variant_name if state == QIcon.Off else '{}_on'.format(variant_name)
+
+    return IconCache.variant(icon, state_variant_name, size, generator)
+
+
+def _disabled_pixmap_generator(state):
+    """
+    Internal function that returns a function that generates disabled pixmaps in the given icon state
+    :param state: QIcon.State
+    :return: callable
+    """
+
+    def _generator(icon, size):
+        pixmap = icon.pixmap(size, QIcon.Normal, state)
+        app = QApplication.instance()
+        if not app:
+            return px.grayscale_pixmap(pixmap)
+        return app.style().generatedIconPixmap(QIcon.Disabled, pixmap, QStyleOption())
+
+    return _generator
+
+
+def _grayscale_pixmap_generator(state):
+    """
+    Internal function that returns a function that generates grayscale pixmaps in the given icon state
+    :param state: QIcon.State
+    :return: callable
+    """
+
+    def _generator(icon, size):
+        return px.grayscale_pixmap(icon.pixmap(size, QIcon.Normal, state))
+
+    return _generator
+
+
 # IconCache = cache.CacheResource(Icon)
-IconCache = cache.CacheResource(Icon)
+IconCache = cache.CacheResource(Icon, use_atlas=True)
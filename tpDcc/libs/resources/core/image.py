@@ -0,0 +1,320 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to work with QImages.
+Contrary to QPixmaps, QImages can be used outside the GUI thread, so all the functions of this module (except
+images_to_pixmaps) can be executed from a thread pool
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+from multiprocessing.pool import ThreadPool
+
+from Qt.QtCore import Qt, QSize, QThread, QCoreApplication
+from Qt.QtGui import QImage, QImageReader, QPixmap, QColor, QPainter
+
+from tpDcc.libs.resources.core import rgba, color, kernels
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
+
+MIN_SIZE_BUCKET = 16
+PREFERRED_FORMAT = QImage.Format_ARGB32_Premultiplied
+QPAINTER_BACKEND = 'qpainter'
+NUMPY_BACKEND = 'numpy'
+
+_BACKEND = QPAINTER_BACKEND
+
+
+def get_backend():
+    """
+    Returns the backend used to colorize, tint and grayscale images
+    :return: str
+    """
+
+    return _BACKEND
+
+
+def set_backend(backend):
+    """
+    Sets the backend used to colorize, tint and grayscale images. NumPy backend is only used if NumPy is available
+    :param backend: str, QPAINTER_BACKEND or NUMPY_BACKEND
+    :return: bool, True if the backend was set successfully; False otherwise
+    """
+
+    global _BACKEND
+
+    if backend not in (QPAINTER_BACKEND, NUMPY_BACKEND):
+        raise ValueError('Image backend "{}" is not supported!'.format(backend))
+    if backend == NUMPY_BACKEND and not kernels.NUMPY_AVAILABLE:
+        LOGGER.warning('NumPy is not available. Image backend cannot be set to "{}"'.format(NUMPY_BACKEND))
+        return False
+
+    _BACKEND = backend
+
+    return True
+
+
+def size_bucket(size):
+    """
+    Returns the size bucket the given size belongs to. Each dimension is rounded up to the next power of two, so
+    similar sizes share the same decoded image
+    :param size: QSize or int
+    :return: QSize
+    """
+
+    if not isinstance(size, QSize):
+        size = QSize(int(round(size)), int(round(size)))
+
+    def _bucket(value):
+        bucket = MIN_SIZE_BUCKET
+        while bucket < value:
+            bucket *= 2
+        return bucket
+
+    return QSize(_bucket(size.width()), _bucket(size.height()))
+
+
+def normalize_image(image):
+    """
+    Returns given image converted to the preferred (premultiplied) format, so Qt does not need to convert it each
+    time it is drawn or composed. Image is returned as it is if it already has the preferred format
+    :param image: QImage
+    :return: QImage
+    """
+
+    if image.isNull() or image.format() == PREFERRED_FORMAT:
+        return image
+
+    return image.convertToFormat(PREFERRED_FORMAT)
+
+
+def read_image(path, size=None, clip_rect=None):
+    """
+    Decodes the image located in the given path. If a size is given, image is decoded directly at the size that fits
+    in it (keeping its aspect ratio), so full resolution buffers are never allocated. Images are never upscaled.
+    :param path: str, path of the image file
+    :param size: QSize, size the decoded image must fit in
+    :param clip_rect: QRect, rect of the source image (in source coordinates) to decode
+    :return: QImage, image in the preferred format
+    """
+
+    reader = QImageReader(path)
+    source_size = reader.size()
+    if clip_rect is not None:
+        reader.setClipRect(clip_rect)
+        source_size = clip_rect.size()
+
+    if size is not None and source_size.isValid():
+        target_size = source_size.scaled(size, Qt.KeepAspectRatio)
+        if target_size.width() < source_size.width() or target_size.height() < source_size.height():
+            reader.setScaledSize(target_size)
+
+    image = reader.read()
+    if image.isNull():
+        LOGGER.debug('Impossible to decode image "{}": {}'.format(path, reader.errorString()))
+
+    return normalize_image(image)
+
+
+def colorize_image(image, new_color, backend=None):
+    """
+    Returns a copy of the given image colorized with the given color. Image alpha (and antialiasing) is preserved
+    QImage equivalent of pixmap.colorize_pixmap function
+    :param image: QImage
+    :param new_color: QColor or str or tuple(int, int, int, int)
+    :param backend: str or None, backend to use. If not given, current image backend is used
+    :return: QImage
+    """
+
+    if _use_numpy(backend):
+        return kernels.colorize_image(image, _qcolor(new_color))
+
+    image = _writable_image(image)
+    painter = QPainter(image)
+    painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+    painter.fillRect(image.rect(), _qcolor(new_color))
+    painter.end()
+
+    return image
+
+
+def tint_image(
+        image, tint_color=(255, 255, 255, 100), composition_mode=QPainter.CompositionMode_Plus, backend=None):
+    """
+    Returns a copy of the given image tinted with the given color
+    QImage equivalent of pixmap.tint_pixmap function
+    :param image: QImage
+    :param tint_color: QColor or str or tuple(int, int, int, int)
+    :param composition_mode: QPainter.CompositionMode
+    :param backend: str or None, backend to use. If not given, current image backend is used. NumPy backend only
+        supports Plus composition mode
+    :return: QImage
+    """
+
+    if composition_mode == QPainter.CompositionMode_Plus and _use_numpy(backend):
+        return kernels.tint_image(image, _qcolor(tint_color))
+
+    image = _writable_image(image)
+    over_image = mask_fill(image, tint_color)
+    painter = QPainter(image)
+    painter.setCompositionMode(composition_mode)
+    painter.drawImage(0, 0, over_image)
+    painter.end()
+
+    return image
+
+
+def overlay_image(image, over_image, overlay_color=None, align=Qt.AlignCenter):
+    """
+    Returns a copy of the given image with the given over image drawn on top of it
+    QImage equivalent of pixmap.overlay_pixmap function
+    :param image: QImage
+    :param over_image: QImage
+    :param overlay_color: QColor or str or tuple(int, int, int, int) or None, color used to colorize the over image
+    :param align: Qt.AlignCenter or None
+    :return: QImage
+    """
+
+    if overlay_color is not None:
+        over_image = colorize_image(over_image, overlay_color)
+
+    x = y = 0
+    if align is Qt.AlignCenter:
+        x = (image.width() - over_image.width()) // 2
+        y = (image.height() - over_image.height()) // 2
+
+    image = _writable_image(image)
+    painter = QPainter(image)
+    painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+    painter.drawImage(x, y, over_image)
+    painter.end()
+
+    return image
+
+
+def grayscale_image(image, backend=None):
+    """
+    Returns a grayscale copy of the given image
+    QImage equivalent of pixmap.grayscale_pixmap function
+    :param image: QImage
+    :param backend: str or None, backend to use. If not given, current image backend is used
+    :return: QImage
+    """
+
+    if _use_numpy(backend):
+        return kernels.grayscale_image(image)
+
+    gray = image.convertToFormat(QImage.Format_Grayscale8).convertToFormat(PREFERRED_FORMAT)
+
+    # Original alpha is restored by composition, so we do not need to extract and set the alpha channel
+    painter = QPainter(gray)
+    painter.setCompositionMode(QPainter.CompositionMode_DestinationIn)
+    painter.drawImage(0, 0, image)
+    painter.end()
+
+    return gray
+
+
+def mask_fill(image, fill_color):
+    """
+    Returns an image filled with the given color only where given image is not transparent. Transparency is
+    computed as QPixmap.mask does
+    :param image: QImage
+    :param fill_color: QColor or str or tuple(int, int, int, int)
+    :return: QImage
+    """
+
+    mask = image.createAlphaMask()
+    mask.setColorTable([QColor(0, 0, 0, 0).rgba(), QColor(0, 0, 0, 255).rgba()])
+    mask = mask.convertToFormat(PREFERRED_FORMAT)
+
+    fill = QImage(image.size(), PREFERRED_FORMAT)
+    fill.fill(_qcolor(fill_color))
+    painter = QPainter(fill)
+    painter.setCompositionMode(QPainter.CompositionMode_DestinationIn)
+    painter.drawImage(0, 0, mask)
+    painter.end()
+
+    return fill
+
+
+def process_images(function, jobs, workers=4):
+    """
+    Executes given function with each one of the given jobs arguments in a thread pool.
+    Given function must only work with QImages, never with QPixmaps.
+        images = process_images(colorize_image, [(image_a, color_a), (image_b, color_b)])
+    :param function: callable
+    :param jobs: list(tuple), list of function arguments
+    :param workers: int, number of threads of the pool
+    :return: list, function results in the same order as the given jobs
+    """
+
+    jobs = list(jobs)
+    if not jobs:
+        return list()
+    if workers <= 1 or len(jobs) == 1:
+        return [function(*job) for job in jobs]
+
+    pool = ThreadPool(min(workers, len(jobs)))
+    try:
+        results = pool.map(lambda job: function(*job), jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+    return results
+
+
+def images_to_pixmaps(images):
+    """
+    Converts given images into pixmaps. Must be called from the GUI thread.
+    :param images: list(QImage)
+    :return: list(QPixmap)
+    """
+
+    app = QCoreApplication.instance()
+    if app and QThread.currentThread() != app.thread():
+        raise RuntimeError('Images can only be converted to pixmaps in the GUI thread!')
+
+    return [QPixmap.fromImage(normalize_image(image)) if image is not None else None for image in images]
+
+
+def _writable_image(image):
+    """
+    Internal function that returns a copy of the given image in the preferred format that can be painted without
+    modifying the given image (normalize_image returns the given image itself if it already has the preferred format)
+    :param image: QImage
+    :return: QImage
+    """
+
+    if image.format() == PREFERRED_FORMAT:
+        return image.copy()
+
+    return image.convertToFormat(PREFERRED_FORMAT)
+
+
+def _use_numpy(backend):
+    """
+    Internal function that returns whether or not NumPy kernels must be used with the given backend
+    :param backend: str or None
+    :return: bool
+    """
+
+    return (backend or _BACKEND) == NUMPY_BACKEND and kernels.NUMPY_AVAILABLE
+
+
+def _qcolor(value):
+    """
+    Internal function that converts given value into a QColor
+    :param value: QColor or str or rgba.RGBA or tuple(int, int, int, int)
+    :return: QColor
+    """
+
+    if isinstance(value, QColor):
+        return value
+    if isinstance(value, (list, tuple, rgba.RGBA)):
+        return QColor(*value)
+
+    return color.Color.from_string(value)
@@ -0,0 +1,302 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains NumPy vectorized pixel kernels to colorize, tint and grayscale QImages.
+Kernels work directly over the QImage pixel buffer (no intermediate copies are done) and, as any other QImage
+operation, can be executed outside the GUI thread. NumPy is an optional dependency of this module.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import sys
+import logging
+import timeit
+
+from Qt.QtCore import Qt
+from Qt.QtGui import QImage, QColor, QPainter, qGray
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
+
+NUMPY_AVAILABLE = True
+try:
+    import numpy
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Format_ARGB32_Premultiplied pixels are stored as 0xAARRGGBB integers, so bytes order depends on the endianness
+if sys.byteorder == 'little':
+    BLUE, GREEN, RED, ALPHA = 0, 1, 2, 3
+else:
+    ALPHA, RED, GREEN, BLUE = 0, 1, 2, 3
+
+# Pixels with a smaller alpha are transparent in the masks created by QImage.createAlphaMask (ThresholdAlphaDither)
+ALPHA_MASK_THRESHOLD = 128
+BENCHMARK_SIZES = (16, 32, 64, 256, 1024)
+QGRAY_GRAYSCALE = 'qgray'
+LUMINANCE_GRAYSCALE = 'luminance'
+
+_GRAYSCALE_MODE = [None]
+_SRGB_TO_LINEAR_LUT = [None]
+
+
+def image_array(image, read_only=False):
+    """
+    Returns a (height, width, 4) uint8 array view over the pixels of the given image. Image must be a 32 bits
+    image (for example Format_ARGB32_Premultiplied). Channels can be accessed using BLUE, GREEN, RED and ALPHA indices.
+    Pixel data is not copied, so given image must be alive while the array is used.
+    :param image: QImage
+    :param read_only: bool, whether or not the returned array is a read only view. If False, image is detached
+    :return: numpy.ndarray
+    """
+
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError('NumPy is not available. NumPy kernels cannot be used!')
+    if image.depth() != 32:
+        raise ValueError('Only 32 bits images are supported by NumPy kernels: {}'.format(image.format()))
+
+    width, height, bytes_per_line = image.width(), image.height(), image.bytesPerLine()
+    bits = image.constBits() if read_only else image.bits()
+    if hasattr(bits, 'setsize'):
+        # PyQt returns a sip.voidptr that does not know the size of the buffer it points to
+        bits.setsize(bytes_per_line * height)
+
+    array = numpy.frombuffer(bits, dtype=numpy.uint8, count=bytes_per_line * height)
+    array = array.reshape(height, bytes_per_line)[:, :width * 4].reshape(height, width, 4)
+    if read_only:
+        array.flags.writeable = False
+
+    return array
+
+
+def colorize_image(image, new_color):
+    """
+    Returns a copy of the given image colorized with the given color. Image alpha (and antialiasing) is preserved
+    NumPy equivalent of image.colorize_image function (QPainter SourceIn composition)
+    :param image: QImage
+    :param new_color: QColor
+    :return: QImage
+    """
+
+    result = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    array = image_array(result)
+    alpha = array[..., ALPHA].astype(numpy.uint16)
+    alpha = (alpha * new_color.alpha() + 127) // 255
+    array[..., RED] = (alpha * new_color.red() + 127) // 255
+    array[..., GREEN] = (alpha * new_color.green() + 127) // 255
+    array[..., BLUE] = (alpha * new_color.blue() + 127) // 255
+    array[..., ALPHA] = alpha
+
+    return result
+
+
+def tint_image(image, tint_color):
+    """
+    Returns a copy of the given image tinted with the given color. Premultiplied tint color is added (and clamped) to
+    all the channels, alpha included, of the pixels QImage.createAlphaMask considers opaque (alpha of 128 or more)
+    NumPy equivalent of image.tint_image function (alpha mask fill drawn with QPainter Plus composition)
+    :param image: QImage
+    :param tint_color: QColor
+    :return: QImage
+    """
+
+    result = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    array = image_array(result)
+    mask = array[..., ALPHA] >= ALPHA_MASK_THRESHOLD
+    tint_alpha = tint_color.alpha()
+    for channel, value in (
+            (RED, tint_color.red()), (GREEN, tint_color.green()), (BLUE, tint_color.blue()), (ALPHA, 255)):
+        tinted = array[..., channel][mask].astype(numpy.uint16) + _premultiply(value, tint_alpha)
+        array[..., channel][mask] = numpy.minimum(tinted, 255)
+
+    return result
+
+
+def grayscale_image(image):
+    """
+    Returns a grayscale copy of the given image. Pixels are unpremultiplied, converted to gray as the
+    QImage.Format_Grayscale8 conversion of the running Qt version does (see grayscale_mode) and premultiplied again,
+    so image alpha is preserved
+    NumPy equivalent of image.grayscale_image function
+    :param image: QImage
+    :return: QImage
+    """
+
+    result = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    array = image_array(result)
+    alpha = array[..., ALPHA].astype(numpy.uint32)
+    inverse_alpha = numpy.where(alpha == 0, 0, (255 * 0x10000 + alpha // 2) // numpy.maximum(alpha, 1))
+    red, green, blue = [
+        (array[..., channel].astype(numpy.uint32) * inverse_alpha + 0x8000) >> 16 for channel in (RED, GREEN, BLUE)]
+    if grayscale_mode() == LUMINANCE_GRAYSCALE:
+        lut = _srgb_to_linear_lut()
+        luminance = 0.2126 * lut[red] + 0.7152 * lut[green] + 0.0722 * lut[blue]
+        luminance = numpy.where(
+            luminance <= 0.0031308, luminance * 12.92, 1.055 * numpy.power(luminance, 1 / 2.4) - 0.055)
+        gray = numpy.floor(numpy.clip(luminance, 0.0, 1.0) * 255 + 0.5).astype(numpy.uint32)
+    else:
+        gray = (red * 11 + green * 16 + blue * 5) // 32
+    gray = _premultiply(gray, alpha)
+    array[..., RED] = gray
+    array[..., GREEN] = gray
+    array[..., BLUE] = gray
+
+    return result
+
+
+def grayscale_mode():
+    """
+    Returns how QImage.Format_Grayscale8 conversion computes gray in the running Qt version: Qt 5 uses qGray weights
+    over the color components while newer versions compute the luminance of linear sRGB components
+    :return: str, QGRAY_GRAYSCALE or LUMINANCE_GRAYSCALE
+    """
+
+    if _GRAYSCALE_MODE[0] is None:
+        probe = QImage(1, 1, QImage.Format_ARGB32)
+        probe.fill(QColor(80, 160, 220))
+        gray = probe.convertToFormat(QImage.Format_Grayscale8).pixelColor(0, 0).red()
+        _GRAYSCALE_MODE[0] = QGRAY_GRAYSCALE if abs(gray - qGray(80, 160, 220)) <= 1 else LUMINANCE_GRAYSCALE
+
+    return _GRAYSCALE_MODE[0]
+
+
+def alpha_stack(images):
+    """
+    Returns the alpha channels of the given images stacked into a single array. All images must have the same size
+    :param images: list(QImage), list of Format_ARGB32_Premultiplied images
+    :return: numpy.ndarray, (N, height, width) uint8 array
+    """
+
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError('NumPy is not available. NumPy kernels cannot be used!')
+
+    return numpy.stack([image_array(image, read_only=True)[..., ALPHA] for image in images])
+
+
+def colorize_arrays(alphas, colors):
+    """
+    Colorizes a stack of alpha channels with each one of the given colors in a single vectorized operation.
+    Result pixels are premultiplied and use the same channels order as QImage.Format_ARGB32_Premultiplied images
+    :param alphas: numpy.ndarray, (N, height, width) uint8 array with the alpha channel of each image
+    :param colors: list(QColor)
+    :return: numpy.ndarray, (number of colors, N, height, width, 4) uint8 array
+    """
+
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError('NumPy is not available. NumPy kernels cannot be used!')
+
+    alphas = numpy.asarray(alphas, dtype=numpy.uint16)
+    rgba = numpy.array([(c.red(), c.green(), c.blue(), c.alpha()) for c in colors], dtype=numpy.uint16)
+    broadcast_shape = (len(colors),) + (1,) * alphas.ndim
+
+    result = numpy.empty((len(colors),) + alphas.shape + (4,), dtype=numpy.uint8)
+    alpha = (alphas[numpy.newaxis] * rgba[:, 3].reshape(broadcast_shape) + 127) // 255
+    result[..., ALPHA] = alpha
+    for channel, index in ((RED, 0), (GREEN, 1), (BLUE, 2)):
+        result[..., channel] = (alpha * rgba[:, index].reshape(broadcast_shape) + 127) // 255
+
+    return result
+
+
+def array_to_image(array):
+    """
+    Returns a new Format_ARGB32_Premultiplied image with the pixels of the given array
+    :param array: numpy.ndarray, (height, width, 4) uint8 array
+    :return: QImage
+    """
+
+    height, width = array.shape[:2]
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    image_array(image)[...] = array
+
+    return image
+
+
+def benchmark(
+        sizes=BENCHMARK_SIZES, iterations=100, new_color=QColor(200, 60, 60), tint_color=QColor(255, 255, 255, 100)):
+    """
+    Compares the execution time of the NumPy kernels against the QPainter functions of the image module
+    :param sizes: list(int), sizes of the square images used to benchmark
+    :param iterations: int, number of times each operation is executed
+    :param new_color: QColor, color used to benchmark colorize operation
+    :param tint_color: QColor, color used to benchmark tint operation
+    :return: list(tuple(str, int, float, float)), operation name, image size, QPainter and NumPy average times (ms)
+    """
+
+    from tpDcc.libs.resources.core import image as qt_image
+
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError('NumPy is not available. NumPy kernels cannot be benchmarked!')
+
+    operations = (
+        ('colorize', lambda img: qt_image.colorize_image(img, new_color, backend=qt_image.QPAINTER_BACKEND),
+         lambda img: colorize_image(img, new_color)),
+        ('tint', lambda img: qt_image.tint_image(img, tint_color, backend=qt_image.QPAINTER_BACKEND),
+         lambda img: tint_image(img, tint_color)),
+        ('grayscale', lambda img: qt_image.grayscale_image(img, backend=qt_image.QPAINTER_BACKEND), grayscale_image)
+    )
+
+    results = list()
+    for size in sizes:
+        source = _benchmark_image(size)
+        for name, painter_fn, numpy_fn in operations:
+            painter_time = timeit.timeit(lambda: painter_fn(source), number=iterations) * 1000.0 / iterations
+            numpy_time = timeit.timeit(lambda: numpy_fn(source), number=iterations) * 1000.0 / iterations
+            results.append((name, size, painter_time, numpy_time))
+
+    return results
+
+
+def _premultiply(value, alpha):
+    """
+    Internal function that premultiplies given color component by given alpha as qPremultiply does
+    :param value: int
+    :param alpha: int
+    :return: int
+    """
+
+    value *= alpha
+
+    return (value + (value >> 8) + 0x80) >> 8
+
+
+def _srgb_to_linear_lut():
+    """
+    Internal function that returns the lookup table that converts 8 bits sRGB components into linear ones
+    :return: numpy.ndarray, 256 float64 values between 0.0 and 1.0
+    """
+
+    if _SRGB_TO_LINEAR_LUT[0] is None:
+        values = numpy.arange(256, dtype=numpy.float64) / 255.0
+        _SRGB_TO_LINEAR_LUT[0] = numpy.where(
+            values <= 0.04045, values / 12.92, numpy.power((values + 0.055) / 1.055, 2.4))
+
+    return _SRGB_TO_LINEAR_LUT[0]
+
+
+def _benchmark_image(size):
+    """
+    Internal function that returns an antialiased image used to benchmark the kernels
+    :param size: int
+    :return: QImage
+    """
+
+    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(QColor(80, 160, 220))
+    painter.drawEllipse(1, 1, size - 2, size - 2)
+    painter.end()
+
+    return image
+
+
+if __name__ == '__main__':
+    from Qt.QtGui import QGuiApplication
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    print('{:<10} {:>6} {:>14} {:>12} {:>9}'.format('operation', 'size', 'qpainter (ms)', 'numpy (ms)', 'speedup'))
+    for op_name, op_size, op_painter_time, op_numpy_time in benchmark():
+        print('{:<10} {:>6} {:>14.4f} {:>12.4f} {:>8.2f}x'.format(
+            op_name, op_size, op_painter_time, op_numpy_time, op_painter_time / max(op_numpy_time, 1e-9)))
@@ -0,0 +1,190 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains mipmap chains used to scale pixmaps without smooth scaling large sources each time. Chains are
+only kept for sources that are scaled more than once, so transient sources are not cached
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from collections import OrderedDict
+
+from Qt.QtCore import Qt, QSize
+from Qt.QtGui import QPixmap
+
+from tpDcc.libs.resources.core import image as qt_image
+
+MAX_CHAINS = 512
+MAX_SEEN_SOURCES = 4096
+
+_MIPMAP_CHAINS = OrderedDict()
+_SEEN_SOURCES = OrderedDict()
+
+
+class MipmapChain(object):
+    """
+    Chain of downscaled variants of a source image, stored in the preferred premultiplied format.
+    Mip levels are generated on demand by successive 2x2 box filtered halvings of the source and each requested size
+    is derived once from the nearest larger mip level and memoized.
+    """
+
+    def __init__(self, source):
+        super(MipmapChain, self).__init__()
+
+        if isinstance(source, QPixmap):
+            source = source.toImage()
+        self._source = qt_image.normalize_image(source)
+        self._mips = [self._source]
+        self._levels = dict()
+        self._pixmaps = dict()
+
+    @property
+    def source(self):
+        """
+        Returns source image of the chain
+        :return: QImage
+        """
+
+        return self._source
+
+    def levels(self):
+        """
+        Returns the sizes of the levels of the chain that have been already computed
+        :return: list(QSize)
+        """
+
+        return [level.size() for level in self._levels.values()]
+
+    def image(self, size):
+        """
+        Returns the image of the chain that fits in the given size keeping its aspect ratio
+        :param size: QSize or int
+        :return: QImage
+        """
+
+        size = _to_size(size)
+        key = (size.width(), size.height())
+        level = self._levels.get(key, None)
+        if level is None:
+            level = self._levels[key] = _downscale(self._nearest_mip(size), size)
+
+        return level
+
+    def pixmap(self, size):
+        """
+        Returns the pixmap of the chain that fits in the given size keeping its aspect ratio
+        Pixmaps can only be created in the GUI thread
+        :param size: QSize or int
+        :return: QPixmap
+        """
+
+        size = _to_size(size)
+        key = (size.width(), size.height())
+        pixmap = self._pixmaps.get(key, None)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(self.image(size))
+            self._pixmaps[key] = pixmap
+
+        return pixmap
+
+    def _nearest_mip(self, size):
+        """
+        Internal function that returns the smallest mip level that still contains the given size, once fitted to the
+        source aspect ratio.
+        Missing mip levels are generated: each one is an exact halving of the previous one, so area filtering
+        averages 2x2 blocks
+        :param size: QSize
+        :return: QImage
+        """
+
+        size = self._source.size().scaled(size, Qt.KeepAspectRatio)
+        mip = self._mips[-1]
+        while mip.width() >= size.width() * 2 and mip.height() >= size.height() * 2:
+            mip = mip.scaled(mip.width() // 2, mip.height() // 2, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            self._mips.append(mip)
+
+        nearest = self._source
+        for mip in self._mips:
+            if mip.width() < size.width() or mip.height() < size.height():
+                break
+            nearest = mip
+
+        return nearest
+
+
+def mipmap_chain(source):
+    """
+    Returns the mipmap chain of the given source. Chains are only cached for sources that were already requested,
+    so the first time a source is requested a chain that is not cached is returned
+    :param source: QPixmap or QImage
+    :return: MipmapChain
+    """
+
+    key = source.cacheKey()
+    chain = _MIPMAP_CHAINS.pop(key, None)
+    if chain is None:
+        if _SEEN_SOURCES.pop(key, None) is None:
+            while len(_SEEN_SOURCES) >= MAX_SEEN_SOURCES:
+                _SEEN_SOURCES.popitem(last=False)
+            _SEEN_SOURCES[key] = True
+            return MipmapChain(source)
+        chain = MipmapChain(source)
+        while len(_MIPMAP_CHAINS) >= MAX_CHAINS:
+            _MIPMAP_CHAINS.popitem(last=False)
+    _MIPMAP_CHAINS[key] = chain
+
+    return chain
+
+
+def scaled_pixmap(pixmap, size):
+    """
+    Returns a scaled version of the given pixmap that fits in the given size keeping its aspect ratio.
+    Equivalent to pixmap.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation) but uses the pixmap mipmap chain
+    :param pixmap: QPixmap
+    :param size: QSize or int
+    :return: QPixmap
+    """
+
+    if pixmap.isNull():
+        return pixmap
+
+    return mipmap_chain(pixmap).pixmap(size)
+
+
+def clear_mipmap_cache():
+    """
+    Clears all cached mipmap chains
+    """
+
+    _MIPMAP_CHAINS.clear()
+    _SEEN_SOURCES.clear()
+
+
+def _to_size(size):
+    """
+    Internal function that converts given value into a QSize
+    :param size: QSize or int or float
+    :return: QSize
+    """
+
+    if isinstance(size, QSize):
+        return size
+
+    size = int(round(size))
+
+    return QSize(size, size)
+
+
+def _downscale(image, size):
+    """
+    Internal function that scales given image to fit in the given size keeping its aspect ratio
+    :param image: QImage
+    :param size: QSize
+    :return: QImage
+    """
+
+    if image.size() == image.size().scaled(size, Qt.KeepAspectRatio):
+        return image
+
+    return image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
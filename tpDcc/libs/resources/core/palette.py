@@ -0,0 +1,107 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to generate the 10 steps color palettes used by themes.
+Step colors are computed through QColor HSV conversions (as color.generate_color always did) and palettes are
+memoized by base color, so the palette of each base color is only generated once.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from Qt.QtGui import QColor
+
+ALGORITHM_VERSION = 1
+PALETTE_STEPS = 10
+MAX_PALETTE_CACHE = 1024
+
+HUE_STEP = 2
+SATURATION_STEP = 16
+SATURATION_STEP2 = 5
+BRIGHTNESS_STEP1 = 5
+BRIGHTNESS_STEP2 = 15
+LIGHT_COLOR_COUNT = 5
+DARK_COLOR_COUNT = 4
+
+_PALETTE_CACHE = dict()
+
+
+def generate_palette(rgb):
+    """
+    Returns the 10 steps palette of the given base color. Palettes are memoized by base color and algorithm version
+    :param rgb: tuple(int, int, int), base color
+    :return: tuple(str), 10 hexadecimal colors, from step 1 (light) to step 10 (dark)
+    """
+
+    return generate_palettes([rgb])[0]
+
+
+def generate_palettes(colors):
+    """
+    Returns the 10 steps palettes of all the given base colors. Repeated base colors are only generated once and
+    palettes that are already memoized are not generated again
+    :param colors: list(tuple(int, int, int)), base colors
+    :return: list(tuple(str)), palette of each one of the given base colors
+    """
+
+    keys = [(tuple(int(value) for value in rgb[:3]), ALGORITHM_VERSION) for rgb in colors]
+    missing = list(set(key[0] for key in keys if key not in _PALETTE_CACHE))
+    if missing:
+        if len(_PALETTE_CACHE) + len(missing) > MAX_PALETTE_CACHE:
+            _PALETTE_CACHE.clear()
+        for rgb in missing:
+            base_color = QColor(*rgb)
+            _PALETTE_CACHE[(rgb, ALGORITHM_VERSION)] = tuple(
+                step_color(base_color, index) for index in range(1, PALETTE_STEPS + 1))
+
+    return [_PALETTE_CACHE[key] for key in keys]
+
+
+def step_color(base_color, index):
+    """
+    Returns the color of the given palette step
+    :param base_color: QColor
+    :param index: int, palette step from 1 (light) to 10 (dark)
+    :return: str, hexadecimal color
+    """
+
+    hue = base_color.hue()
+    light = index <= 6
+    i = LIGHT_COLOR_COUNT + 1 - index if light else index - LIGHT_COLOR_COUNT - 1
+
+    if 60 <= hue <= 240:
+        new_hue = hue - HUE_STEP * i if light else hue + HUE_STEP * i
+    else:
+        new_hue = hue + HUE_STEP * i if light else hue - HUE_STEP * i
+    if new_hue < 0:
+        new_hue += 359
+    elif new_hue >= 359:
+        new_hue -= 359
+
+    saturation = base_color.saturationF() * 100
+    if light:
+        new_saturation = saturation - SATURATION_STEP * i
+    elif i == DARK_COLOR_COUNT:
+        new_saturation = saturation + SATURATION_STEP
+    else:
+        new_saturation = saturation + SATURATION_STEP2 * i
+    new_saturation = min(100.0, new_saturation)
+    if light and i == LIGHT_COLOR_COUNT and new_saturation > 10:
+        new_saturation = 10
+    new_saturation = max(6.0, new_saturation)
+
+    value = base_color.valueF()
+    if light:
+        new_value = min((value * 100 + BRIGHTNESS_STEP1 * i) / 100, 1.0)
+    else:
+        new_value = max((value * 100 - BRIGHTNESS_STEP2 * i) / 100, 0.0)
+
+    return QColor.fromHsvF(new_hue / 359.0, round(new_saturation * 10) / 1000.0, new_value).name()
+
+
+def clear_palette_cache():
+    """
+    Clears all the memoized palettes
+    """
+
+    _PALETTE_CACHE.clear()
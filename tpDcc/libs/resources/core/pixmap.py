@@ -7,10 +7,28 @@ Module that contains base class for Qt pixmaps
 
 from __future__ import print_function, division, absolute_import
 
-from Qt.QtCore import Qt
-from Qt.QtGui import QPixmap, QImage, QColor, QPainter
-
-from tpDcc.libs.resources.core import cache, color
+from Qt.QtCore import Qt, QSize
+from Qt.QtGui import QPixmap, QImage, QColor, QPainter, QRegion
+
+from tpDcc.libs.resources.core import cache, rgba, color, image as qt_image, mipmap
+
+COLOR_OPERATION = 'color'
+TINT_OPERATION = 'tint'
+OVERLAY_OPERATION = 'overlay'
+GRAYSCALE_OPERATION = 'grayscale'
+SCALE_OPERATION = 'scale'
+PAINTER_OPERATIONS = (COLOR_OPERATION, TINT_OPERATION, OVERLAY_OPERATION)
+# Operations whose result does not change (up to rounding) if the image is scaled before them. Colorization is linear
+# in premultiplied values, while tint (alpha threshold mask and clamped addition) and grayscale (non linear in Qt 6)
+# are not, so scales are never moved before them
+SCALE_COMMUTING_OPERATIONS = (COLOR_OPERATION,)
+PIPELINE_CACHE_SIZE = 512
+MASK_CACHE_SIZE = 512
+
+_PIPELINE_IMAGES_CACHE = cache.LRUCache(PIPELINE_CACHE_SIZE)
+_PIPELINE_PIXMAPS_CACHE = cache.LRUCache(PIPELINE_CACHE_SIZE)
+_MASKS_CACHE = cache.LRUCache(MASK_CACHE_SIZE)
+_MASK_REGIONS_CACHE = cache.LRUCache(MASK_CACHE_SIZE)
 
 
 class Pixmap(QPixmap, object):
@@ -27,6 +45,8 @@ class Pixmap(QPixmap, object):
 
         if isinstance(new_color, str):
             new_color = color.Color.from_string(new_color)
+        elif isinstance(new_color, (list, tuple, rgba.RGBA)):
+            new_color = color.Color(*new_color)
 
         if not self.isNull():
             painter = QPainter(self)
@@ -68,6 +88,193 @@ class Pixmap(QPixmap, object):
         self.swap(pixmap)
 
 
+class PixmapPipeline(object):
+    """
+    Lazy chain of pixmap operations. For example:
+        PixmapPipeline(pixmap).color('#FFFFFF').tint((255, 0, 0, 100)).grayscale().scale(24).pixmap()
+    Operations are not applied until the result is requested. Then, they are fused into the fewest possible pixel
+    passes and the final image is memoized on the hash of the operations chain, so recipes built from the same
+    source reuse the same result.
+    """
+
+    def __init__(self, source):
+        super(PixmapPipeline, self).__init__()
+
+        self._source = source
+        self._operations = list()
+        self._overlays = dict()
+
+    def color(self, new_color):
+        """
+        Colorizes the pixmap keeping its alpha
+        :param new_color: str or tuple or QColor
+        :return: PixmapPipeline
+        """
+
+        self._operations.append((COLOR_OPERATION, _rgba(new_color)))
+
+        return self
+
+    def tint(self, tint_color=(255, 255, 255, 100), composition_mode=QPainter.CompositionMode_Plus):
+        """
+        Tints the pixmap
+        :param tint_color: str or tuple or QColor
+        :param composition_mode: QPainter.CompositionMode
+        :return: PixmapPipeline
+        """
+
+        self._operations.append((TINT_OPERATION, _rgba(tint_color), composition_mode))
+
+        return self
+
+    def overlay(self, over_pixmap, overlay_color=None, align=Qt.AlignCenter):
+        """
+        Overlays given pixmap on top of the pixmap
+        :param over_pixmap: QPixmap or QImage
+        :param overlay_color: str or tuple or QColor or None, color used to colorize the overlay pixmap
+        :param align: Qt.AlignCenter or None
+        :return: PixmapPipeline
+        """
+
+        over_key = over_pixmap.cacheKey()
+        self._overlays[over_key] = over_pixmap
+        overlay_color = _rgba(overlay_color) if overlay_color is not None else None
+        self._operations.append((OVERLAY_OPERATION, over_key, overlay_color, align is Qt.AlignCenter))
+
+        return self
+
+    def grayscale(self):
+        """
+        Converts the pixmap into grayscale
+        :return: PixmapPipeline
+        """
+
+        self._operations.append((GRAYSCALE_OPERATION,))
+
+        return self
+
+    def scale(self, size):
+        """
+        Scales the pixmap to fit in the given size keeping its aspect ratio
+        :param size: QSize or int
+        :return: PixmapPipeline
+        """
+
+        if not isinstance(size, QSize):
+            size = QSize(int(round(size)), int(round(size)))
+        self._operations.append((SCALE_OPERATION, size.width(), size.height()))
+
+        return self
+
+    def key(self):
+        """
+        Returns the key that identifies the result of this pipeline
+        :return: tuple
+        """
+
+        return self._source.cacheKey(), tuple(self._operations)
+
+    def image(self):
+        """
+        Returns the result of the pipeline as an image
+        :return: QImage
+        """
+
+        key = self.key()
+        result = _PIPELINE_IMAGES_CACHE.get(key, None)
+        if result is None:
+            result = self._run()
+            _PIPELINE_IMAGES_CACHE.set(key, result)
+
+        return result
+
+    def pixmap(self):
+        """
+        Returns the result of the pipeline as a pixmap. Pixmaps can only be created in the GUI thread
+        :return: Pixmap
+        """
+
+        key = self.key()
+        result = _PIPELINE_PIXMAPS_CACHE.get(key, None)
+        if result is None:
+            result = QPixmap.fromImage(self.image())
+            _PIPELINE_PIXMAPS_CACHE.set(key, result)
+
+        return Pixmap(result)
+
+    def _run(self):
+        """
+        Internal function that applies all the fused operations of the pipeline
+        :return: QImage
+        """
+
+        source_size = self._source.size()
+        operations = _fuse_operations(self._operations, source_size)
+
+        # Leading scales are served from the mipmap chain of the source
+        if operations and operations[0][0] == SCALE_OPERATION:
+            result = mipmap.mipmap_chain(self._source).image(QSize(operations[0][1], operations[0][2]))
+            operations = operations[1:]
+        elif isinstance(self._source, QPixmap):
+            result = self._source.toImage()
+        else:
+            result = self._source
+        result = qt_image.normalize_image(result)
+
+        i = 0
+        while i < len(operations):
+            operation = operations[i]
+            if operation[0] in PAINTER_OPERATIONS:
+                # Consecutive painter operations share a single painter pass
+                j = i
+                while j < len(operations) and operations[j][0] in PAINTER_OPERATIONS:
+                    j += 1
+                result = self._paint(result, operations[i:j])
+                i = j
+                continue
+            if operation[0] == GRAYSCALE_OPERATION:
+                result = qt_image.grayscale_image(result)
+            elif operation[0] == SCALE_OPERATION:
+                result = result.scaled(
+                    QSize(operation[1], operation[2]), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            i += 1
+
+        return result
+
+    def _paint(self, image, operations):
+        """
+        Internal function that applies given painter operations using a single painter
+        :param image: QImage
+        :param operations: list(tuple)
+        :return: QImage
+        """
+
+        image = QImage(image)
+        painter = QPainter(image)
+        for operation in operations:
+            if operation[0] == COLOR_OPERATION:
+                painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+                painter.fillRect(image.rect(), QColor(*operation[1]))
+            elif operation[0] == TINT_OPERATION:
+                painter.setCompositionMode(operation[2])
+                painter.drawImage(0, 0, qt_image.mask_fill(image, operation[1]))
+            elif operation[0] == OVERLAY_OPERATION:
+                over_image = self._overlays[operation[1]]
+                if isinstance(over_image, QPixmap):
+                    over_image = qt_image.normalize_image(over_image.toImage())
+                if operation[2] is not None:
+                    over_image = qt_image.colorize_image(over_image, operation[2])
+                x = y = 0
+                if operation[3]:
+                    x = (image.width() - over_image.width()) // 2
+                    y = (image.height() - over_image.height()) // 2
+                painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+                painter.drawImage(x, y, over_image)
+        painter.end()
+
+        return image
+
+
 def colorize_pixmap(pixmap, new_color):
     """
     Colorizes the given pixmap with a new color based on its alpha map
@@ -81,10 +288,13 @@ def colorize_pixmap(pixmap, new_color):
     elif isinstance(new_color, (tuple, list)):
         new_color = color.Color(*new_color)
 
-    mask = pixmap.mask()
+    mask = pixmap_mask(pixmap)
     pixmap.fill(new_color)
     pixmap.setMask(mask)
 
+    # Colorizing does not modify the mask, so we can reuse it if the colorized pixmap is colorized again
+    _MASKS_CACHE.set(pixmap.cacheKey(), mask)
+
     return pixmap
 
 
@@ -130,12 +340,12 @@ def tint_pixmap(pixmap, tint_color=(255, 255, 255, 100), composition_mode=QPaint
     """
 
     tint_color = QColor(*tint_color)
-    over_pixmap = QPixmap(pixmap.width(), pixmap.height())
-    over_pixmap.fill(tint_color)
-    over_pixmap.setMask(pixmap.mask())
+
+    # Tint is painted as a solid fill clipped by the cached mask region, so no overlay pixmap is allocated
     painter = QPainter(pixmap)
     painter.setCompositionMode(composition_mode)
-    painter.drawPixmap(0, 0, over_pixmap.width(), over_pixmap.height(), over_pixmap)
+    painter.setClipRegion(pixmap_mask_region(pixmap))
+    painter.fillRect(pixmap.rect(), tint_color)
     painter.end()
 
 
@@ -146,13 +356,143 @@ def grayscale_pixmap(pixmap):
     :return:
     """
 
-    image = pixmap.toImage()
-    alpha = image.alphaChannel()
-    gray = image.convertToFormat(QImage.Format_Grayscale8)
-    image = gray.convertToFormat(QImage.Format_ARGB32)
-    image.setAlphaChannel(alpha)
+    return QPixmap.fromImage(qt_image.grayscale_image(pixmap.toImage()))
+
+
+def pixmap_mask(pixmap):
+    """
+    Returns the mask of the given pixmap. Masks are computed only once for each source pixmap
+    :param pixmap: QPixmap
+    :return: QBitmap
+    """
+
+    key = pixmap.cacheKey()
+    mask = _MASKS_CACHE.get(key, None)
+    if mask is None:
+        mask = pixmap.mask()
+        _MASKS_CACHE.set(key, mask)
+
+    return mask
+
+
+def pixmap_mask_region(pixmap):
+    """
+    Returns the region covered by the mask of the given pixmap. Regions are computed only once for each source pixmap
+    :param pixmap: QPixmap
+    :return: QRegion
+    """
+
+    key = pixmap.cacheKey()
+    region = _MASK_REGIONS_CACHE.get(key, None)
+    if region is None:
+        mask = pixmap_mask(pixmap)
+        region = QRegion(pixmap.rect()) if mask.isNull() else QRegion(mask)
+        _MASK_REGIONS_CACHE.set(key, region)
+
+    return region
+
+
+def clear_mask_cache():
+    """
+    Clears all the cached pixmap masks
+    """
+
+    _MASKS_CACHE.clear()
+    _MASK_REGIONS_CACHE.clear()
+
+
+def clear_pipeline_cache():
+    """
+    Clears all the memoized pipeline results
+    """
+
+    _PIPELINE_IMAGES_CACHE.clear()
+    _PIPELINE_PIXMAPS_CACHE.clear()
+
+
+def _rgba(value):
+    """
+    Internal function that converts given color value into a RGBA tuple
+    :param value: str or tuple or QColor or rgba.RGBA
+    :return: tuple(int, int, int, int)
+    """
+
+    if isinstance(value, rgba.RGBA):
+        return value.to_tuple()
+    if isinstance(value, str):
+        value = color.Color.from_string(value)
+    elif isinstance(value, (list, tuple)):
+        value = color.Color(*value)
+
+    return tuple(value.getRgb())
+
+
+def _fuse_operations(operations, size):
+    """
+    Internal function that returns a list of operations with the same result (up to rounding) that requires less
+    pixel passes:
+        - Consecutive colorizations and colorizations followed by a grayscale are merged into a single colorization
+        - Downscales are moved before the colorizations that precede them, so those work with less pixels. Other
+          operations do not commute with scaling, so downscales are never moved before them
+        - Consecutive scales are merged into a single one
+    :param operations: list(tuple)
+    :param size: QSize, size of the pipeline source
+    :return: list(tuple)
+    """
+
+    fused = list()
+    for operation in operations:
+        previous = fused[-1] if fused else None
+        if previous and previous[0] == COLOR_OPERATION:
+            previous_color = previous[1]
+            if operation[0] == COLOR_OPERATION:
+                # Colorizing replaces the color and only multiplies alpha
+                new_alpha = previous_color[3] * operation[1][3] // 255
+                fused[-1] = (COLOR_OPERATION, operation[1][:3] + (new_alpha,))
+                continue
+            if operation[0] == GRAYSCALE_OPERATION:
+                gray = _gray(*previous_color[:3])
+                fused[-1] = (COLOR_OPERATION, (gray, gray, gray, previous_color[3]))
+                continue
+        if previous and previous[0] == GRAYSCALE_OPERATION and operation[0] == GRAYSCALE_OPERATION:
+            continue
+        fused.append(operation)
+
+    result = list()
+    for operation in fused:
+        if operation[0] != SCALE_OPERATION:
+            result.append(operation)
+            continue
+        target_size = size.scaled(QSize(operation[1], operation[2]), Qt.KeepAspectRatio)
+        if target_size.width() <= size.width() and target_size.height() <= size.height():
+            index = len(result)
+            while index > 0 and result[index - 1][0] in SCALE_COMMUTING_OPERATIONS:
+                index -= 1
+            if index > 0 and result[index - 1][0] == SCALE_OPERATION:
+                result[index - 1] = (SCALE_OPERATION, target_size.width(), target_size.height())
+            else:
+                result.insert(index, (SCALE_OPERATION, target_size.width(), target_size.height()))
+        else:
+            result.append((SCALE_OPERATION, target_size.width(), target_size.height()))
+        size = target_size
+
+    return result
+
+
+def _gray(red, green, blue):
+    """
+    Internal function that returns the gray value of the given color. The color is converted with the same function
+    used by grayscale operations, because the conversion Qt uses depends on its version
+    :param red: int
+    :param green: int
+    :param blue: int
+    :return: int
+    """
+
+    color_image = QImage(1, 1, qt_image.PREFERRED_FORMAT)
+    color_image.fill(QColor(red, green, blue))
 
-    return QPixmap(image)
+    return QColor(qt_image.grayscale_image(color_image).pixel(0, 0)).red()
 
 
-PixmapCache = cache.CacheResource(Pixmap)
+PixmapCache = cache.CacheResource(Pixmap, use_atlas=True)
@@ -0,0 +1,629 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains Qt independent functions to split Qt stylesheets (QSS) into rules, to parse their selectors and
+declarations and to optimize them (duplicated rules are merged, overridden declarations are removed and the output is
+minified). Qt is only imported to measure the time Qt spends parsing a stylesheet.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import re
+import sys
+import timeit
+
+UNIVERSAL_SUBJECT = '*'
+IMPORTANT_SUFFIX = '!important'
+
+LOW_COST = 'low'
+MEDIUM_COST = 'medium'
+HIGH_COST = 'high'
+MEDIUM_COST_SCORE = 4
+HIGH_COST_SCORE = 10
+
+# Relative matching costs of the different parts of a selector in Qt style engine. Universal subjects are tested
+# against every polished widget, each ancestor step walks the widget parents and property selectors read (and
+# convert to string) a QObject property for every tested widget
+UNIVERSAL_SUBJECT_COST = 10
+CLASS_SUBJECT_COST = 1
+ANCESTOR_COST = 2
+UNIVERSAL_ANCESTOR_COST = 4
+PROPERTY_COST = 2
+PSEUDO_STATE_COST = 0.5
+
+# Shorthand properties. Any property that starts with one of these names (for example border-top-color) sets part of
+# the same values as the shorthand, so they conflict with each other when their rules are reordered
+SHORTHAND_PROPERTIES = ('background', 'border', 'font', 'margin', 'outline', 'padding')
+
+_PROPERTY_REGEX = re.compile(r'\[[^\]]*\]')
+_PSEUDO_STATE_REGEX = re.compile(r'(?<!:):(?!:)!?[A-Za-z\-]+')
+_SUBJECT_REGEX = re.compile(r'^\.?([A-Za-z_][A-Za-z0-9_]*|\*)?(?:#([A-Za-z0-9_\-]+))?')
+
+
+def split_rules(text):
+    """
+    Splits given stylesheet text into chunks that contain a single rule each. Each chunk contains the rule and all
+    the text (comments, blank lines) before it, so joining all the chunks returns the given text. Braces inside
+    comments and strings are ignored
+    :param text: str
+    :return: list(str)
+    """
+
+    chunks = list()
+    start = 0
+    depth = 0
+    for index, character in _iter_code(text):
+        if character == '{':
+            depth += 1
+        elif character == '}' and depth:
+            depth -= 1
+            if not depth:
+                chunks.append(text[start:index + 1])
+                start = index + 1
+    if start < len(text) or not chunks:
+        chunks.append(text[start:])
+
+    return chunks
+
+
+def strip_comments(text):
+    """
+    Returns given stylesheet text without comments. Comment markers inside strings are kept
+    :param text: str
+    :return: str
+    """
+
+    if '/*' not in text:
+        return text
+
+    return ''.join(text[start:end] for start, end in _code_spans(text))
+
+
+def rule_selector_text(chunk):
+    """
+    Returns the selector text of the given rule chunk (the text before the rule block without comments)
+    :param chunk: str
+    :return: str or None, None if the chunk does not contain a rule
+    """
+
+    code = strip_comments(chunk)
+    block_start = code.find('{')
+    if block_start == -1:
+        return None
+
+    return code[:block_start].strip()
+
+
+def split_selectors(selector_text):
+    """
+    Splits given selector group (selectors separated by commas) into its selectors
+    :param selector_text: str
+    :return: list(str)
+    """
+
+    selectors = list()
+    start = 0
+    depth = 0
+    quote = None
+    for index, character in enumerate(selector_text):
+        if quote:
+            if character == quote:
+                quote = None
+        elif character in '"\'':
+            quote = character
+        elif character in '[(':
+            depth += 1
+        elif character in '])':
+            depth = max(0, depth - 1)
+        elif character == ',' and not depth:
+            selectors.append(selector_text[start:index])
+            start = index + 1
+    selectors.append(selector_text[start:])
+
+    return [' '.join(selector.split()) for selector in selectors if selector.strip()]
+
+
+def selector_subject(selector):
+    """
+    Returns the subject of the given selector: the widget class of the widgets it targets, #objectName if it only
+    targets widgets by object name or * if it targets any widget
+    :param selector: str
+    :return: str
+    """
+
+    compound = _last_compound(selector)
+    match = _SUBJECT_REGEX.match(compound)
+    class_name, object_name = match.groups() if match else (None, None)
+    if class_name and class_name != UNIVERSAL_SUBJECT:
+        return class_name
+    elif object_name:
+        return '#{}'.format(object_name)
+
+    return UNIVERSAL_SUBJECT
+
+
+def rule_subjects(chunk):
+    """
+    Returns the subjects of all the selectors of the given rule chunk
+    :param chunk: str
+    :return: set(str)
+    """
+
+    selector_text = rule_selector_text(chunk)
+    if not selector_text:
+        return set()
+
+    return set(selector_subject(selector) for selector in split_selectors(selector_text))
+
+
+def partition_rules(chunks):
+    """
+    Partitions given rule chunks by the subjects (widget class, #objectName or *) their selectors target
+    :param chunks: list(str), rule chunks as returned by split_rules
+    :return: dict(str, list(int)), indices of the chunks that target each subject sorted by position
+    """
+
+    partitions = dict()
+    for i, chunk in enumerate(chunks):
+        for subject in rule_subjects(chunk):
+            partitions.setdefault(subject, list()).append(i)
+
+    return partitions
+
+
+def relevant_subjects(class_names, object_names=None):
+    """
+    Returns the subjects whose rules can be applied to widgets with the given classes and object names
+    :param class_names: list(str), widget classes including their base classes (Qt class selectors also match
+        subclasses)
+    :param object_names: list(str)
+    :return: set(str)
+    """
+
+    subjects = set(class_names)
+    subjects.update('#{}'.format(object_name) for object_name in object_names or list() if object_name)
+    subjects.add(UNIVERSAL_SUBJECT)
+
+    return subjects
+
+
+class Rule(object):
+    """
+    Stylesheet rule: a selector group and its declarations
+    """
+
+    def __init__(self, selector_text, declarations=None):
+        super(Rule, self).__init__()
+
+        self._selectors = split_selectors(selector_text)
+        self._declarations = list(declarations or list())
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.to_string())
+
+    @property
+    def selectors(self):
+        return self._selectors
+
+    @property
+    def declarations(self):
+        return self._declarations
+
+    @property
+    def key(self):
+        """
+        Returns the normalized selector group of the rule. Rules with the same key target the same widgets
+        :return: str
+        """
+
+        return ','.join(self._selectors)
+
+    def properties(self):
+        """
+        Returns the names of the properties declared by the rule
+        :return: set(str)
+        """
+
+        return set(name for name, _ in self._declarations)
+
+    def property_families(self):
+        """
+        Returns the families of the properties declared by the rule
+        :return: set(str)
+        """
+
+        return set(property_family(name) for name, _ in self._declarations)
+
+    def is_important(self):
+        """
+        Returns whether or not any of the declarations of the rule is marked as important
+        :return: bool
+        """
+
+        return any(value.endswith(IMPORTANT_SUFFIX) for _, value in self._declarations)
+
+    def to_string(self):
+        """
+        Returns the minified text of the rule
+        :return: str
+        """
+
+        return '{}{{{}}}'.format(self.key, ';'.join('{}:{}'.format(name, value) for name, value in self._declarations))
+
+
+def parse_declarations(block):
+    """
+    Parses the declarations of the given rule block (the text between the rule braces). Whitespace is collapsed
+    :param block: str
+    :return: list(tuple(str, str)), name and value of each declaration
+    """
+
+    declarations = list()
+    for declaration in _split_outside(block, ';'):
+        name, separator, value = declaration.partition(':')
+        name = name.strip()
+        value = ' '.join(value.split())
+        if not separator or not name or not value:
+            continue
+        declarations.append((name, value))
+
+    return declarations
+
+
+def parse_rules(text):
+    """
+    Parses all the rules of the given stylesheet text. Comments and text outside rules are ignored
+    :param text: str
+    :return: list(Rule)
+    """
+
+    rules = list()
+    for chunk in split_rules(strip_comments(text)):
+        block_start = chunk.find('{')
+        block_end = chunk.rfind('}')
+        if block_start == -1 or block_end < block_start:
+            continue
+        selector_text = chunk[:block_start].strip()
+        if not selector_text:
+            continue
+        rules.append(Rule(selector_text, parse_declarations(chunk[block_start + 1:block_end])))
+
+    return rules
+
+
+def optimize_rules(rules):
+    """
+    Returns an optimized copy of the given rules:
+        - Declarations overridden by a later declaration of the same property in the same rule are removed.
+        - Declarations overridden by a later rule with the same selectors are removed.
+        - Rules with the same selectors are merged into the last one if no rule between them declares any of the
+          merged properties or any property of the same shorthand family (so cascade order is kept for widgets
+          matched by other rules too).
+        - Rules without declarations are removed.
+    Rules with important declarations are kept as they are.
+    :param rules: list(Rule)
+    :return: list(Rule)
+    """
+
+    optimized = list()
+    for rule in rules:
+        declarations = rule.declarations
+        if not rule.is_important():
+            last_index = dict((name, i) for i, (name, _) in enumerate(declarations))
+            declarations = [declaration for i, declaration in enumerate(declarations)
+                            if last_index[declaration[0]] == i]
+        optimized.append(Rule(rule.key, declarations))
+
+    latest = dict()
+    for i in range(len(optimized) - 1, -1, -1):
+        rule = optimized[i]
+        if rule.is_important():
+            continue
+        j = latest.get(rule.key, None)
+        latest[rule.key] = i
+        if j is None or optimized[j].is_important():
+            continue
+        later_rule = optimized[j]
+        overridden = later_rule.properties()
+        survivors = [declaration for declaration in rule.declarations if declaration[0] not in overridden]
+        survivor_families = set(property_family(name) for name, _ in survivors)
+        if any(survivor_families & optimized[k].property_families()
+               for k in range(i + 1, j) if optimized[k] is not None):
+            optimized[i] = Rule(rule.key, survivors)
+            continue
+        optimized[j] = Rule(later_rule.key, survivors + later_rule.declarations)
+        optimized[i] = None
+        latest[rule.key] = j
+
+    return [rule for rule in optimized if rule is not None and rule.declarations]
+
+
+def property_family(name):
+    """
+    Returns the family of the given property: the shorthand property it belongs to (for example, border for
+    border-color) or the property name itself if it does not belong to any shorthand
+    :param name: str
+    :return: str
+    """
+
+    family = name.split('-', 1)[0]
+
+    return family if family in SHORTHAND_PROPERTIES else name
+
+
+def minify(text):
+    """
+    Returns the minified version of the given stylesheet text: comments, whitespace and text outside rules are
+    removed. Rules and declarations are not modified
+    :param text: str
+    :return: str
+    """
+
+    return ''.join(rule.to_string() for rule in parse_rules(text))
+
+
+def optimize(text):
+    """
+    Returns the optimized and minified version of the given stylesheet text
+    :param text: str
+    :return: str
+    """
+
+    return ''.join(rule.to_string() for rule in optimize_rules(parse_rules(text)))
+
+
+def qt_parse_time(text, iterations=5):
+    """
+    Returns the average time Qt spends parsing the given stylesheet: the stylesheet is set in a new widget and the
+    widget is polished. A QApplication must exist
+    :param text: str
+    :param iterations: int
+    :return: float, time in milliseconds
+    """
+
+    from Qt.QtWidgets import QWidget
+
+    def _parse():
+        widget = QWidget()
+        widget.setStyleSheet(text)
+        widget.ensurePolished()
+        widget.deleteLater()
+
+    return timeit.timeit(_parse, number=iterations) * 1000.0 / iterations
+
+
+def optimization_report(text, measure_parse_time=False, iterations=5):
+    """
+    Optimizes given stylesheet and returns the statistics of the optimization
+    :param text: str
+    :param measure_parse_time: bool, whether or not to measure the time Qt spends parsing both stylesheets. A
+        QApplication must exist
+    :param iterations: int, number of times each stylesheet is parsed to measure parse time
+    :return: dict
+    """
+
+    rules = parse_rules(text)
+    start_time = timeit.default_timer()
+    optimized_rules = optimize_rules(rules)
+    optimized = ''.join(rule.to_string() for rule in optimized_rules)
+    optimize_time = (timeit.default_timer() - start_time) * 1000.0
+
+    report = {
+        'original_size': len(text),
+        'optimized_size': len(optimized),
+        'original_rules': len(rules),
+        'optimized_rules': len(optimized_rules),
+        'original_declarations': sum(len(rule.declarations) for rule in rules),
+        'optimized_declarations': sum(len(rule.declarations) for rule in optimized_rules),
+        'optimize_time': optimize_time,
+        'optimized': optimized
+    }
+    if measure_parse_time:
+        report['original_parse_time'] = qt_parse_time(text, iterations=iterations)
+        report['optimized_parse_time'] = qt_parse_time(optimized, iterations=iterations)
+
+    return report
+
+
+def selector_cost(selector):
+    """
+    Estimates the cost Qt style engine pays to match the given selector against widgets
+    :param selector: str
+    :return: tuple(float, str, list(str)), cost score, cost category (low, medium or high) and reasons of the cost
+    """
+
+    compounds = _compounds(selector)
+    score = 0.0
+    reasons = list()
+    if selector_subject(selector) == UNIVERSAL_SUBJECT:
+        score += UNIVERSAL_SUBJECT_COST
+        reasons.append('universal subject is tested against every widget')
+    else:
+        score += CLASS_SUBJECT_COST
+
+    ancestors = compounds[:-1]
+    if ancestors:
+        score += ANCESTOR_COST * len(ancestors)
+        reasons.append('{} ancestor step(s) walk widget parents'.format(len(ancestors)))
+        universal_ancestors = sum(1 for compound in ancestors if selector_subject(compound) == UNIVERSAL_SUBJECT)
+        if universal_ancestors:
+            score += UNIVERSAL_ANCESTOR_COST * universal_ancestors
+            reasons.append('{} universal ancestor(s) match any parent'.format(universal_ancestors))
+
+    properties = sum(len(_PROPERTY_REGEX.findall(compound)) for compound in compounds)
+    if properties:
+        score += PROPERTY_COST * properties
+        reasons.append('{} property selector(s) read widget properties'.format(properties))
+
+    pseudo_states = sum(len(_PSEUDO_STATE_REGEX.findall(_PROPERTY_REGEX.sub('', compound))) for compound in compounds)
+    if pseudo_states:
+        score += PSEUDO_STATE_COST * pseudo_states
+
+    if score >= HIGH_COST_SCORE:
+        category = HIGH_COST
+    elif score >= MEDIUM_COST_SCORE:
+        category = MEDIUM_COST
+    else:
+        category = LOW_COST
+
+    return score, category, reasons
+
+
+def analyze_selectors(text):
+    """
+    Parses given stylesheet and estimates the matching cost of all its selectors
+    :param text: str
+    :return: list(dict), selectors sorted by cost (most expensive first). Each item contains the selector, the index
+        of its rule, the number of declarations of the rule, the cost score, the cost category and the cost reasons
+    """
+
+    results = list()
+    for i, rule in enumerate(parse_rules(text)):
+        for selector in rule.selectors:
+            score, category, reasons = selector_cost(selector)
+            results.append({
+                'selector': selector, 'rule': i, 'declarations': len(rule.declarations), 'score': score,
+                'category': category, 'reasons': reasons})
+    results.sort(key=lambda result: result['score'], reverse=True)
+
+    return results
+
+
+def _compounds(selector):
+    """
+    Internal function that splits given selector into its compound selectors (combinators are removed)
+    :param selector: str
+    :return: list(str)
+    """
+
+    compounds = list()
+    depth = 0
+    quote = None
+    start = 0
+    for index, character in enumerate(selector):
+        if quote:
+            if character == quote:
+                quote = None
+        elif character in '"\'':
+            quote = character
+        elif character == '[':
+            depth += 1
+        elif character == ']':
+            depth = max(0, depth - 1)
+        elif not depth and (character.isspace() or character == '>'):
+            compounds.append(selector[start:index])
+            start = index + 1
+    compounds.append(selector[start:])
+
+    return [compound.strip() for compound in compounds if compound.strip()]
+
+
+def _last_compound(selector):
+    """
+    Internal function that returns the last compound selector of the given selector (the one that matches the
+    widget the rule is applied to)
+    :param selector: str
+    :return: str
+    """
+
+    compounds = _compounds(selector)
+
+    return compounds[-1] if compounds else ''
+
+
+def _split_outside(text, separator):
+    """
+    Internal function that splits given text by the given separator, ignoring separators inside strings and
+    parentheses
+    :param text: str
+    :param separator: str
+    :return: list(str)
+    """
+
+    parts = list()
+    start = 0
+    depth = 0
+    quote = None
+    for index, character in enumerate(text):
+        if quote:
+            if character == quote:
+                quote = None
+        elif character in '"\'':
+            quote = character
+        elif character == '(':
+            depth += 1
+        elif character == ')':
+            depth = max(0, depth - 1)
+        elif character == separator and not depth:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+
+    return parts
+
+
+def _code_spans(text):
+    """
+    Internal function that returns the spans of the given text that are not comments
+    :param text: str
+    :return: list(tuple(int, int))
+    """
+
+    spans = list()
+    start = 0
+    index = 0
+    quote = None
+    length = len(text)
+    while index < length:
+        character = text[index]
+        if quote:
+            if character == quote:
+                quote = None
+        elif character in '"\'':
+            quote = character
+        elif character == '/' and text.startswith('*', index + 1):
+            comment_end = text.find('*/', index + 2)
+            comment_end = length if comment_end == -1 else comment_end + 2
+            spans.append((start, index))
+            start = index = comment_end
+            continue
+        index += 1
+    spans.append((start, length))
+
+    return [span for span in spans if span[0] < span[1]]
+
+
+def _iter_code(text):
+    """
+    Internal function that yields the index and character of all the characters of the given text that are not part
+    of comments or strings
+    :param text: str
+    """
+
+    for start, end in _code_spans(text):
+        quote = None
+        for index in range(start, end):
+            character = text[index]
+            if quote:
+                if character == quote:
+                    quote = None
+                continue
+            if character in '"\'':
+                quote = character
+                continue
+            yield index, character
+
+
+if __name__ == '__main__':
+    from Qt.QtWidgets import QApplication
+    if len(sys.argv) < 2:
+        sys.exit('Usage: qss.py <stylesheet file>')
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    with open(sys.argv[1], 'r') as stylesheet_file:
+        stylesheet_report = optimization_report(stylesheet_file.read(), measure_parse_time=True)
+    for report_key in ('size', 'rules', 'declarations', 'parse_time'):
+        print('{:<14} {:>12.2f} -> {:>12.2f}'.format(
+            report_key, stylesheet_report['original_{}'.format(report_key)],
+            stylesheet_report['optimized_{}'.format(report_key)]))
+    print('{:<14} {:>12.2f} ms'.format('optimize_time', stylesheet_report['optimize_time']))
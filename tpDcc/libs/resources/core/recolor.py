@@ -0,0 +1,185 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to recolor whole icon sets in a single batch
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import re
+import logging
+import timeit
+from collections import OrderedDict
+
+from Qt.QtGui import QImage, QColor
+
+from tpDcc.libs.python import python
+
+from tpDcc.libs.resources.core import image, kernels
+from tpDcc.libs.resources.core import pixmap as pixmap_resource, icon as icon_resource
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
+
+RECOLOR_EXTENSIONS = ('png',)
+
+
+def recolor_icons(icons, colors, output_folder=None, as_pixmaps=False, workers=4):
+    """
+    Recolors all the given icons with each one of the given colors in a single batch.
+    Icons are decoded in a thread pool and icons with the same size are stacked and recolored with all the colors in
+    a single vectorized operation (if NumPy is available, otherwise icons are colorized one by one with QPainter).
+    Recolored icons are either stored in the resources cache or written into disk.
+        recolored = recolor_icons('icons/default', ['#ff5500', '#00aaff'])
+        icon = recolored['#ff5500'][icon_path]
+    :param icons: str or list(str), icons folder or list of icon files
+    :param colors: str or list(str or tuple or rgba.RGBA), colors used to recolor the icons
+    :param output_folder: str or None, if given, recolored icons are written into a sub folder of this folder for
+        each color. Otherwise, they are stored in the icons (or pixmaps) cache.
+    :param as_pixmaps: bool, whether recolored icons are cached as Pixmaps or as Icons
+    :param workers: int, number of threads used to decode and write icon files
+    :return: dict(variant, dict(str, Icon or Pixmap or str)), for each color, the recolored resource (or the
+        recolored file path if output folder is given) of each icon path
+    """
+
+    start_time = timeit.default_timer()
+
+    icon_paths = _icon_paths(icons)
+    colors = [tuple(new_color) if isinstance(new_color, list) else new_color for new_color in
+              (colors if isinstance(colors, list) else [colors])]
+    if not icon_paths or not colors:
+        return dict()
+
+    images = image.process_images(image.read_image, [(icon_path,) for icon_path in icon_paths], workers=workers)
+    groups = OrderedDict()
+    for icon_path, icon_image in zip(icon_paths, images):
+        if icon_image.isNull():
+            continue
+        groups.setdefault((icon_image.width(), icon_image.height()), list()).append((icon_path, icon_image))
+
+    recolored = _recolor_groups(groups, colors, workers)
+    if output_folder:
+        result = _write_icons(recolored, output_folder, workers)
+    else:
+        result = _cache_icons(recolored, as_pixmaps)
+
+    LOGGER.debug('Recolored {} icons with {} colors in {:.2f} ms'.format(
+        len(icon_paths), len(colors), (timeit.default_timer() - start_time) * 1000.0))
+
+    return result
+
+
+def _icon_paths(icons):
+    """
+    Internal function that returns the list of icon files of the given icons folder or list of icons
+    :param icons: str or list(str)
+    :return: list(str)
+    """
+
+    if python.is_string(icons):
+        if not os.path.isdir(icons):
+            LOGGER.warning('Impossible to recolor icons because folder "{}" does not exists!'.format(icons))
+            return list()
+        icons = [os.path.join(icons, file_name) for file_name in sorted(os.listdir(icons))]
+
+    icon_paths = [icon_path for icon_path in icons if os.path.splitext(icon_path)[-1][1:].lower() in RECOLOR_EXTENSIONS]
+
+    return [icon_path for icon_path in icon_paths if os.path.isfile(icon_path)]
+
+
+def _recolor_groups(groups, colors, workers):
+    """
+    Internal function that recolors the given groups of icons with all the given colors
+    :param groups: dict(tuple(int, int), list(tuple(str, QImage))), icons grouped by size
+    :param colors: list(variant)
+    :param workers: int
+    :return: dict(variant, dict(str, QImage))
+    """
+
+    qcolors = [image._qcolor(new_color) for new_color in colors]
+    recolored = OrderedDict((new_color, OrderedDict()) for new_color in colors)
+
+    if kernels.NUMPY_AVAILABLE:
+        for group in groups.values():
+            stack = kernels.colorize_arrays(kernels.alpha_stack([icon_image for _, icon_image in group]), qcolors)
+            for color_index, new_color in enumerate(colors):
+                for icon_index, (icon_path, _) in enumerate(group):
+                    recolored[new_color][icon_path] = kernels.array_to_image(stack[color_index, icon_index])
+    else:
+        jobs = list()
+        for new_color, qcolor in zip(colors, qcolors):
+            for group in groups.values():
+                jobs.extend([(new_color, icon_path, icon_image, qcolor) for icon_path, icon_image in group])
+        images = image.process_images(
+            image.colorize_image, [(icon_image, qcolor) for _, _, icon_image, qcolor in jobs], workers=workers)
+        for (new_color, icon_path, _, _), new_image in zip(jobs, images):
+            recolored[new_color][icon_path] = new_image
+
+    return recolored
+
+
+def _write_icons(recolored, output_folder, workers):
+    """
+    Internal function that writes given recolored icons into disk
+    :param recolored: dict(variant, dict(str, QImage))
+    :param output_folder: str
+    :param workers: int
+    :return: dict(variant, dict(str, str))
+    """
+
+    result = OrderedDict()
+    jobs = list()
+    for new_color, images in recolored.items():
+        color_folder = os.path.join(output_folder, _color_folder_name(new_color))
+        if not os.path.isdir(color_folder):
+            os.makedirs(color_folder)
+        result[new_color] = OrderedDict()
+        for icon_path, new_image in images.items():
+            output_path = os.path.join(color_folder, os.path.basename(icon_path))
+            jobs.append((new_image, output_path))
+            result[new_color][icon_path] = output_path
+
+    for (_, output_path), saved in zip(jobs, image.process_images(QImage.save, jobs, workers=workers)):
+        if not saved:
+            LOGGER.warning('Impossible to write recolored icon: "{}"'.format(output_path))
+
+    return result
+
+
+def _cache_icons(recolored, as_pixmaps):
+    """
+    Internal function that stores given recolored icons in the resources cache. Must be called from the GUI thread
+    :param recolored: dict(variant, dict(str, QImage))
+    :param as_pixmaps: bool
+    :return: dict(variant, dict(str, Icon or Pixmap))
+    """
+
+    if as_pixmaps:
+        resource_class, resource_cache = pixmap_resource.Pixmap, pixmap_resource.PixmapCache
+    else:
+        resource_class, resource_cache = icon_resource.Icon, icon_resource.IconCache
+
+    result = OrderedDict()
+    for new_color, images in recolored.items():
+        result[new_color] = OrderedDict()
+        pixmaps = image.images_to_pixmaps(list(images.values()))
+        for icon_path, new_pixmap in zip(images.keys(), pixmaps):
+            resource = resource_class(new_pixmap)
+            resource_cache.add(icon_path, resource, color=new_color)
+            result[new_color][icon_path] = resource
+
+    return result
+
+
+def _color_folder_name(new_color):
+    """
+    Internal function that returns the name of the folder where icons recolored with the given color are stored
+    :param new_color: variant
+    :return: str
+    """
+
+    if isinstance(new_color, QColor):
+        new_color = new_color.name()
+
+    return re.sub('[^0-9a-zA-Z]+', '_', str(new_color)).strip('_')
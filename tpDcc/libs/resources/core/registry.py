@@ -0,0 +1,264 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a registry of themed icons set on live widgets that allows to re-theme all of them in one pass
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import weakref
+import logging
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+
+from Qt.QtCore import QObject, Signal
+
+from tpDcc.libs.resources.core import image, resource, icon as icon_resource
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
+
+IconDescription = namedtuple('IconDescription', ['name', 'category', 'extension', 'theme', 'color_role', 'color'])
+
+
+class IconRegistry(QObject, object):
+    """
+    Registry that stores the logical description of the icons set on live widgets (held by weak reference) so all
+    of them can be re-resolved, re-rendered and set again in a single batched pass when the theme changes.
+    QIcon is implicitly shared, so widgets keep their own copy of the icons they are given: re-themed icons are
+    applied again through the setter they were set with (for example, setIcon or setWindowIcon)
+    """
+
+    updated = Signal()
+
+    def __init__(self, dirname=None):
+        super(IconRegistry, self).__init__()
+
+        self._dirname = dirname
+        self._targets = dict()
+        self._theme = None
+        self._icon_theme = None
+
+    def __len__(self):
+        return len(self._targets)
+
+    def icon(self, name, category='icons', extension='png', theme=None, color_role=None, color=None):
+        """
+        Returns a new icon with the given description resolved with the current registry theme.
+        Returned icon is not updated when the theme changes, use set_icon to set icons that follow the theme
+        :param name: str, name of the icon
+        :param category: str, category of the icon
+        :param extension: str, extension of the icon
+        :param theme: str, icons theme the icon is loaded from. If not given, current registry icon theme is used
+        :param color_role: str, name of the theme option used to color the icon (for example, icon_color)
+        :param color: str, fixed color of the icon. Ignored if color role is given
+        :return: icon_resource.Icon
+        """
+
+        description = IconDescription(name, category, extension, theme, color_role, color)
+
+        return self._icon(self._resolve(description, self._theme, self._icon_theme))
+
+    def set_icon(self, target, name, category='icons', extension='png', theme=None, color_role=None, color=None,
+                 setter='setIcon'):
+        """
+        Sets the icon with the given description in the given target and registers it, so the icon is set again
+        each time the registry is re-themed
+        :param target: QObject, object the icon is set on (for example, a button)
+        :param name: str, name of the icon
+        :param category: str, category of the icon
+        :param extension: str, extension of the icon
+        :param theme: str, icons theme the icon is loaded from. If not given, current registry icon theme is used
+        :param color_role: str, name of the theme option used to color the icon (for example, icon_color)
+        :param color: str, fixed color of the icon. Ignored if color role is given
+        :param setter: str, name of the target method used to set the icon
+        :return: icon_resource.Icon, icon set in the target
+        """
+
+        description = IconDescription(name, category, extension, theme, color_role, color)
+        new_icon = self._icon(self._resolve(description, self._theme, self._icon_theme))
+        getattr(target, setter)(new_icon)
+        self.register(target, description, setter=setter)
+
+        return new_icon
+
+    def register(self, target, description, setter='setIcon'):
+        """
+        Registers given target with the logical description of its icon
+        :param target: QObject
+        :param description: IconDescription
+        :param setter: str, name of the target method used to set the icon
+        """
+
+        target_key = (id(target), setter)
+        self._targets[target_key] = (weakref.ref(target, self._on_target_deleted(target_key)), setter, description)
+
+    def unregister(self, target, setter=None):
+        """
+        Unregisters given target
+        :param target: QObject
+        :param setter: str or None, name of the setter to unregister. If not given, all target setters are unregistered
+        """
+
+        for target_key in list(self._targets.keys()):
+            if target_key[0] == id(target) and (setter is None or target_key[1] == setter):
+                self._targets.pop(target_key, None)
+
+    def targets(self):
+        """
+        Returns all live registered targets with their setters and icon descriptions
+        :return: list(tuple(QObject, str, IconDescription))
+        """
+
+        live_targets = list()
+        for target_ref, setter, description in list(self._targets.values()):
+            target = target_ref()
+            if target is not None:
+                live_targets.append((target, setter, description))
+
+        return live_targets
+
+    def follow(self, theme):
+        """
+        Makes the registry re-theme all its icons each time the given theme is updated
+        :param theme: Theme
+        """
+
+        if self._theme is not None:
+            try:
+                self._theme.updated.disconnect(self._on_theme_updated)
+            except (RuntimeError, TypeError):
+                pass
+
+        self._theme = theme
+        if theme is not None:
+            theme.updated.connect(self._on_theme_updated)
+
+    def retheme(self, theme=None, icon_theme=None, workers=0):
+        """
+        Re-resolves and re-renders the icons of all the live targets in one batched pass, sets them again and emits a
+        single update
+        :param theme: Theme, theme used to resolve color roles. If not given, followed theme is used
+        :param icon_theme: str, icons theme used to load icons that were registered without one
+        :param workers: int, if greater than 0, icon images are decoded in a pool with that number of threads
+        :return: int, number of re-themed targets
+        """
+
+        if theme is not None:
+            self._theme = theme
+        if icon_theme is not None:
+            self._icon_theme = icon_theme
+
+        live_targets = self.targets()
+        if not live_targets:
+            return 0
+
+        jobs = dict()
+        for target, setter, description in live_targets:
+            jobs.setdefault(self._resolve(description, self._theme, self._icon_theme), list()).append((target, setter))
+
+        images = self._decode_in_pool(list(jobs.keys()), workers) if workers else dict()
+
+        for job, job_targets in jobs.items():
+            new_icon = self._icon(job, source_image=images.get(job[0], None))
+            for target, setter in job_targets:
+                try:
+                    getattr(target, setter)(new_icon)
+                except RuntimeError:
+                    # Underlying Qt object was already deleted
+                    self.unregister(target, setter)
+
+        self.updated.emit()
+
+        return len(live_targets)
+
+    def clear(self):
+        """
+        Unregisters all targets
+        """
+
+        self._targets.clear()
+
+    def _resolve(self, description, theme, icon_theme):
+        """
+        Internal function that resolves the path and the color of the given icon description
+        :param description: IconDescription
+        :param theme: Theme or None
+        :param icon_theme: str or None
+        :return: tuple(str, str or None)
+        """
+
+        resource_dirname = [self._dirname] if self._dirname else list()
+        path = resource.Resource(*resource_dirname).image_path(
+            name=description.name, category=description.category, extension=description.extension,
+            theme=description.theme or icon_theme or 'default')
+
+        icon_color = description.color
+        if description.color_role and theme is not None:
+            icon_color = theme.get_theme_option(description.color_role, icon_color)
+        if icon_color is not None:
+            icon_color = str(icon_color)
+
+        return path, icon_color
+
+    def _icon(self, job, source_image=None):
+        """
+        Internal function that returns the icon of the given resolved path and color. Icons are created, colored and
+        cached by the icons cache, both when they are loaded synchronously and when they were decoded in a pool
+        :param job: tuple(str, str or None), path and color of the icon
+        :param source_image: QImage or None, image of the path already decoded
+        :return: icon_resource.Icon
+        """
+
+        path, icon_color = job
+        cached_icon = icon_resource.IconCache(path=path, color=icon_color, source_image=source_image)
+
+        return icon_resource.Icon(cached_icon) if cached_icon else icon_resource.Icon()
+
+    def _decode_in_pool(self, jobs, workers):
+        """
+        Internal function that decodes the images of the given jobs that are not cached yet in a thread pool.
+        Only QImages are used within the pool threads, icons are created and colored in the caller thread
+        :param jobs: list(tuple(str, str or None))
+        :param workers: int
+        :return: dict(str, QImage), decoded image of each path
+        """
+
+        paths = list(set(
+            path for path, icon_color in jobs
+            if path and not path.endswith('svg') and not icon_resource.IconCache.contains(path, color=icon_color)))
+        if not paths:
+            return dict()
+
+        pool = ThreadPool(workers)
+        try:
+            images = pool.map(image.read_image, paths)
+        finally:
+            pool.close()
+            pool.join()
+
+        return dict((path, new_image) for path, new_image in zip(paths, images) if not new_image.isNull())
+
+    def _on_target_deleted(self, target_key):
+        """
+        Internal function that returns the callback called when a registered target is deleted
+        :param target_key: tuple(int, str)
+        :return: callable
+        """
+
+        def _callback(target_ref):
+            entry = self._targets.get(target_key, None)
+            if entry and entry[0] is target_ref:
+                self._targets.pop(target_key, None)
+
+        return _callback
+
+    def _on_theme_updated(self):
+        """
+        Internal callback function that is called each time followed theme is updated
+        """
+
+        self.retheme()
+
+
+ICON_REGISTRY = IconRegistry()
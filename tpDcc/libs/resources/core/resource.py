@@ -10,7 +10,8 @@ from __future__ import print_function, division, absolute_import
 import os
 
 from tpDcc.libs.python import folder, path
-from tpDcc.libs.resources.core import utils, pixmap as pixmap_resource, icon as icon_resource, theme as theme_resource
+from tpDcc.libs.resources.core import utils, atlas, pixmap as pixmap_resource, icon as icon_resource
+from tpDcc.libs.resources.core import theme as theme_resource
 
 
 class Resource(object):
@@ -66,6 +67,28 @@ class Resource(object):
 
         utils.create_python_qrc_file(qrc_file, qrc_py_file)
 
+    @classmethod
+    def generate_atlas_files(cls, category='icons', resources_folder=None, max_size=atlas.MAX_ATLAS_SIZE):
+        """
+        Packs each one of the icon themes of the given category into atlas images with their offset table
+        :param category: str, name of the resources folder that contains the icon themes folders
+        :param resources_folder: str, Optional path where resources folder is located
+        :param max_size: int, maximum width and height of each atlas page
+        :return: list(str), list of generated atlas offset table files
+        """
+
+        if resources_folder is None or not os.path.isdir(resources_folder):
+            resources_folder = cls.RESOURCES_FOLDER
+
+        icons_folder = os.path.join(resources_folder, category)
+        if not os.path.isdir(icons_folder):
+            raise RuntimeError('Icons folder {0} does not exists!'.format(icons_folder))
+
+        atlas_files = atlas.build_atlases(icons_folder, max_size=max_size)
+        atlas.clear_atlas_cache()
+
+        return atlas_files
+
     @classmethod
     def get(cls, *args, **kwargs):
         """
@@ -137,6 +160,7 @@ class Resource(object):
         :param name: str, name of the icon
         :param extension: str, extension of the icon
         :param color: QColor, color of the icon
+        :param size: QSize or int, if given, image is decoded directly at a size that fits the given size
         :return: icon_resource.Icon
         """
 
@@ -153,6 +177,7 @@ class Resource(object):
         :param category: str, category of the pixmap
         :param extension: str, extension of the pixmap
         :param color: QColor, color of the pixmap
+        :param size: QSize or int, if given, image is decoded directly at a size that fits the given size
         :return: QPixmap
         """
 
@@ -199,32 +224,37 @@ class Resource(object):
 
         return self._path
 
-    def _icon(self, name, category='icons', extension='png', color=None, theme='default', skip_cache=False):
+    def _icon(self, name, category='icons', extension='png', color=None, theme='default', skip_cache=False,
+              size=None, clip_rect=None):
         """
         Returns a icon_resource.Icon object from the given resource name
         :param name: str, name of the icon
         :param extension: str, extension of the icon
         :param color: QColor, color of the icon
+        :param size: QSize or int, if given, image is decoded directly at the size bucket that fits the given size
+        :param clip_rect: QRect, if given, only that rect of the image is decoded
         :return: icon_resource.Icon
         """
 
         path = self.image_path(name=name, category=category, extension=extension, theme=theme)
-        p = icon_resource.IconCache(path=path, color=color, skip_cache=skip_cache)
+        p = icon_resource.IconCache(path=path, color=color, skip_cache=skip_cache, size=size, clip_rect=clip_rect)
 
         return p
 
-    def _pixmap(self, name, category='images', extension='png', color=None, theme=None):
+    def _pixmap(self, name, category='images', extension='png', color=None, theme=None, size=None, clip_rect=None):
         """
         Return a QPixmap object from the given resource name
         :param name: str, name of the pixmap
         :param category: str, category of the pixmap
         :param extension: str, extension of the pixmap
         :param color: QColor, color of the pixmap
+        :param size: QSize or int, if given, image is decoded directly at the size bucket that fits the given size
+        :param clip_rect: QRect, if given, only that rect of the image is decoded
         :return: QPixmap
         """
 
         path = self.image_path(name=name, category=category, extension=extension, theme=theme)
-        p = pixmap_resource.PixmapCache(path=path, color=color)
+        p = pixmap_resource.PixmapCache(path=path, color=color, size=size, clip_rect=clip_rect)
 
         return p
 
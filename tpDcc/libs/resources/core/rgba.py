@@ -0,0 +1,336 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a Qt independent RGBA color value type and functions to parse color strings into RGBA tuples.
+Parsed strings are memoized, so parsing the same color string again is only a dictionary lookup.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import re
+
+MAX_PARSE_CACHE = 4096
+
+HEX_PATTERN = re.compile(r'^#?(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$')
+FUNCTION_PATTERN = re.compile(
+    r'^(rgba?)\s*\(\s*([0-9]+)\s*,\s*([0-9]+)\s*,\s*([0-9]+)\s*(?:,\s*([0-9]+)\s*)?\)$')
+NAME_PATTERN = re.compile(r'^[a-zA-Z]+$')
+QCOLOR_HEX_PATTERN = re.compile(r'^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+HEX_RGBA_PATTERN = re.compile(r'^#[0-9a-fA-F]{8}$')
+
+_PARSE_CACHE = dict()
+
+
+class RGBA(object):
+    """
+    Immutable and hashable RGBA color value. Color is stored as a single packed 0xAARRGGBB integer (the same format
+    used by QColor.rgba()), so colors are cheap to create, compare and use as dictionary keys
+    """
+
+    __slots__ = ('_value',)
+
+    def __init__(self, red=0, green=0, blue=0, alpha=255):
+        for component in (red, green, blue, alpha):
+            if not 0 <= component <= 255:
+                raise ValueError('Color components must be between 0 and 255: {}'.format((red, green, blue, alpha)))
+        object.__setattr__(
+            self, '_value', (int(alpha) << 24) | (int(red) << 16) | (int(green) << 8) | int(blue))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} objects are immutable'.format(type(self).__name__))
+
+    def __eq__(self, other):
+        if isinstance(other, RGBA):
+            return self._value == other._value
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash(self._value)
+
+    def __repr__(self):
+        return '{}({}, {}, {}, {})'.format(type(self).__name__, *self.to_tuple())
+
+    def __str__(self):
+        return self.name()
+
+    def __iter__(self):
+        return iter(self.to_tuple())
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return self.to_tuple()[index]
+
+    def __reduce__(self):
+        return type(self), self.to_tuple()
+
+    @classmethod
+    def from_packed(cls, value):
+        """
+        Returns a new color from the given packed 0xAARRGGBB integer
+        :param value: int
+        :return: RGBA
+        """
+
+        return cls((value >> 16) & 0xff, (value >> 8) & 0xff, value & 0xff, (value >> 24) & 0xff)
+
+    @classmethod
+    def from_string(cls, text):
+        """
+        Returns a new color from the given color string. Color names are not supported
+        :param text: str, hexadecimal or functional (rgb(...) or rgba(...)) color
+        :return: RGBA
+        """
+
+        components = parse(text)
+        if components is None:
+            raise ValueError('Impossible to parse color from string: "{}"'.format(text))
+
+        return cls(*components)
+
+    @classmethod
+    def from_qcolor(cls, qcolor):
+        """
+        Returns a new color from the given QColor
+        :param qcolor: QColor
+        :return: RGBA
+        """
+
+        return cls.from_packed(qcolor.rgba())
+
+    @property
+    def red(self):
+        return (self._value >> 16) & 0xff
+
+    @property
+    def green(self):
+        return (self._value >> 8) & 0xff
+
+    @property
+    def blue(self):
+        return self._value & 0xff
+
+    @property
+    def alpha(self):
+        return (self._value >> 24) & 0xff
+
+    def packed(self):
+        """
+        Returns the color as a packed 0xAARRGGBB integer
+        :return: int
+        """
+
+        return self._value
+
+    def to_tuple(self):
+        """
+        Returns the components of the color
+        :return: tuple(int, int, int, int)
+        """
+
+        value = self._value
+
+        return (value >> 16) & 0xff, (value >> 8) & 0xff, value & 0xff, (value >> 24) & 0xff
+
+    def name(self):
+        """
+        Returns the hexadecimal name of the color: #RRGGBB if the color is opaque or #AARRGGBB otherwise
+        :return: str
+        """
+
+        components = self.to_tuple()
+
+        return to_hex(components[:3] if components[3] == 255 else components)
+
+    def to_string(self):
+        """
+        Returns the color with functional string format
+        :return: str
+        """
+
+        return 'rgba(%d, %d, %d, %d)' % self.to_tuple()
+
+    def to_qcolor(self):
+        """
+        Returns a new QColor with this color. Qt is only imported when this function is called
+        :return: QColor
+        """
+
+        from Qt.QtGui import QColor
+
+        return QColor.fromRgba(self._value)
+
+    def with_alpha(self, alpha):
+        """
+        Returns a copy of this color with the given alpha
+        :param alpha: int
+        :return: RGBA
+        """
+
+        return type(self)(self.red, self.green, self.blue, alpha)
+
+
+def is_hex(text):
+    """
+    Returns whether or not given string is a valid hexadecimal color (with or without # prefix)
+    :param text: str
+    :return: bool
+    """
+
+    return HEX_PATTERN.match(text) is not None
+
+
+def is_name(text):
+    """
+    Returns whether or not given string can be a color name (for example, red)
+    :param text: str
+    :return: bool
+    """
+
+    return NAME_PATTERN.match(text) is not None
+
+
+def parse(text):
+    """
+    Parses given color string into a RGBA tuple. Supported formats are:
+        - hexadecimal colors with or without # prefix: RGB, RRGGBB and AARRGGBB
+        - functional colors: rgb(r, g, b), rgba(r, g, b, a). Alpha is optional in both cases
+    Color names are not supported.
+    :param text: str
+    :return: tuple(int, int, int, int) or None, parsed color or None if the string is not a valid color
+    """
+
+    key = ('parse', text)
+    try:
+        return _PARSE_CACHE[key]
+    except KeyError:
+        pass
+
+    text = text.strip()
+    if is_hex(text):
+        components = parse_hex(text)
+    else:
+        components = parse_function(text)
+        if components is not None and len(components) == 3:
+            components += (255,)
+
+    return _store(key, components)
+
+
+def parse_hex(text, alpha_first=True):
+    """
+    Parses given hexadecimal color string into a RGBA tuple
+    :param text: str, hexadecimal color with or without # prefix
+    :param alpha_first: bool, whether 8 digits colors are AARRGGBB (as Qt does) or RRGGBBAA (as CSS does)
+    :return: tuple(int, int, int, int)
+    """
+
+    digits = text[1:] if text.startswith('#') else text
+    if len(digits) == 3:
+        digits = ''.join(digit * 2 for digit in digits)
+    if len(digits) == 6:
+        return int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16), 255
+    if len(digits) != 8:
+        raise ValueError('Invalid hexadecimal color: "{}"'.format(text))
+
+    values = (int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16), int(digits[6:8], 16))
+
+    return values[1:] + values[:1] if alpha_first else values
+
+
+def parse_function(text):
+    """
+    Parses given functional color string (rgb(...) or rgba(...)) into a tuple with the components found in it
+    :param text: str
+    :return: tuple(int, int, int) or tuple(int, int, int, int) or None
+    """
+
+    key = ('function', text)
+    try:
+        return _PARSE_CACHE[key]
+    except KeyError:
+        pass
+
+    match = FUNCTION_PATTERN.match(text.strip())
+    components = None
+    if match:
+        components = tuple(int(value) for value in match.groups()[1:] if value is not None)
+
+    return _store(key, components)
+
+
+def parse_css(text, alpha=True):
+    """
+    Parses given color string following the rules used by Qt stylesheets: #RGB, #RRGGBB and rgb(r, g, b) colors
+    are always supported. #RRGGBBAA and rgba(r, g, b, a) colors are only supported if alpha is True.
+    Color names are not supported.
+    :param text: str
+    :param alpha: bool
+    :return: tuple(int, int, int, int) or None
+    """
+
+    key = ('css', text, bool(alpha))
+    try:
+        return _PARSE_CACHE[key]
+    except KeyError:
+        pass
+
+    text = text.strip()
+    components = None
+    if QCOLOR_HEX_PATTERN.match(text):
+        components = parse_hex(text)
+    elif alpha and HEX_RGBA_PATTERN.match(text):
+        components = parse_hex(text, alpha_first=False)
+    else:
+        match = FUNCTION_PATTERN.match(text)
+        if match:
+            values = tuple(int(value) for value in match.groups()[1:] if value is not None)
+            if len(values) == 3 and match.group(1) == 'rgb':
+                components = values + (255,)
+            elif len(values) == 4 and alpha:
+                components = values
+
+    return _store(key, components)
+
+
+def to_hex(components):
+    """
+    Returns the hexadecimal string of the given color components. If alpha is given, the string uses Qt #AARRGGBB
+    format; otherwise #RRGGBB format is used.
+    :param components: tuple(int, int, int) or tuple(int, int, int, int)
+    :return: str
+    """
+
+    if len(components) == 4:
+        components = (components[3],) + tuple(components[:3])
+
+    return '#' + ''.join(format(value, '02x') for value in components)
+
+
+def clear_parse_cache():
+    """
+    Clears all the memoized parsed color strings
+    """
+
+    _PARSE_CACHE.clear()
+
+
+def _store(key, value):
+    """
+    Internal function that memoizes given parsed value. Cache is cleared when it is full
+    :param key: tuple
+    :param value: variant
+    :return: variant, given value
+    """
+
+    if len(_PARSE_CACHE) >= MAX_PARSE_CACHE:
+        _PARSE_CACHE.clear()
+    _PARSE_CACHE[key] = value
+
+    return value
@@ -9,10 +9,13 @@ from __future__ import print_function, division, absolute_import
 
 import os
 import re
+import logging
 
 from tpDcc.managers import resources
-from tpDcc.libs.python import color, python
-from tpDcc.libs.resources.core import utils
+from tpDcc.libs.python import color
+from tpDcc.libs.resources.core import utils, expression, qss
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
 
 
 class StyleSheet(object):
@@ -29,8 +32,7 @@ class StyleSheet(object):
         """
 
         stylesheet = cls()
-        data = stylesheet.read(path)
-        data = StyleSheet.include_paths(path, data)
+        data = StyleSheet.expand(path)
         data = StyleSheet.format(data, **kwargs)
         stylesheet.set_data(data)
 
@@ -68,29 +70,69 @@ class StyleSheet(object):
 
     @classmethod
     def include_paths(cls, file_path, data):
+        """
+        Returns given stylesheet data with all its #include lines replaced by the contents of the included files.
+        Included files are read only once and are re-read only if their modification time or size changes
+        :param file_path: str, path of the file given data was read from. Included paths are relative to it
+        :param data: str
+        :return: str
+        """
+
         if not file_path or not os.path.isfile(file_path):
             return data
 
-        file_dir = os.path.dirname(file_path)
-        included_data = list()
-        for line in data.split('\n'):
-            if not line.startswith('#include '):
-                included_data.append(line)
+        include_file = _IncludeFile.get(os.path.abspath(file_path))
+        if include_file is not None and include_file.data == data:
+            return include_file.expand()[0]
+
+        return _IncludeFile(file_path, data=data).expand()[0]
+
+    @classmethod
+    def expand(cls, path):
+        """
+        Returns the contents of the given stylesheet file with all its includes expanded. Expansion is memoized per
+        file and only the files that changed since the last expansion (and the files including them) are expanded
+        again
+        :param path: str
+        :return: str
+        """
+
+        if not path or not os.path.isfile(path):
+            return ''
+
+        include_file = _IncludeFile.get(os.path.abspath(path))
+
+        return include_file.expand()[0] if include_file is not None else ''
+
+    @classmethod
+    def include_graph(cls, path):
+        """
+        Returns the absolute paths of the given stylesheet file and all the files it includes (recursively)
+        :param path: str
+        :return: list(str)
+        """
+
+        graph = list()
+        pending = [os.path.abspath(path)] if path else list()
+        while pending:
+            file_path = pending.pop(0)
+            if file_path in graph:
                 continue
-            file_name_to_include = line.replace('#include ', '').replace('\r', '')
-            file_to_include = os.path.abspath(os.path.join(file_dir, file_name_to_include))
-            if not os.path.isfile(file_to_include):
+            include_file = _IncludeFile.get(file_path)
+            if include_file is None:
                 continue
+            graph.append(file_path)
+            pending.extend(include_file.includes())
 
-            load_data = cls.read(file_to_include)
-            new_data = cls.include_paths(file_to_include, load_data)
+        return graph
 
-            if new_data:
-                included_data.append('\n/*Included from: {}*/'.format(file_to_include))
-            for load_line in new_data.split('\n'):
-                included_data.append(load_line)
+    @classmethod
+    def clear_include_cache(cls):
+        """
+        Clears all the cached included files
+        """
 
-        return '\n'.join(included_data)
+        _IncludeFile.clear_cache()
 
     @classmethod
     def format(cls, data=None, options=None, dpi=1, **kwargs):
@@ -102,50 +144,39 @@ class StyleSheet(object):
         :return: str
         """
 
-        if options:
-            keys = options.keys()
-            if python.is_python2():
-                keys.sort(key=len, reverse=True)
-            else:
-                keys = sorted(keys, key=len, reverse=True)
-            for key in keys:
-                key_value = options[key]
-                str_key_value = str(key_value)
-                option_value = str(key_value)
-                if str_key_value.startswith('@^'):
-                    option_value = str(utils.dpi_scale(int(str_key_value[2:])))
-                elif str_key_value.startswith('^'):
-                    option_value = str(utils.dpi_scale(int(str_key_value[1:])))
-                elif 'icon' in key:
-                    theme_name = kwargs.get('theme_name', 'default') or 'default'
-                    resource_path = resources.get('icons', theme_name, str(key_value))
-                    if resource_path and os.path.isfile(resource_path):
-                        option_value = resource_path
-                elif color.string_is_hex(str_key_value):
-                    try:
-                        color_list = color.hex_to_rgba(str_key_value)
-                        option_value = 'rgba({}, {}, {}, {})'.format(
-                            color_list[0], color_list[1], color_list[2], color_list[3])
-                    except ValueError:
-                        # This exception will be raised if we try to convert an attribute that is not a color.
-                        option_value = key_value
-
-                data = data.replace('@{}'.format(key), option_value)
-
-        re_dpi = re.compile('[0-9]+[*]DPI')
-        new_data = list()
+        return StyleSheetTemplate.compile(data or '').render(
+            options=options, dpi=dpi, theme_name=kwargs.get('theme_name', 'default'))
 
-        for line in data.split('\n'):
-            dpi_ = re_dpi.search(line)
-            if dpi_:
-                new = dpi_.group().replace('DPI', str(dpi))
-                val = int(eval(new))
-                line = line.replace(dpi_.group(), str(val))
-            new_data.append(line)
+    @staticmethod
+    def format_option(key, value, theme_name='default'):
+        """
+        Returns the text an option is replaced with when a stylesheet is formatted
+        :param key: str, name of the option
+        :param value: variant, value of the option
+        :param theme_name: str, name of the theme icons are resolved from
+        :return: str
+        """
 
-        data = '\n'.join(new_data)
-
-        return data
+        str_value = str(value)
+        option_value = str_value
+        if str_value.startswith('@^'):
+            option_value = str(utils.dpi_scale(int(str_value[2:])))
+        elif str_value.startswith('^'):
+            option_value = str(utils.dpi_scale(int(str_value[1:])))
+        elif 'icon' in key:
+            resource_path = resources.get('icons', theme_name or 'default', str_value)
+            if resource_path and os.path.isfile(resource_path):
+                option_value = resource_path
+        elif color.string_is_hex(str_value):
+            try:
+                color_list = color.hex_to_rgba(str_value)
+                option_value = 'rgba({}, {}, {}, {})'.format(
+                    color_list[0], color_list[1], color_list[2], color_list[3])
+            except ValueError:
+                # This exception will be raised if we try to convert an attribute that is not a color.
+                option_value = str_value
+
+        return option_value
 
     def __init__(self):
         super(StyleSheet, self).__init__()
@@ -167,3 +198,529 @@ class StyleSheet(object):
         """
 
         self._data = data
+
+
+class _IncludeFile(object):
+    """
+    Internal class that caches the contents, the includes and the expanded contents of a stylesheet file.
+    File is validated by its modification time and size each time it is accessed
+    """
+
+    INCLUDE_PREFIX = '#include '
+
+    _FILES = dict()
+    _EXPANSION_COUNTER = [0]
+
+    def __init__(self, path, data=None, stat=None):
+        super(_IncludeFile, self).__init__()
+
+        self._path = os.path.abspath(path)
+        self._stat = stat
+        self._data = StyleSheet.read(self._path) if data is None else data
+        self._segments = self._parse(self._data)
+        self._expanded = None
+        self._expanded_key = None
+        self._expanded_token = None
+
+    @classmethod
+    def get(cls, path):
+        """
+        Returns the cached include file of the given path. File is read again if it changed since it was cached
+        :param path: str, absolute path
+        :return: _IncludeFile or None, None if the file does not exist
+        """
+
+        stat = utils.file_stat(path)
+        if stat is None or not os.path.isfile(path):
+            cls._FILES.pop(path, None)
+            return None
+
+        include_file = cls._FILES.get(path, None)
+        if include_file is None or include_file._stat != stat:
+            include_file = cls(path, stat=stat)
+            cls._FILES[path] = include_file
+
+        return include_file
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        Clears all the cached files
+        """
+
+        cls._FILES.clear()
+
+    @property
+    def data(self):
+        return self._data
+
+    def includes(self):
+        """
+        Returns the absolute paths of the files directly included by this file
+        :return: list(str)
+        """
+
+        return [segment[1] for segment in self._segments if isinstance(segment, tuple)]
+
+    def expand(self, visited=None):
+        """
+        Returns the contents of the file with all its includes expanded. Expansion is memoized and only done again
+        if any of the included files changed
+        :param visited: set(str), files that are being expanded. Used to detect include cycles
+        :return: tuple(str, int), expanded contents and expansion token (it changes each time contents change)
+        """
+
+        visited = set(visited or list())
+        visited.add(self._path)
+
+        children = list()
+        for segment in self._segments:
+            if not isinstance(segment, tuple):
+                continue
+            include_path = segment[1]
+            if include_path in visited:
+                LOGGER.warning('Include cycle detected: "{}" includes "{}". Skipping it!'.format(
+                    self._path, include_path))
+                children.append(None)
+                continue
+            include_file = self.get(include_path)
+            children.append(include_file.expand(visited) if include_file is not None else None)
+
+        key = tuple(child[1] if child is not None else None for child in children)
+        if self._expanded is not None and key == self._expanded_key:
+            return self._expanded, self._expanded_token
+
+        lines = list()
+        children = iter(children)
+        for segment in self._segments:
+            if not isinstance(segment, tuple):
+                lines.append(segment)
+                continue
+            child = next(children)
+            if child is None:
+                continue
+            if child[0]:
+                lines.append('\n/*Included from: {}*/'.format(segment[1]))
+            lines.append(child[0])
+
+        self._EXPANSION_COUNTER[0] += 1
+        self._expanded = '\n'.join(lines)
+        self._expanded_key = key
+        self._expanded_token = self._EXPANSION_COUNTER[0]
+
+        return self._expanded, self._expanded_token
+
+    def _parse(self, data):
+        """
+        Internal function that splits given data into literal lines and include segments
+        :param data: str
+        :return: list(str or tuple(str, str))
+        """
+
+        file_dir = os.path.dirname(self._path)
+        segments = list()
+        for line in data.split('\n'):
+            if not line.startswith(self.INCLUDE_PREFIX):
+                segments.append(line)
+                continue
+            file_name_to_include = line.replace(self.INCLUDE_PREFIX, '').replace('\r', '')
+            segments.append(('include', os.path.abspath(os.path.join(file_dir, file_name_to_include))))
+
+        return segments
+
+
+class StyleSheetTemplate(object):
+    """
+    Stylesheet compiled into literal segments and slots: option slots (@option) and DPI slots (arithmetic
+    expressions that use DPI, such as 4*DPI or (@padding + 2)*DPI). Stylesheet is scanned and DPI expressions are
+    parsed only once, so rendering it with different options or DPI is a single join.
+    """
+
+    OPTION_SLOT = 'option'
+    DPI_SLOT = 'dpi'
+    MAX_TEMPLATES = 32
+
+    _OPTION_REGEX = re.compile(r'@([A-Za-z0-9_]+)')
+    _TEMPLATES = dict()
+
+    def __init__(self, data):
+        super(StyleSheetTemplate, self).__init__()
+
+        self._parts = list()
+        self._slots = list()
+        self._expressions = list()
+        self._compile(data)
+
+    @classmethod
+    def compile(cls, data):
+        """
+        Returns the compiled template of the given stylesheet data. Templates are compiled only once for each data
+        :param data: str
+        :return: StyleSheetTemplate
+        """
+
+        template = cls._TEMPLATES.get(data, None)
+        if template is None:
+            template = cls(data)
+            if len(cls._TEMPLATES) >= cls.MAX_TEMPLATES:
+                cls._TEMPLATES.clear()
+            cls._TEMPLATES[data] = template
+
+        return template
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        Clears all the compiled templates
+        """
+
+        cls._TEMPLATES.clear()
+
+    def options(self):
+        """
+        Returns the names of all the options referenced by the template
+        :return: set(str)
+        """
+
+        names = set(payload for _, slot_type, payload in self._slots if slot_type == self.OPTION_SLOT)
+        for dpi_expression in self._expressions:
+            names.update(dpi_expression.variables)
+
+        return names
+
+    def uses_dpi(self):
+        """
+        Returns whether or not the template contains DPI expressions
+        :return: bool
+        """
+
+        return bool(self._expressions)
+
+    def render(self, options=None, dpi=1, theme_name='default'):
+        """
+        Renders the template with the given options and DPI
+        :param options: dict
+        :param dpi: float
+        :param theme_name: str, name of the theme icons are resolved from
+        :return: str
+        """
+
+        options = options or dict()
+        values = dict()
+        dpi_values = self._dpi_values(options, dpi, theme_name)
+        parts = list(self._parts)
+        for index, slot_type, payload in self._slots:
+            if slot_type == self.DPI_SLOT:
+                parts[index] = dpi_values[payload]
+                continue
+            value = values.get(payload, None)
+            if value is None:
+                value = self._option_value(payload, options, theme_name)
+                values[payload] = value
+            parts[index] = value
+
+        return ''.join(parts)
+
+    def _compile(self, data):
+        """
+        Internal function that splits given stylesheet data into literal segments and slots
+        :param data: str
+        """
+
+        expression_indices = dict()
+        literal = list()
+        for line_index, line in enumerate(data.split('\n')):
+            if line_index:
+                literal.append('\n')
+            position = 0
+            for start, end, slot_type, payload in self._iter_slots(line):
+                if start < position:
+                    continue
+                literal.append(line[position:start])
+                self._parts.append(''.join(literal))
+                literal = list()
+                if slot_type == self.DPI_SLOT:
+                    if payload.text not in expression_indices:
+                        expression_indices[payload.text] = len(self._expressions)
+                        self._expressions.append(payload)
+                    payload = expression_indices[payload.text]
+                self._slots.append((len(self._parts), slot_type, payload))
+                self._parts.append(line[start:end])
+                position = end
+            literal.append(line[position:])
+
+        self._parts.append(''.join(literal))
+
+    def _iter_slots(self, line):
+        """
+        Internal function that returns all the slots of the given line sorted by position. Options used inside DPI
+        expressions are part of the expression slot
+        :param line: str
+        :return: list(tuple(int, int, str, str or expression.Expression)), start, end, type and payload of each slot
+        """
+
+        slots = [(start, end, self.DPI_SLOT, dpi_expression)
+                 for start, end, dpi_expression in expression.find_dpi_expressions(line)]
+        if '@' in line:
+            slots.extend(
+                (match.start(), match.end(), self.OPTION_SLOT, match.group(1))
+                for match in self._OPTION_REGEX.finditer(line)
+                if not any(start <= match.start() < end for start, end, _, _ in slots))
+            slots.sort(key=lambda slot: slot[0])
+
+        return slots
+
+    def _dpi_values(self, options, dpi, theme_name):
+        """
+        Internal function that evaluates all the DPI expressions of the template at once for the given DPI.
+        Expressions that cannot be evaluated are left as they are (with their options replaced)
+        :param options: dict
+        :param dpi: float
+        :param theme_name: str
+        :return: list(str), text each DPI expression is replaced with
+        """
+
+        if not self._expressions:
+            return list()
+
+        variables = dict()
+        for name in set().union(*[dpi_expression.variables for dpi_expression in self._expressions]):
+            if name not in options:
+                continue
+            try:
+                variables[name] = float(StyleSheet.format_option(name, options[name], theme_name=theme_name))
+            except ValueError:
+                pass
+
+        dpi_values = list()
+        for dpi_expression, value in zip(
+                self._expressions, expression.evaluate_all(self._expressions, dpi=dpi, variables=variables)):
+            if value is None:
+                value = self._OPTION_REGEX.sub(
+                    lambda match: self._option_value(match.group(1), options, theme_name), dpi_expression.text)
+            else:
+                value = str(int(value))
+            dpi_values.append(value)
+
+        return dpi_values
+
+    def _option_value(self, token, options, theme_name):
+        """
+        Internal function that returns the text the given option token is replaced with. If there is no option with
+        the token name, the longest option that is a prefix of the token is used (as plain text replacement did)
+        :param token: str
+        :param options: dict
+        :param theme_name: str
+        :return: str
+        """
+
+        for length in range(len(token), 0, -1):
+            key = token[:length]
+            if key in options:
+                return StyleSheet.format_option(key, options[key], theme_name=theme_name) + token[length:]
+
+        return '@{}'.format(token)
+
+
+class StyleSheetRenderer(object):
+    """
+    Stylesheet split into rules that are compiled separately. An index of the rules that use each option is built,
+    so when only some options change, only the rules that use them are rendered again and the last rendered
+    stylesheet is patched. Optionally, the stylesheet is optimized (see qss.optimize) before it is compiled, so the
+    optimization is done only once and not each time the stylesheet is rendered.
+    If the renderer of a previous version of the stylesheet is given, the rules that did not change reuse its
+    compiled templates and its rendered output, so only the changed rules are compiled and rendered again
+    """
+
+    def __init__(self, data, optimize=False, previous=None):
+        super(StyleSheetRenderer, self).__init__()
+
+        self._data = data
+        self._optimized = optimize
+        chunks = qss.split_rules(qss.optimize(data) if optimize else data)
+        previous_rules = previous._rules_by_chunk() if previous is not None else dict()
+        self._chunks = chunks
+        self._templates = [
+            previous_rules[chunk][0] if chunk in previous_rules else StyleSheetTemplate(chunk) for chunk in chunks]
+        self._subjects = [qss.rule_subjects(chunk) for chunk in chunks]
+        self._partitions = qss.partition_rules(chunks)
+        self._dpi_rules = set(i for i, template in enumerate(self._templates) if template.uses_dpi())
+        self._token_rules = dict()
+        for i, template in enumerate(self._templates):
+            for token in template.options():
+                self._token_rules.setdefault(token, set()).add(i)
+
+        self._rendered = None
+        self._options = None
+        self._dpi = None
+        self._theme_name = None
+        if previous is not None and previous._rendered is not None:
+            self._rendered = [previous_rules[chunk][1] if chunk in previous_rules else None for chunk in chunks]
+            self._options = previous._options
+            self._dpi = previous._dpi
+            self._theme_name = previous._theme_name
+
+    @property
+    def data(self):
+        return self._data
+
+    @property
+    def optimized(self):
+        return self._optimized
+
+    def affected_rules(self, option_names):
+        """
+        Returns the indices of the rules that use any of the given options
+        :param option_names: list(str)
+        :return: set(int)
+        """
+
+        rules = set()
+        for option_name in option_names:
+            # Options are also used as prefix of longer tokens (for example, @unit in @default_size@unit)
+            for token, token_rules in self._token_rules.items():
+                if token.startswith(option_name):
+                    rules.update(token_rules)
+
+        return rules
+
+    def affected_subjects(self, option_names):
+        """
+        Returns the widget classes (or #objectNames) targeted by the rules that use any of the given options
+        :param option_names: list(str)
+        :return: set(str)
+        """
+
+        subjects = set()
+        for i in self.affected_rules(option_names):
+            subjects.update(self._subjects[i])
+
+        return subjects
+
+    def subjects(self):
+        """
+        Returns all the widget classes (or #objectNames) targeted by the stylesheet rules
+        :return: set(str)
+        """
+
+        return set(self._partitions)
+
+    def rules_for(self, class_names, object_names=None):
+        """
+        Returns the indices of the rules that can be applied to widgets with the given classes and object names
+        :param class_names: list(str), widget classes including their base classes
+        :param object_names: list(str)
+        :return: list(int), sorted rule indices
+        """
+
+        rules = set()
+        for subject in qss.relevant_subjects(class_names, object_names):
+            rules.update(self._partitions.get(subject, list()))
+
+        return sorted(rules)
+
+    def stylesheet_for(self, class_names, object_names=None):
+        """
+        Returns the last rendered stylesheet with only the rules that can be applied to widgets with the given
+        classes and object names. Rules keep their original order, so the result can be applied to a widget subtree
+        :param class_names: list(str), widget classes including their base classes
+        :param object_names: list(str)
+        :return: str
+        """
+
+        if self._rendered is None:
+            raise RuntimeError('Stylesheet must be rendered before retrieving its rules!')
+
+        return ''.join(self._rendered[i] for i in self.rules_for(class_names, object_names))
+
+    def render(self, options=None, dpi=1, theme_name='default'):
+        """
+        Renders the stylesheet with the given options and DPI
+        :param options: dict
+        :param dpi: float
+        :param theme_name: str
+        :return: str
+        """
+
+        return self.update(options=options, dpi=dpi, theme_name=theme_name)[0]
+
+    def update(self, options=None, dpi=1, theme_name='default'):
+        """
+        Renders the stylesheet with the given options and DPI. Only the rules affected by the options (or DPI) that
+        changed since the last render are rendered again
+        :param options: dict
+        :param dpi: float
+        :param theme_name: str
+        :return: tuple(str, set(str)), rendered stylesheet and widget classes (or #objectNames) targeted by the rules
+            that changed
+        """
+
+        options = dict(options or dict())
+        if self._rendered is None or theme_name != self._theme_name:
+            rules = set(range(len(self._templates)))
+            self._rendered = [None] * len(self._templates)
+        else:
+            changed = set(key for key in set(options) | set(self._options)
+                          if options.get(key, None) != self._options.get(key, None))
+            rules = self._changed_rules(changed, options)
+            if dpi != self._dpi:
+                rules.update(self._dpi_rules)
+            rules.update(i for i, rendered in enumerate(self._rendered) if rendered is None)
+
+        subjects = set()
+        for i in rules:
+            self._rendered[i] = self._templates[i].render(options=options, dpi=dpi, theme_name=theme_name)
+            subjects.update(self._subjects[i])
+        self._options = options
+        self._dpi = dpi
+        self._theme_name = theme_name
+
+        return ''.join(self._rendered), subjects
+
+    def _rules_by_chunk(self):
+        """
+        Internal function that returns the compiled template and the last rendered output of each rule chunk
+        :return: dict(str, tuple(StyleSheetTemplate, str or None))
+        """
+
+        rendered = self._rendered or [None] * len(self._chunks)
+
+        return dict((chunk, (template, output)) for chunk, template, output in zip(
+            self._chunks, self._templates, rendered))
+
+    def _changed_rules(self, changed, options):
+        """
+        Internal function that returns the indices of the rules whose output changes when the given options change.
+        Tokens are resolved to the longest option that is a prefix of them, as templates do
+        :param changed: set(str), names of the options that changed
+        :param options: dict, new options
+        :return: set(int)
+        """
+
+        rules = set()
+        if not changed:
+            return rules
+
+        for token, token_rules in self._token_rules.items():
+            if not any(token.startswith(option_name) for option_name in changed):
+                continue
+            if _option_key(token, options) in changed or _option_key(token, self._options) in changed:
+                rules.update(token_rules)
+
+        return rules
+
+
+def _option_key(token, options):
+    """
+    Internal function that returns the option the given token is resolved to: the longest option that is a prefix
+    of the token
+    :param token: str
+    :param options: dict
+    :return: str or None
+    """
+
+    for length in range(len(token), 0, -1):
+        if token[:length] in options:
+            return token[:length]
+
+    return None
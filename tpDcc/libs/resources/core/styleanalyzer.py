@@ -0,0 +1,186 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the stylesheet selector cost analyzer. Selectors are classified by their estimated matching
+cost (see qss.selector_cost) and, optionally, the time Qt spends polishing a synthetic widget tree with each rule is
+measured, so the most expensive rules can be ranked.
+
+Usage from the command line (widgets are created with the offscreen platform):
+    python styleanalyzer.py <stylesheet file> [--theme <theme file>] [--measure] [--top 20] [--widgets 2000]
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+import timeit
+import argparse
+import logging
+
+from tpDcc.libs.resources.core import style, qss
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
+
+DEFAULT_WIDGETS = 2000
+DEFAULT_ITERATIONS = 3
+DEFAULT_TOP = 20
+
+# Widget classes the synthetic tree is built with (the most common ones in tpDcc tools)
+TREE_WIDGET_CLASSES = (
+    'QPushButton', 'QToolButton', 'QLabel', 'QLineEdit', 'QComboBox', 'QCheckBox', 'QRadioButton', 'QSpinBox',
+    'QTreeView', 'QListView', 'QTabWidget', 'QGroupBox', 'QFrame', 'QScrollBar', 'QTextEdit', 'QProgressBar')
+
+
+def build_widget_tree(widgets=DEFAULT_WIDGETS, depth=4):
+    """
+    Creates a synthetic widget tree that contains the most common widget classes. A QApplication must exist
+    :param widgets: int, approximated number of widgets of the tree
+    :param depth: int, number of nested container levels
+    :return: QWidget, root widget of the tree
+    """
+
+    from Qt import QtWidgets
+
+    root = QtWidgets.QWidget()
+    containers = [root]
+    for _ in range(max(1, depth - 1)):
+        new_containers = list()
+        for container in containers:
+            for _ in range(2):
+                new_containers.append(QtWidgets.QFrame(container))
+        containers = new_containers
+
+    for i in range(max(0, widgets - len(containers))):
+        widget_class = getattr(QtWidgets, TREE_WIDGET_CLASSES[i % len(TREE_WIDGET_CLASSES)])
+        widget_class(containers[i % len(containers)])
+
+    return root
+
+
+def polish_time(root, stylesheet, iterations=DEFAULT_ITERATIONS):
+    """
+    Returns the average time Qt spends applying given stylesheet to the given widget tree: stylesheet is set to the
+    root widget and all the widgets of the tree are polished
+    :param root: QWidget
+    :param stylesheet: str
+    :param iterations: int
+    :return: float, time in milliseconds
+    """
+
+    from Qt.QtWidgets import QWidget
+
+    widgets = [root] + root.findChildren(QWidget)
+
+    def _polish():
+        root.setStyleSheet('')
+        root.setStyleSheet(stylesheet)
+        for widget in widgets:
+            widget.ensurePolished()
+
+    return timeit.timeit(_polish, number=iterations) * 1000.0 / iterations
+
+
+def analyze(stylesheet, measure=False, root=None, widgets=DEFAULT_WIDGETS, iterations=DEFAULT_ITERATIONS, top=None):
+    """
+    Analyzes the selectors of the given stylesheet and ranks them by cost
+    :param stylesheet: str
+    :param measure: bool, whether or not to measure the polish time of each rule. A QApplication must exist
+    :param root: QWidget or None, widget tree used to measure polish time. If not given, a synthetic one is created
+    :param widgets: int, number of widgets of the synthetic widget tree
+    :param iterations: int, number of times each rule is applied to measure its polish time
+    :param top: int or None, if given, only the polish time of the given number of most expensive (by estimated
+        cost) rules is measured
+    :return: list(dict), selectors sorted by cost (most expensive first). If polish time is measured, each item
+        contains the polish time of its rule (in milliseconds, without the time of polishing an empty stylesheet)
+        and selectors are sorted by it
+    """
+
+    results = qss.analyze_selectors(stylesheet)
+    if not measure:
+        return results[:top] if top else results
+
+    root = root or build_widget_tree(widgets)
+    rules = qss.parse_rules(stylesheet)
+    baseline = polish_time(root, '', iterations=iterations)
+    rule_times = dict()
+    for result in results:
+        if top and len(rule_times) >= top and result['rule'] not in rule_times:
+            continue
+        if result['rule'] not in rule_times:
+            rule_text = rules[result['rule']].to_string()
+            rule_times[result['rule']] = max(0.0, polish_time(root, rule_text, iterations=iterations) - baseline)
+        result['polish_time'] = rule_times[result['rule']]
+
+    results = [result for result in results if 'polish_time' in result]
+    results.sort(key=lambda result: (result['polish_time'], result['score']), reverse=True)
+
+    return results
+
+
+def load_stylesheet(style_path, theme_file=None):
+    """
+    Returns the stylesheet to analyze. If a theme file is given, the stylesheet is rendered with the theme options;
+    otherwise, the stylesheet is only expanded (options are not replaced)
+    :param style_path: str
+    :param theme_file: str or None
+    :return: str
+    """
+
+    if not theme_file:
+        return style.StyleSheet.expand(style_path)
+
+    from tpDcc.libs.resources.core import theme
+
+    stylesheet_theme = theme.Theme(theme_file)
+    data = style.StyleSheet.expand(style_path)
+
+    return style.StyleSheet.format(
+        data, options=stylesheet_theme.options(), dpi=stylesheet_theme.dpi(), theme_name=stylesheet_theme.name())
+
+
+def main(args=None):
+    """
+    Command line entry point of the analyzer
+    :param args: list(str) or None
+    :return: int, exit code
+    """
+
+    parser = argparse.ArgumentParser(description='Ranks stylesheet selectors by their matching cost')
+    parser.add_argument('stylesheet', help='Stylesheet file to analyze')
+    parser.add_argument('--theme', default=None, help='Theme file used to render the stylesheet options')
+    parser.add_argument('--measure', action='store_true', help='Measure polish time of each rule (offscreen)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='Number of selectors to report')
+    parser.add_argument('--widgets', type=int, default=DEFAULT_WIDGETS, help='Widgets of the synthetic tree')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='Iterations of each measure')
+    parsed_args = parser.parse_args(args)
+
+    if not os.path.isfile(parsed_args.stylesheet):
+        parser.error('Stylesheet file does not exist: "{}"'.format(parsed_args.stylesheet))
+
+    # QApplication must be kept alive (referenced) until the analysis finishes
+    app = None
+    if parsed_args.measure or parsed_args.theme:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from Qt.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    stylesheet = load_stylesheet(parsed_args.stylesheet, theme_file=parsed_args.theme)
+    results = analyze(
+        stylesheet, measure=parsed_args.measure, widgets=parsed_args.widgets, iterations=parsed_args.iterations,
+        top=parsed_args.top)
+
+    print('{:>5} {:<7} {:>6} {:>11}  {}'.format('rule', 'cost', 'score', 'polish (ms)', 'selector'))
+    for result in results[:parsed_args.top]:
+        polish = '{:.3f}'.format(result['polish_time']) if 'polish_time' in result else '-'
+        print('{:>5} {:<7} {:>6.1f} {:>11}  {}'.format(
+            result['rule'], result['category'], result['score'], polish, result['selector']))
+        for reason in result['reasons']:
+            print('{:>33}- {}'.format('', reason))
+    del app
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to build ahead of time stylesheet bundles and to load stylesheets from them.
+A bundle contains the stylesheets of all the themes rendered with all the styles (DCC styles included) for a fixed
+set of DPI values. Paths inside the resources folder are stored as tokens, so bundles can be moved with the library.
+Each stylesheet is stored with the hash of the options it was rendered with and bundles store the hash of the
+contents of each style, so stylesheets rendered with custom options (or from modified styles) are never returned.
+Icon options are resolved through the resources manager when the bundle is built, so bundles also store the registered
+resources folders and are not used if different resources folders are registered at runtime.
+
+Usage from the command line (widgets are created with the offscreen platform):
+    python stylebundle.py [--output <bundle file>] [--dpi 1 1.5 2]
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+import json
+import zlib
+import glob
+import hashlib
+import argparse
+import logging
+
+from tpDcc.managers import resources
+
+from tpDcc.libs.resources.core import style, stylecache
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
+
+BUNDLE_VERSION = 2
+BUNDLE_FILE_NAME = 'stylesheets.bundle'
+BUNDLE_PATH_ENV = 'TPDCC_STYLESHEET_BUNDLE'
+RESOURCES_TOKEN = '${TPDCC_RESOURCES}'
+DPI_BUCKETS = (1, 1.25, 1.5, 2)
+
+_BUNDLE = [None]
+
+
+class StyleSheetBundle(object):
+    """
+    Runtime loader of a stylesheet bundle generated with build_bundle function. Stylesheets are found with a single
+    dictionary lookup and paths are only resolved the first time each stylesheet is returned
+    """
+
+    def __init__(self, bundle_file):
+        super(StyleSheetBundle, self).__init__()
+
+        self._file = bundle_file
+        self._optimized = None
+        self._styles = dict()
+        self._resource_roots = list()
+        self._entries = dict()
+        self._resolved = dict()
+
+        self._load(bundle_file)
+
+    @property
+    def file(self):
+        return self._file
+
+    def is_valid(self):
+        """
+        Returns whether or not the bundle was loaded successfully
+        :return: bool
+        """
+
+        return bool(self._entries)
+
+    def get(self, style_path, theme_name, options, dpi=1, dpi_multiplier=1, optimize=True):
+        """
+        Returns the bundled stylesheet of the given theme rendered with the given style file, options and DPI
+        :param style_path: str, path of the style file
+        :param theme_name: str
+        :param options: dict, options the stylesheet is rendered with
+        :param dpi: float
+        :param dpi_multiplier: float, application DPI multiplier
+        :param optimize: bool, whether or not the stylesheet must be optimized
+        :return: str or None, None if the bundle does not contain the stylesheet or if the bundled stylesheet was
+            rendered with different options, from a different version of the style files or with different
+            resources folders registered
+        """
+
+        if not style_path or optimize != self._optimized:
+            return None
+        if self._resource_roots != resource_roots():
+            return None
+
+        style_name = os.path.splitext(os.path.basename(style_path))[0]
+        key = entry_key(theme_name, style_name, dpi)
+        entry = self._entries.get(key, None)
+        if not entry or entry[0] != dpi_multiplier or entry[1] != options_hash(options):
+            return None
+        if self._styles.get(style_name, None) != stylecache.get_cache().tree_hash(style_path):
+            return None
+
+        stylesheet = self._resolved.get(key, None)
+        if stylesheet is None:
+            stylesheet = self._resolved[key] = detokenize(entry[2])
+
+        return stylesheet
+
+    def _load(self, bundle_file):
+        """
+        Internal function that loads the given bundle file
+        :param bundle_file: str
+        """
+
+        try:
+            with open(bundle_file, 'rb') as fh:
+                bundle_data = json.loads(zlib.decompress(fh.read()).decode('utf-8'))
+        except Exception:
+            LOGGER.warning('Impossible to load stylesheet bundle file: "{}"!'.format(bundle_file))
+            return
+
+        if bundle_data.get('version', None) != BUNDLE_VERSION:
+            LOGGER.warning('Stylesheet bundle file "{}" was generated with a different version. Skipping it!'.format(
+                bundle_file))
+            return
+        if bundle_data.get('library_version', None) != stylecache.library_version():
+            LOGGER.warning('Stylesheet bundle file "{}" was generated with a different library version. '
+                           'Skipping it!'.format(bundle_file))
+            return
+
+        self._optimized = bundle_data.get('optimized', None)
+        self._styles = bundle_data.get('styles', dict())
+        self._resource_roots = bundle_data.get('resource_roots', list())
+        self._entries = bundle_data.get('entries', dict())
+
+
+def resources_folder():
+    """
+    Returns the root folder of the library resources. Paths inside this folder are stored as tokens in bundles
+    :return: str
+    """
+
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_bundle_path():
+    """
+    Returns the path of the bundle file. It can be overridden with TPDCC_STYLESHEET_BUNDLE environment variable
+    :return: str
+    """
+
+    return os.environ.get(BUNDLE_PATH_ENV, None) or os.path.join(resources_folder(), 'styles', BUNDLE_FILE_NAME)
+
+
+def get_bundle():
+    """
+    Returns the bundle stored in the default bundle path. Bundle is loaded only once
+    :return: StyleSheetBundle or None, None if there is no valid bundle
+    """
+
+    if _BUNDLE[0] is None:
+        bundle_path = default_bundle_path()
+        bundle = StyleSheetBundle(bundle_path) if os.path.isfile(bundle_path) else None
+        _BUNDLE[0] = bundle if bundle is not None and bundle.is_valid() else False
+
+    return _BUNDLE[0] or None
+
+
+def clear_bundle():
+    """
+    Forces the bundle to be loaded again the next time it is requested
+    """
+
+    _BUNDLE[0] = None
+
+
+def resource_roots():
+    """
+    Returns the tokenized paths of all the registered resources folders. Icon options of bundled stylesheets are
+    resolved with the resources folders that were registered when the bundle was built
+    :return: list(str)
+    """
+
+    return sorted(tokenize(os.path.normpath(resources_path)) for resources_path in resources.get_resources_paths())
+
+
+def entry_key(theme_name, style_name, dpi):
+    """
+    Returns the key of the bundle entry of the given theme, style and DPI
+    :param theme_name: str
+    :param style_name: str, name of the style file without extension
+    :param dpi: float
+    :return: str
+    """
+
+    return '{}|{}|{:g}'.format(theme_name, style_name, float(dpi))
+
+
+def options_hash(options):
+    """
+    Returns the hash of the given stylesheet options. Paths inside the resources folder are tokenized first, so the
+    hash does not depend on where the library is installed
+    :param options: dict
+    :return: str
+    """
+
+    options_data = json.dumps(
+        sorted((str(key), tokenize(str(value))) for key, value in (options or dict()).items()), separators=(',', ':'))
+
+    return hashlib.sha1(options_data.encode('utf-8')).hexdigest()
+
+
+def tokenize(text):
+    """
+    Replaces the resources folder in the given text with the resources token
+    :param text: str
+    :return: str
+    """
+
+    folder = resources_folder()
+    text = text.replace(folder, RESOURCES_TOKEN)
+    if os.sep != '/':
+        text = text.replace(folder.replace(os.sep, '/'), RESOURCES_TOKEN)
+
+    return text
+
+
+def detokenize(text):
+    """
+    Replaces the resources token in the given text with the resources folder
+    :param text: str
+    :return: str
+    """
+
+    if RESOURCES_TOKEN not in text:
+        return text
+
+    return text.replace(RESOURCES_TOKEN, resources_folder().replace(os.sep, '/'))
+
+
+def build_bundle(output_path=None, themes_folder=None, styles_folder=None, dpi_buckets=DPI_BUCKETS):
+    """
+    Renders the stylesheets of all the themes with all the styles and DPI buckets and stores them in a bundle file.
+    A QApplication must exist
+    :param output_path: str or None, bundle file path. If not given, default bundle path is used
+    :param themes_folder: str or None, folder with the theme files. If not given, library themes are used
+    :param styles_folder: str or None, folder with the style files. If not given, library styles are used
+    :param dpi_buckets: list(float)
+    :return: str, path of the generated bundle file
+    """
+
+    from tpDcc.libs.resources.core import utils, theme
+
+    output_path = output_path or default_bundle_path()
+    themes_folder = themes_folder or os.path.join(resources_folder(), 'themes')
+    styles_folder = styles_folder or os.path.join(resources_folder(), 'styles')
+    style_paths = sorted(glob.glob(os.path.join(styles_folder, '*.{}'.format(style.StyleSheet.EXTENSION))))
+    theme_paths = sorted(glob.glob(os.path.join(themes_folder, '*.{}'.format(theme.Theme.EXTENSION))))
+    optimize = theme.Theme.OPTIMIZE_STYLESHEET
+    dpi_multiplier = utils.dpi_multiplier()
+
+    styles = dict()
+    renderers = dict()
+    for style_path in style_paths:
+        style_name = os.path.splitext(os.path.basename(style_path))[0]
+        styles[style_name] = stylecache.get_cache().tree_hash(style_path)
+        renderers[style_name] = style.StyleSheetRenderer(style.StyleSheet.expand(style_path), optimize=optimize)
+
+    entries = dict()
+    for theme_path in theme_paths:
+        bundle_theme = theme.Theme(theme_path)
+        for style_path in style_paths:
+            style_name = os.path.splitext(os.path.basename(style_path))[0]
+            # DCC styles (for example, default_maya2019) are variations of the style of the theme
+            if style_name != bundle_theme.style() and not style_name.startswith('{}_'.format(bundle_theme.style())):
+                continue
+            options = bundle_theme.options(style_path=style_path)
+            for dpi in dpi_buckets:
+                stylesheet = renderers[style_name].render(options=options, dpi=dpi, theme_name=bundle_theme.name())
+                entries[entry_key(bundle_theme.name(), style_name, dpi)] = [
+                    dpi_multiplier, options_hash(options), tokenize(stylesheet)]
+
+    bundle_data = {
+        'version': BUNDLE_VERSION, 'library_version': stylecache.library_version(), 'optimized': optimize,
+        'styles': styles, 'resource_roots': resource_roots(), 'entries': entries}
+    with open(output_path, 'wb') as fh:
+        fh.write(zlib.compress(json.dumps(bundle_data, separators=(',', ':')).encode('utf-8'), 9))
+    clear_bundle()
+    LOGGER.info('Stylesheet bundle with {} stylesheets generated: "{}"'.format(len(entries), output_path))
+
+    return output_path
+
+
+def main(args=None):
+    """
+    Command line entry point to build the stylesheet bundle
+    :param args: list(str) or None
+    :return: int, exit code
+    """
+
+    parser = argparse.ArgumentParser(description='Builds the ahead of time stylesheet bundle of all the themes')
+    parser.add_argument('--output', default=None, help='Bundle file path')
+    parser.add_argument('--themes', default=None, help='Folder with the theme files')
+    parser.add_argument('--styles', default=None, help='Folder with the style files')
+    parser.add_argument('--dpi', type=float, nargs='+', default=list(DPI_BUCKETS), help='DPI buckets')
+    parsed_args = parser.parse_args(args)
+
+    # QApplication must be kept alive (referenced) until the bundle is built
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from Qt.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    bundle_path = build_bundle(
+        output_path=parsed_args.output, themes_folder=parsed_args.themes, styles_folder=parsed_args.styles,
+        dpi_buckets=parsed_args.dpi)
+    del app
+    print('Stylesheet bundle generated: "{}"'.format(bundle_path))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,337 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the two levels (memory and disk) cache of rendered stylesheets.
+Rendered stylesheets are stored by a key that combines the hash of the contents of all the files of the include tree
+of the stylesheet, the hash of the options and the rest of the parameters the stylesheet is rendered with.
+Include tree hashes are stored on disk together with the modification time and size of the files they were computed
+from, so a warm start only needs to stat the stylesheet files to find the rendered stylesheet.
+Disk cache is bounded: only the most recently used stylesheets are kept and include tree hashes are written to disk
+when the cache is flushed (at exit or when a stylesheet is persisted), never each time a style file changes.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import json
+import atexit
+import hashlib
+import logging
+
+from tpDcc.libs.resources.core import utils, style
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
+
+CACHE_VERSION = 1
+CACHE_FOLDER_ENV = 'TPDCC_STYLESHEET_CACHE'
+STYLESHEET_EXTENSION = 'qss'
+TREES_FILE_NAME = 'trees.json'
+MAX_MEMORY_CACHE = 64
+MAX_DISK_CACHE = 32
+
+_CACHE = [None]
+_LIBRARY_VERSION = [None]
+
+
+class StyleSheetCache(object):
+    """
+    Two levels cache of rendered stylesheets
+    """
+
+    def __init__(self, folder=None):
+        super(StyleSheetCache, self).__init__()
+
+        self._folder = folder
+        self._stylesheets = dict()
+        self._trees = None
+        self._trees_changed = False
+
+    @property
+    def folder(self):
+        return self._folder
+
+    def key(self, style_path, options=None, dpi=1, **kwargs):
+        """
+        Returns the cache key of the stylesheet of the given file rendered with the given parameters
+        :param style_path: str, path of the main stylesheet file
+        :param options: dict
+        :param dpi: float
+        :param kwargs: dict, any other parameter that changes the rendered stylesheet (DCC name, theme name, ...)
+        :return: str or None, None if the stylesheet file does not exist
+        """
+
+        tree_hash = self.tree_hash(style_path)
+        if tree_hash is None:
+            return None
+
+        options_data = json.dumps(
+            sorted((str(key), str(value)) for key, value in (options or dict()).items()), separators=(',', ':'))
+        options_hash = hashlib.sha1(options_data.encode('utf-8')).hexdigest()
+        parameters = sorted((str(key), str(value)) for key, value in kwargs.items())
+        key_data = json.dumps(
+            [CACHE_VERSION, library_version(), tree_hash, options_hash, str(dpi), parameters], separators=(',', ':'))
+
+        return hashlib.sha1(key_data.encode('utf-8')).hexdigest()
+
+    def tree_hash(self, style_path):
+        """
+        Returns the hash of the contents of all the files of the include tree of the given stylesheet file.
+        Files are only read if they changed since the hash was computed
+        :param style_path: str
+        :return: str or None, None if the stylesheet file does not exist
+        """
+
+        if not style_path or not os.path.isfile(style_path):
+            return None
+
+        style_path = os.path.abspath(style_path)
+        trees = self._load_trees()
+        tree = trees.get(style_path, None)
+        if tree and all(utils.file_stat(file_path) == stat for file_path, stat in tree['files']):
+            return tree['hash']
+
+        tree_data = style.StyleSheet.expand(style_path)
+        files = [[file_path, utils.file_stat(file_path)] for file_path in style.StyleSheet.include_graph(style_path)]
+        tree_hash = hashlib.sha1(tree_data.encode('utf-8')).hexdigest()
+        trees[style_path] = {'files': files, 'hash': tree_hash}
+        self._trees_changed = True
+
+        return tree_hash
+
+    def get(self, key):
+        """
+        Returns the rendered stylesheet stored with the given key. Memory cache is checked before the disk one
+        :param key: str
+        :return: str or None
+        """
+
+        if not key:
+            return None
+
+        stylesheet = self._stylesheets.get(key, None)
+        if stylesheet is not None:
+            return stylesheet
+
+        stylesheet_path = self._stylesheet_path(key)
+        if not stylesheet_path or not os.path.isfile(stylesheet_path):
+            return None
+        try:
+            with open(stylesheet_path, 'r') as fh:
+                stylesheet = fh.read()
+            # Modification time is used to know which are the least recently used cached files
+            os.utime(stylesheet_path, None)
+        except Exception:
+            LOGGER.warning('Impossible to read cached stylesheet: "{}"!'.format(stylesheet_path))
+            return None
+        self._store(key, stylesheet)
+
+        return stylesheet
+
+    def set(self, key, stylesheet, persist=True):
+        """
+        Stores the given rendered stylesheet in memory and, optionally, on disk. When a stylesheet is stored on disk,
+        the least recently used cached files are removed if there are more than MAX_DISK_CACHE
+        :param key: str
+        :param stylesheet: str
+        :param persist: bool, whether or not to store the stylesheet on disk. Stylesheets that are not likely to be
+            requested again (for example, the ones rendered with options customized at runtime) should not be persisted
+        """
+
+        if not key:
+            return
+
+        self._store(key, stylesheet)
+        stylesheet_path = self._stylesheet_path(key) if persist else None
+        if not stylesheet_path:
+            return
+        try:
+            _ensure_folder(self._folder)
+            temp_path = '{}.{}.tmp'.format(stylesheet_path, os.getpid())
+            with open(temp_path, 'w') as fh:
+                fh.write(stylesheet)
+            _replace(temp_path, stylesheet_path)
+        except Exception:
+            LOGGER.warning('Impossible to write cached stylesheet: "{}"!'.format(stylesheet_path))
+            return
+
+        self._prune()
+        self.flush()
+
+    def flush(self):
+        """
+        Stores on disk the include tree hashes computed since the last time the cache was flushed
+        """
+
+        if not self._trees_changed:
+            return
+
+        self._trees_changed = False
+        self._save_trees()
+
+    def clear(self, disk=False):
+        """
+        Clears the memory cache and, optionally, all the cached files
+        :param disk: bool
+        """
+
+        self._stylesheets.clear()
+        self._trees = None
+        self._trees_changed = False
+        if not disk or not self._folder or not os.path.isdir(self._folder):
+            return
+
+        for file_name in os.listdir(self._folder):
+            if file_name == TREES_FILE_NAME or file_name.endswith('.{}'.format(STYLESHEET_EXTENSION)):
+                try:
+                    os.remove(os.path.join(self._folder, file_name))
+                except OSError:
+                    LOGGER.warning('Impossible to remove cached stylesheet file: "{}"!'.format(file_name))
+
+    def _store(self, key, stylesheet):
+        """
+        Internal function that stores given stylesheet in memory. Memory cache is cleared when it is full
+        :param key: str
+        :param stylesheet: str
+        """
+
+        if len(self._stylesheets) >= MAX_MEMORY_CACHE:
+            self._stylesheets.clear()
+        self._stylesheets[key] = stylesheet
+
+    def _prune(self):
+        """
+        Internal function that removes the least recently used cached stylesheet files if there are more than
+        MAX_DISK_CACHE. Files are sorted by modification time, which is updated each time a file is read
+        """
+
+        extension = '.{}'.format(STYLESHEET_EXTENSION)
+        stylesheet_paths = [
+            os.path.join(self._folder, file_name) for file_name in os.listdir(self._folder)
+            if file_name.endswith(extension)]
+        if len(stylesheet_paths) <= MAX_DISK_CACHE:
+            return
+
+        stylesheet_paths.sort(key=lambda stylesheet_path: (utils.file_stat(stylesheet_path) or [0])[0])
+        for stylesheet_path in stylesheet_paths[:len(stylesheet_paths) - MAX_DISK_CACHE]:
+            try:
+                os.remove(stylesheet_path)
+            except OSError:
+                LOGGER.warning('Impossible to remove cached stylesheet file: "{}"!'.format(stylesheet_path))
+
+    def _stylesheet_path(self, key):
+        """
+        Internal function that returns the path of the file the stylesheet with the given key is stored in
+        :param key: str
+        :return: str or None, None if the cache has no disk folder
+        """
+
+        if not self._folder:
+            return None
+
+        return os.path.join(self._folder, '{}.{}'.format(key, STYLESHEET_EXTENSION))
+
+    def _load_trees(self):
+        """
+        Internal function that loads the include tree hashes stored on disk
+        :return: dict
+        """
+
+        if self._trees is not None:
+            return self._trees
+
+        self._trees = dict()
+        trees_path = os.path.join(self._folder, TREES_FILE_NAME) if self._folder else None
+        if trees_path and os.path.isfile(trees_path):
+            try:
+                with open(trees_path, 'r') as fh:
+                    trees_data = json.load(fh)
+                if trees_data.get('version', None) == CACHE_VERSION:
+                    self._trees = trees_data.get('trees', dict())
+            except Exception:
+                LOGGER.warning('Impossible to load stylesheet include trees file: "{}"!'.format(trees_path))
+
+        return self._trees
+
+    def _save_trees(self):
+        """
+        Internal function that stores the include tree hashes on disk
+        """
+
+        if not self._folder:
+            return
+
+        trees_path = os.path.join(self._folder, TREES_FILE_NAME)
+        try:
+            _ensure_folder(self._folder)
+            temp_path = '{}.{}.tmp'.format(trees_path, os.getpid())
+            with open(temp_path, 'w') as fh:
+                json.dump({'version': CACHE_VERSION, 'trees': self._trees}, fh, separators=(',', ':'))
+            _replace(temp_path, trees_path)
+        except Exception:
+            LOGGER.warning('Impossible to write stylesheet include trees file: "{}"!'.format(trees_path))
+
+
+def default_cache_folder():
+    """
+    Returns the folder rendered stylesheets are stored in. It can be overridden with TPDCC_STYLESHEET_CACHE
+    environment variable. If the variable is defined but empty, stylesheets are only cached in memory
+    :return: str or None
+    """
+
+    folder = os.environ.get(CACHE_FOLDER_ENV, None)
+    if folder is not None:
+        return folder or None
+
+    return os.path.normpath(os.path.join(os.path.expanduser('~'), 'tpDcc', 'cache', 'stylesheets'))
+
+
+def get_cache():
+    """
+    Returns the global stylesheet cache. Include tree hashes of the global cache are flushed to disk at exit
+    :return: StyleSheetCache
+    """
+
+    if _CACHE[0] is None:
+        _CACHE[0] = StyleSheetCache(default_cache_folder())
+        atexit.register(_CACHE[0].flush)
+
+    return _CACHE[0]
+
+
+def library_version():
+    """
+    Returns the version of the library. Cached stylesheets are not reused between library versions
+    :return: str
+    """
+
+    if _LIBRARY_VERSION[0] is None:
+        try:
+            from tpDcc.libs.resources import __version__
+            _LIBRARY_VERSION[0] = str(__version__.get_version())
+        except Exception:
+            _LIBRARY_VERSION[0] = 'unknown'
+
+    return _LIBRARY_VERSION[0]
+
+
+def _ensure_folder(folder):
+    """
+    Internal function that creates given folder if it does not exist
+    :param folder: str
+    """
+
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+
+
+def _replace(source_path, target_path):
+    """
+    Internal function that moves given source file into target path, overwriting it if it exists
+    :param source_path: str
+    :param target_path: str
+    """
+
+    if os.path.isfile(target_path):
+        os.remove(target_path)
+    os.rename(source_path, target_path)
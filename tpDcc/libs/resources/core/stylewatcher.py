@@ -0,0 +1,178 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the stylesheet watcher used while developing styles. It watches all the files included by the
+style of a theme and, when any of them changes, it re-applies the theme stylesheet to the registered widgets.
+Watcher is disabled by default: it only works if TPDCC_STYLESHEET_WATCH environment variable is set or if it is
+explicitly enabled, so it has no cost in production.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import timeit
+import weakref
+import logging
+
+from Qt.QtCore import QObject, QTimer, QFileSystemWatcher, Signal
+
+from tpDcc.libs.resources.core import style
+
+LOGGER = logging.getLogger('tpDcc-libs-resources')
+
+WATCH_ENV = 'TPDCC_STYLESHEET_WATCH'
+DEFAULT_DEBOUNCE = 50
+
+
+def watch_enabled():
+    """
+    Returns whether or not stylesheet watching is enabled through TPDCC_STYLESHEET_WATCH environment variable
+    :return: bool
+    """
+
+    return os.environ.get(WATCH_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class StyleSheetWatcher(QObject, object):
+    """
+    Watches the style files of a theme and re-applies the theme stylesheet to the registered widgets when any of them
+    changes. File notifications are debounced, so saving many files at once only reloads the stylesheet once
+    """
+
+    reloaded = Signal(float)
+
+    def __init__(self, theme, debounce=DEFAULT_DEBOUNCE, enabled=None, parent=None):
+        super(StyleSheetWatcher, self).__init__(parent)
+
+        self._theme = theme
+        self._enabled = watch_enabled() if enabled is None else bool(enabled)
+        self._debounce = debounce
+        self._widgets = list()
+        self._watcher = None
+        self._timer = None
+
+    def is_enabled(self):
+        """
+        Returns whether or not the watcher is enabled
+        :return: bool
+        """
+
+        return self._enabled
+
+    def is_running(self):
+        """
+        Returns whether or not the watcher is watching style files
+        :return: bool
+        """
+
+        return self._watcher is not None
+
+    def widgets(self):
+        """
+        Returns all the registered widgets that still exist
+        :return: list(QWidget)
+        """
+
+        widgets = [widget_ref() for widget_ref in self._widgets]
+
+        return [widget for widget in widgets if widget is not None]
+
+    def register(self, widget):
+        """
+        Registers given top level widget. The theme stylesheet is re-applied to it each time style files change.
+        Widgets are stored as weak references, so registered widgets can be deleted at any time
+        :param widget: QWidget
+        """
+
+        if widget is None or widget in self.widgets():
+            return
+
+        self._widgets.append(weakref.ref(widget))
+
+    def unregister(self, widget):
+        """
+        Unregisters given widget
+        :param widget: QWidget
+        """
+
+        self._widgets = [widget_ref for widget_ref in self._widgets if widget_ref() not in (None, widget)]
+
+    def start(self):
+        """
+        Starts watching the files of the theme style. Does nothing if the watcher is not enabled
+        :return: bool, True if the watcher is running
+        """
+
+        if not self._enabled:
+            return False
+        if self._watcher is not None:
+            return True
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self._debounce)
+        self._timer.timeout.connect(self.reload)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._update_paths()
+
+        return True
+
+    def stop(self):
+        """
+        Stops watching style files
+        """
+
+        if self._watcher is None:
+            return
+
+        self._timer.stop()
+        self._watcher.fileChanged.disconnect(self._on_file_changed)
+        self._watcher.deleteLater()
+        self._timer.deleteLater()
+        self._watcher = None
+        self._timer = None
+
+    def reload(self):
+        """
+        Renders the theme stylesheet again and applies it to all the registered widgets. Only style files that
+        changed are read again and only the rules that changed are compiled and rendered again
+        :return: float, time spent reloading in milliseconds
+        """
+
+        start_time = timeit.default_timer()
+        stylesheet = self._theme.stylesheet()
+        for widget in self.widgets():
+            widget.setStyleSheet(stylesheet)
+        if self._watcher is not None:
+            self._update_paths()
+        elapsed = (timeit.default_timer() - start_time) * 1000.0
+        LOGGER.debug('Stylesheet reloaded in {:.2f} ms'.format(elapsed))
+        self.reloaded.emit(elapsed)
+
+        return elapsed
+
+    def _update_paths(self):
+        """
+        Internal function that updates the watched files with the current include graph of the theme style.
+        Files replaced when saved (as some editors do) are no longer watched, so they are added again
+        """
+
+        paths = style.StyleSheet.include_graph(self._theme.stylesheet_file())
+        watched = self._watcher.files()
+        obsolete = [path for path in watched if path not in paths]
+        if obsolete:
+            self._watcher.removePaths(obsolete)
+        missing = [path for path in paths if path not in watched]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _on_file_changed(self, path):
+        """
+        Internal callback function that is called when a watched file changes
+        :param path: str
+        """
+
+        LOGGER.debug('Style file changed: "{}"'.format(path))
+        self._timer.start()
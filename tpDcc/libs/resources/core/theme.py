@@ -14,11 +14,12 @@ import logging
 
 from Qt.QtCore import QObject, Signal
 from Qt.QtGui import QColor
+from Qt.QtWidgets import QWidget
 
 from tpDcc import dcc
 from tpDcc.managers import resources
 from tpDcc.libs.python import yamlio, color, python
-from tpDcc.libs.resources.core import utils, style, cache, color as qt_color
+from tpDcc.libs.resources.core import utils, style, stylecache, stylebundle, cache, rgba, color as qt_color
 
 LOGGER = logging.getLogger('tpDcc-libs-qt')
 
@@ -83,6 +84,12 @@ class Theme(QObject, object):
         LARGE = 40
         HUGE = 48
 
+        TINY_ICON = TINY - 8
+        SMALL_ICON = SMALL - 10
+        MEDIUM_ICON = MEDIUM - 12
+        LARGE_ICON = LARGE - 16
+        HUGE_ICON = HUGE - 20
+
     class Colors(object):
 
         BLUE = '#1890FF'
@@ -103,6 +110,9 @@ class Theme(QObject, object):
     updated = Signal()
 
     EXTENSION = 'yml'
+    OPTIMIZE_STYLESHEET = True
+    CACHE_STYLESHEET = True
+    USE_STYLESHEET_BUNDLE = True
     DEFAULT_ACCENT_COLOR = QColor(0, 175, 255)
     DEFAULT_SIZE = Sizes.SMALL
 
@@ -115,6 +125,8 @@ class Theme(QObject, object):
         self._dpi = 1
         self._background_color = None
         self._overrides = list()
+        self._stylesheet_renderer = None
+        self._default_options = None
 
         self._init_colors()
         self._init_sizes()
@@ -134,6 +146,9 @@ class Theme(QObject, object):
 
         self._load_theme_data_from_file(theme_file)
 
+        # Only style sheets rendered with the options the theme was created with are stored in the disk cache
+        self._default_options = self.options()
+
     def __getattr__(self, item):
         options = self.options(skip_instance_attrs=True)
         if not options or item not in options:
@@ -312,49 +327,52 @@ class Theme(QObject, object):
         self.error_color = self.Colors.RED
         self.warning_color = self.Colors.GOLD
 
+        info_palette, success_palette, warning_palette, error_palette = qt_color.generate_palettes(
+            [self.info_color, self.success_color, self.warning_color, self.error_color])
+
         self.info_1 = self._fade_color(self.info_color, '15%')
-        self.info_2 = qt_color.generate_color(self.info_color, 2)
+        self.info_2 = info_palette[1]
         self.info_3 = self._fade_color(self.info_color, '35%')
-        self.info_4 = qt_color.generate_color(self.info_color, 4)
-        self.info_5 = qt_color.generate_color(self.info_color, 5)
-        self.info_6 = qt_color.generate_color(self.info_color, 6)
-        self.info_7 = qt_color.generate_color(self.info_color, 7)
-        self.info_8 = qt_color.generate_color(self.info_color, 8)
-        self.info_9 = qt_color.generate_color(self.info_color, 9)
-        self.info_10 = qt_color.generate_color(self.info_color, 10)
+        self.info_4 = info_palette[3]
+        self.info_5 = info_palette[4]
+        self.info_6 = info_palette[5]
+        self.info_7 = info_palette[6]
+        self.info_8 = info_palette[7]
+        self.info_9 = info_palette[8]
+        self.info_10 = info_palette[9]
 
         self.success_1 = self._fade_color(self.success_color, '15%')
-        self.success_2 = qt_color.generate_color(self.success_color, 2)
+        self.success_2 = success_palette[1]
         self.success_3 = self._fade_color(self.success_color, '35%')
-        self.success_4 = qt_color.generate_color(self.success_color, 4)
-        self.success_5 = qt_color.generate_color(self.success_color, 5)
-        self.success_6 = qt_color.generate_color(self.success_color, 6)
-        self.success_7 = qt_color.generate_color(self.success_color, 7)
-        self.success_8 = qt_color.generate_color(self.success_color, 8)
-        self.success_9 = qt_color.generate_color(self.success_color, 9)
-        self.success_10 = qt_color.generate_color(self.success_color, 10)
+        self.success_4 = success_palette[3]
+        self.success_5 = success_palette[4]
+        self.success_6 = success_palette[5]
+        self.success_7 = success_palette[6]
+        self.success_8 = success_palette[7]
+        self.success_9 = success_palette[8]
+        self.success_10 = success_palette[9]
 
         self.warning_1 = self._fade_color(self.warning_color, '15%')
-        self.warning_2 = qt_color.generate_color(self.warning_color, 2)
+        self.warning_2 = warning_palette[1]
         self.warning_3 = self._fade_color(self.warning_color, '35%')
-        self.warning_4 = qt_color.generate_color(self.warning_color, 4)
-        self.warning_5 = qt_color.generate_color(self.warning_color, 5)
-        self.warning_6 = qt_color.generate_color(self.warning_color, 6)
-        self.warning_7 = qt_color.generate_color(self.warning_color, 7)
-        self.warning_8 = qt_color.generate_color(self.warning_color, 8)
-        self.warning_9 = qt_color.generate_color(self.warning_color, 9)
-        self.warning_10 = qt_color.generate_color(self.warning_color, 10)
+        self.warning_4 = warning_palette[3]
+        self.warning_5 = warning_palette[4]
+        self.warning_6 = warning_palette[5]
+        self.warning_7 = warning_palette[6]
+        self.warning_8 = warning_palette[7]
+        self.warning_9 = warning_palette[8]
+        self.warning_10 = warning_palette[9]
 
         self.error_1 = self._fade_color(self.error_color, '15%')
-        self.error_2 = qt_color.generate_color(self.error_color, 2)
+        self.error_2 = error_palette[1]
         self.error_3 = self._fade_color(self.error_color, '35%')
-        self.error_4 = qt_color.generate_color(self.error_color, 4)
-        self.error_5 = qt_color.generate_color(self.error_color, 5)
-        self.error_6 = qt_color.generate_color(self.error_color, 6)
-        self.error_7 = qt_color.generate_color(self.error_color, 7)
-        self.error_8 = qt_color.generate_color(self.error_color, 8)
-        self.error_9 = qt_color.generate_color(self.error_color, 9)
-        self.error_10 = qt_color.generate_color(self.error_color, 10)
+        self.error_4 = error_palette[3]
+        self.error_5 = error_palette[4]
+        self.error_6 = error_palette[5]
+        self.error_7 = error_palette[6]
+        self.error_8 = error_palette[7]
+        self.error_9 = error_palette[8]
+        self.error_10 = error_palette[9]
 
     def _init_sizes(self):
         """
@@ -369,11 +387,11 @@ class Theme(QObject, object):
         self.medium = self.Sizes.MEDIUM
         self.large = self.Sizes.LARGE
         self.huge = self.Sizes.HUGE
-        self.tiny_icon = self.tiny - 8
-        self.small_icon = self.small - 10
-        self.medium_icon = self.medium - 12
-        self.large_icon = self.large - 16
-        self.huge_icon = self.huge - 20
+        self.tiny_icon = self.Sizes.TINY_ICON
+        self.small_icon = self.Sizes.SMALL_ICON
+        self.medium_icon = self.Sizes.MEDIUM_ICON
+        self.large_icon = self.Sizes.LARGE_ICON
+        self.huge_icon = self.Sizes.HUGE_ICON
         self.window_dragger_rounded_corners = 5
         self.window_dragger_font_size = 12
         self.window_rounded_corners = 5
@@ -424,26 +442,29 @@ class Theme(QObject, object):
     def _update_accent_color(self, accent_color):
         accent_color = qt_color.convert_2_hex(accent_color)
         self.accent_color = accent_color
-        self.accent_color_1 = qt_color.generate_color(accent_color, 1)
-        self.accent_color_2 = qt_color.generate_color(accent_color, 2)
-        self.accent_color_3 = qt_color.generate_color(accent_color, 3)
-        self.accent_color_4 = qt_color.generate_color(accent_color, 4)
-        self.accent_color_5 = qt_color.generate_color(accent_color, 5)
-        self.accent_color_6 = qt_color.generate_color(accent_color, 6)
-        self.accent_color_7 = qt_color.generate_color(accent_color, 7)
-        self.accent_color_8 = qt_color.generate_color(accent_color, 8)
-        self.accent_color_9 = qt_color.generate_color(accent_color, 9)
-        self.accent_color_10 = qt_color.generate_color(accent_color, 10)
+        accent_palette = qt_color.generate_palettes([accent_color])[0]
+        self.accent_color_1 = accent_palette[0]
+        self.accent_color_2 = accent_palette[1]
+        self.accent_color_3 = accent_palette[2]
+        self.accent_color_4 = accent_palette[3]
+        self.accent_color_5 = accent_palette[4]
+        self.accent_color_6 = accent_palette[5]
+        self.accent_color_7 = accent_palette[6]
+        self.accent_color_8 = accent_palette[7]
+        self.accent_color_9 = accent_palette[8]
+        self.accent_color_10 = accent_palette[9]
         self.item_hover_background_color = self.accent_color_1
 
     def _get_color(self, color_value, alpha=None):
         """
         Internal function that returns a color value in proper format to be handled by theme
-        :param color_value: variant, str or QColor or color.Color
+        :param color_value: variant, str or QColor or color.Color or rgba.RGBA
         """
 
         if isinstance(color_value, (str, unicode)):
             color_value = qt_color.Color.from_string(color_value)
+        elif isinstance(color_value, rgba.RGBA):
+            color_value = qt_color.Color.from_rgba(color_value)
         elif isinstance(color_value, QColor):
             color_value = qt_color.Color.from_color(color_value)
         elif isinstance(color_value, (list, tuple)):
@@ -459,8 +480,11 @@ class Theme(QObject, object):
         :return:
         """
 
-        qt_color = QColor(color)
-        return 'rgba({}, {}, {}, {})'.format(qt_color.red(), qt_color.green(), qt_color.blue(), alpha)
+        components = rgba.parse(color) if python.is_string(color) else None
+        if components is None:
+            components = tuple(color[:3]) if isinstance(color, rgba.RGBA) else QColor(color).getRgb()
+
+        return 'rgba({}, {}, {}, {})'.format(components[0], components[1], components[2], alpha)
 
     def foreground_color(self):
         """
@@ -532,6 +556,25 @@ class Theme(QObject, object):
                     self._update_accent_color(self.accent_color)
         self.updated.emit()
 
+    def _render_stylesheet(self, style_path, options):
+        """
+        Internal function that renders the style sheet of the given file with the given options
+        :param style_path: str
+        :param options: dict
+        :return: tuple(str, set(str)), style sheet and widget classes (or #objectNames) whose rules changed
+        """
+
+        # Style files are only read again if they changed and the expanded stylesheet is compiled only once, so
+        # only options are rendered each time
+        data = style.StyleSheet.expand(style_path)
+        renderer = self._stylesheet_renderer
+        if renderer is None or renderer.data != data or renderer.optimized != self.OPTIMIZE_STYLESHEET:
+            self._stylesheet_renderer = style.StyleSheetRenderer(
+                data, optimize=self.OPTIMIZE_STYLESHEET,
+                previous=renderer if renderer is not None and renderer.optimized == self.OPTIMIZE_STYLESHEET else None)
+
+        return self._stylesheet_renderer.update(options=options, dpi=self.dpi(), theme_name=self._name)
+
     def get_color_attribute_names(self):
         return [
             'accent_color', 'background_color', 'background_selected_color', 'background_in_color',
@@ -552,9 +595,11 @@ class Theme(QObject, object):
 
         return theme_options[option_name] if option_name in theme_options else default_value
 
-    def options(self, skip_instance_attrs=False):
+    def options(self, skip_instance_attrs=False, style_path=None):
         """
         Returns the variables used to customize the style sheet
+        :param skip_instance_attrs: bool
+        :param style_path: str or None, style file the options are used with. If not given, theme style file is used
         :return: dict
         """
         if self.is_dark():
@@ -569,7 +614,7 @@ class Theme(QObject, object):
             theme_resources_dir = os.path.join(theme_dir, 'resources', theme_name)
 
         style_resources_dir = ''
-        style_path = self.stylesheet_file()
+        style_path = style_path or self.stylesheet_file()
         if style_path and os.path.isfile(style_path):
             style_dir = os.path.dirname(style_path)
             style_name = os.path.splitext(os.path.basename(style_path))[0]
@@ -592,13 +637,17 @@ class Theme(QObject, object):
         all_options = dict()
         if not skip_instance_attrs:
             for k, v in options.items():
-                if k.startswith('_') or k in ['DEFAULT_SIZE', 'EXTENSION']:
+                if k.startswith('_') or k in [
+                        'DEFAULT_SIZE', 'EXTENSION', 'OPTIMIZE_STYLESHEET', 'CACHE_STYLESHEET',
+                        'USE_STYLESHEET_BUNDLE']:
                     continue
                 if inspect.isfunction(v) or inspect.ismethod(v) or hasattr(v, '__dict__'):
                     continue
                 if isinstance(v, types.BuiltinFunctionType) or isinstance(v, types.BuiltinMethodType):
                     continue
-                if isinstance(v, Signal):
+                # isinstance checks against Signal leak a reference to False in some PySide versions. Attributes
+                # return bound signals, so their type is also checked
+                if issubclass(type(v), (Signal, type(self.updated))):
                     continue
                 if python.is_int(v):
                     all_options[k] = int(v)
@@ -673,18 +722,85 @@ class Theme(QObject, object):
 
     def stylesheet(self):
         """
-        Returns the style sheet for this theme
+        Returns the style sheet for this theme. Style sheets are looked up first in the ahead of time bundle (see
+        stylebundle module), then in the memory and disk caches and are only rendered if they are not found (for
+        example, if theme options were customized). If neither the style files nor the theme options changed, the
+        style sheet is returned without reading any style file. Style sheets rendered with options customized at
+        runtime (for example, while picking an accent color) are only cached in memory
         :return: str
         """
 
         style_path = self.stylesheet_file()
         options = self.options()
+        if self.USE_STYLESHEET_BUNDLE:
+            bundle = stylebundle.get_bundle()
+            stylesheet = bundle.get(
+                style_path, self._name, options, dpi=self.dpi(), dpi_multiplier=utils.dpi_multiplier(),
+                optimize=self.OPTIMIZE_STYLESHEET) if bundle else None
+            if stylesheet is not None:
+                return stylesheet
+
+        if not self.CACHE_STYLESHEET:
+            return self._render_stylesheet(style_path, options)[0]
+
+        stylesheet_cache = stylecache.get_cache()
+        key = stylesheet_cache.key(
+            style_path, options=options, dpi=self.dpi(), style_path=os.path.abspath(style_path or ''),
+            theme_name=self._name, dcc_name=dcc.get_name(), dcc_version=dcc.get_version(),
+            dpi_multiplier=utils.dpi_multiplier(), optimize=self.OPTIMIZE_STYLESHEET)
+        stylesheet = stylesheet_cache.get(key)
+        if stylesheet is None:
+            stylesheet = self._render_stylesheet(style_path, options)[0]
+            stylesheet_cache.set(key, stylesheet, persist=options == self._default_options)
+
+        return stylesheet
+
+    def update_stylesheet(self):
+        """
+        Renders the style sheet for this theme. Only the rules that use options that changed since the last time the
+        style sheet was rendered are rendered again
+        :return: tuple(str, set(str)), style sheet and widget classes (or #objectNames) whose rules changed
+        """
+
+        return self._render_stylesheet(self.stylesheet_file(), self.options())
+
+    def widget_stylesheet(self, widget, recursive=True):
+        """
+        Returns the style sheet for this theme with only the rules that can be applied to the given widget (and its
+        children). Applying it to the widget instead of the full style sheet reduces the number of rules Qt matches
+        each time a widget of the subtree is polished
+        :param widget: QWidget
+        :param recursive: bool, whether or not to take into account children widgets
+        :return: str
+        """
+
+        widgets = [widget] + (widget.findChildren(QWidget) if recursive else list())
+        class_names = set()
+        object_names = set()
+        for child in widgets:
+            class_names.update(utils.widget_class_names(child))
+            object_names.add(child.objectName())
+
+        return self.classes_stylesheet(class_names, object_names=object_names)
+
+    def classes_stylesheet(self, widget_classes, object_names=None):
+        """
+        Returns the style sheet for this theme with only the rules that can be applied to widgets of the given types
+        :param widget_classes: list(type or str), widget classes or class names
+        :param object_names: list(str), object names of the widgets
+        :return: str
+        """
+
+        class_names = set()
+        for widget_class in widget_classes:
+            if python.is_string(widget_class):
+                class_names.add(widget_class)
+            else:
+                class_names.update(utils.widget_class_names(widget_class))
 
-        # TODO: We MUST optimize this. Style file should be read only once, store in dict and update it depending
-        # TODO: of the given theme options
-        stylesheet = style.StyleSheet.from_path(style_path, options=options, theme_name=self._name, dpi=self.dpi())
+        self.update_stylesheet()
 
-        return stylesheet.data()
+        return self._stylesheet_renderer.stylesheet_for(class_names, object_names=object_names)
     #
     # def create_color_dialog(self, parent, standard_colors=None, current_color=None):
     #     """
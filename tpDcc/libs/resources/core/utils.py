@@ -231,6 +231,39 @@ def dpi_scale(value):
     return value * mult
 
 
+def file_stat(file_path):
+    """
+    Returns the modification time and size of the given file
+    :param str file_path: path of the file
+    :return: modification time and size of the file or None if the file does not exist
+    :rtype: list(float, int) or None
+    """
+
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    return [stat.st_mtime, stat.st_size]
+
+
+def widget_class_names(widget):
+    """
+    Returns the class names Qt stylesheets class selectors match for the given widget: its class and all its base
+    classes (custom Python classes included)
+    :param widget: QWidget or type, widget instance or widget class
+    :return: list(str)
+    """
+
+    meta_object = widget.staticMetaObject if isinstance(widget, type) else widget.metaObject()
+    class_names = list()
+    while meta_object is not None:
+        class_names.append(meta_object.className().split('::')[-1])
+        meta_object = meta_object.superClass()
+
+    return class_names
+
+
 def find_rcc_executable_file():
     """
     Returns path pointing to a valid PySide/PyQt RCC executable file